@@ -18,6 +18,8 @@ from app.models.db_table_models.user_prompt_table import UserPrompt
 from app.models.db_table_models.system_prompt_table import SystemPrompt
 from app.models.db_table_models.llm_prompt_response_table import LLMPromptResponseTable
 from app.models.db_table_models.attached_ai_tools_table import AttachedAIToolsTable
+from app.models.db_table_models.rate_limit_bucket_table import RateLimitBucket
+from app.models.db_table_models.llm_prompt_job_table import LLMPromptJob
 # import all the sql alchemy table models here so that albemic can track the migrations for each table in db [ENDS]
 
 from sqlalchemy import create_engine
@@ -0,0 +1,35 @@
+"""add generation settings to system_prompt_table and truncated to llm_prompt_response_table
+
+Revision ID: 0c8d5b3e9a72
+Revises: f4a9c2e7b813
+Create Date: 2026-02-24 14:05:51.318026
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0c8d5b3e9a72'
+down_revision: Union[str, Sequence[str], None] = 'f4a9c2e7b813'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('system_prompt_table', sa.Column('max_output_tokens', sa.Integer(), nullable=True))
+    op.add_column('system_prompt_table', sa.Column('temperature', sa.Float(), nullable=True))
+    op.add_column('system_prompt_table', sa.Column('stop_sequences', postgresql.ARRAY(sa.Text()), nullable=True))
+    op.add_column('llm_prompt_response_table', sa.Column('truncated', sa.Boolean(), server_default=sa.false(), nullable=False))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('llm_prompt_response_table', 'truncated')
+    op.drop_column('system_prompt_table', 'stop_sequences')
+    op.drop_column('system_prompt_table', 'temperature')
+    op.drop_column('system_prompt_table', 'max_output_tokens')
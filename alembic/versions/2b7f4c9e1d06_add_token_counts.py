@@ -0,0 +1,31 @@
+"""add token_counts to user_prompt_table and llm_prompt_response_table
+
+Revision ID: 2b7f4c9e1d06
+Revises: 9e4d1a6c2f58
+Create Date: 2026-03-05 16:42:09.271845
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '2b7f4c9e1d06'
+down_revision: Union[str, Sequence[str], None] = '9e4d1a6c2f58'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('user_prompt_table', sa.Column('token_counts', postgresql.JSONB(astext_type=sa.Text()), nullable=True))
+    op.add_column('llm_prompt_response_table', sa.Column('token_counts', postgresql.JSONB(astext_type=sa.Text()), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('llm_prompt_response_table', 'token_counts')
+    op.drop_column('user_prompt_table', 'token_counts')
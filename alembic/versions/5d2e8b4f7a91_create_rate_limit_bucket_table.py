@@ -0,0 +1,33 @@
+"""create rate_limit_bucket_table
+
+Revision ID: 5d2e8b4f7a91
+Revises: a3f1c9d27b54
+Create Date: 2026-02-12 09:41:37.518204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5d2e8b4f7a91'
+down_revision: Union[str, Sequence[str], None] = 'a3f1c9d27b54'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('rate_limit_bucket_table',
+    sa.Column('bucket_key', sa.Text(), nullable=False),
+    sa.Column('tokens', sa.Float(), nullable=False),
+    sa.Column('updated_at', sa.TIMESTAMP(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.PrimaryKeyConstraint('bucket_key')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('rate_limit_bucket_table')
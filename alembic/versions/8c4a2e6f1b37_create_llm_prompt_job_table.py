@@ -0,0 +1,49 @@
+"""create llm_prompt_job_table
+
+Revision ID: 8c4a2e6f1b37
+Revises: 5d2e8b4f7a91
+Create Date: 2026-02-16 11:07:52.240913
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8c4a2e6f1b37'
+down_revision: Union[str, Sequence[str], None] = '5d2e8b4f7a91'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('llm_prompt_job_table',
+    sa.Column('id', sa.BigInteger(), autoincrement=True, nullable=False),
+    sa.Column('job_id', sa.Text(), nullable=False),
+    sa.Column('ai_agent_id', sa.Text(), nullable=False),
+    sa.Column('user_prompt', sa.Text(), nullable=False),
+    sa.Column('status', sa.Text(), server_default='queued', nullable=False),
+    sa.Column('attempts', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('max_attempts', sa.Integer(), nullable=False),
+    sa.Column('llm_prompt_response', sa.Text(), nullable=True),
+    sa.Column('error_status_code', sa.Integer(), nullable=True),
+    sa.Column('error_message', sa.Text(), nullable=True),
+    sa.Column('available_at', sa.TIMESTAMP(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.Column('locked_by', sa.Text(), nullable=True),
+    sa.Column('locked_until', sa.TIMESTAMP(timezone=True), nullable=True),
+    sa.Column('finished_at', sa.TIMESTAMP(timezone=True), nullable=True),
+    sa.Column('created_at', sa.TIMESTAMP(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.Column('updated_at', sa.TIMESTAMP(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('job_id')
+    )
+    op.create_index('ix_llm_prompt_job_table_status_available_at', 'llm_prompt_job_table', ['status', 'available_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_llm_prompt_job_table_status_available_at', table_name='llm_prompt_job_table')
+    op.drop_table('llm_prompt_job_table')
@@ -0,0 +1,67 @@
+"""add indexes for the conversation history and agent reset queries
+
+Revision ID: 9e4d1a6c2f58
+Revises: 0c8d5b3e9a72
+Create Date: 2026-03-02 10:18:27.604113
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9e4d1a6c2f58'
+down_revision: Union[str, Sequence[str], None] = '0c8d5b3e9a72'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# CREATE INDEX CONCURRENTLY cannot run inside a transaction, every index is built in its own autocommit block so
+# the tables keep taking writes while it is built. if_not_exists makes a re-run after an interrupted build a no-op
+# (an interrupted concurrent build leaves an INVALID index behind, drop it before running the upgrade again).
+# attached_ai_tools_table needs no new index, its uq_ai_agent_tool (ai_agent_id, agent_tool_name) already serves
+# the lookups by ai_agent_id.
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.get_context().autocommit_block():
+        # history tail of the agent context, user prompt listing (newest first) and reset_agent
+        op.create_index(
+            'ix_user_prompt_table_ai_agent_id_created_at',
+            'user_prompt_table',
+            ['ai_agent_id', sa.text('created_at DESC'), sa.text('id DESC')],
+            unique=False,
+            postgresql_concurrently=True,
+            if_not_exists=True
+        )
+    with op.get_context().autocommit_block():
+        # join of every history turn to its response
+        op.create_index(
+            'ix_llm_prompt_response_table_llm_user_prompt_id',
+            'llm_prompt_response_table',
+            ['llm_user_prompt_id'],
+            unique=False,
+            postgresql_concurrently=True,
+            if_not_exists=True
+        )
+    with op.get_context().autocommit_block():
+        # reset_agent deletes the responses of an agent
+        op.create_index(
+            'ix_llm_prompt_response_table_ai_agent_id',
+            'llm_prompt_response_table',
+            ['ai_agent_id'],
+            unique=False,
+            postgresql_concurrently=True,
+            if_not_exists=True
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_llm_prompt_response_table_ai_agent_id', table_name='llm_prompt_response_table', postgresql_concurrently=True, if_exists=True)
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_llm_prompt_response_table_llm_user_prompt_id', table_name='llm_prompt_response_table', postgresql_concurrently=True, if_exists=True)
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_user_prompt_table_ai_agent_id_created_at', table_name='user_prompt_table', postgresql_concurrently=True, if_exists=True)
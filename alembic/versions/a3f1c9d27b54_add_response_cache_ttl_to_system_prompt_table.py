@@ -0,0 +1,28 @@
+"""add response_cache_ttl_seconds to system_prompt_table
+
+Revision ID: a3f1c9d27b54
+Revises: ee61a80e58f8
+Create Date: 2026-02-10 11:20:14.305117
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a3f1c9d27b54'
+down_revision: Union[str, Sequence[str], None] = 'ee61a80e58f8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('system_prompt_table', sa.Column('response_cache_ttl_seconds', sa.Integer(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('system_prompt_table', 'response_cache_ttl_seconds')
@@ -0,0 +1,28 @@
+"""add request_timeout_seconds to system_prompt_table
+
+Revision ID: b6e2f0c8d413
+Revises: e1b7d3a94c20
+Create Date: 2026-02-19 10:14:37.205318
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b6e2f0c8d413'
+down_revision: Union[str, Sequence[str], None] = 'e1b7d3a94c20'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('system_prompt_table', sa.Column('request_timeout_seconds', sa.Integer(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('system_prompt_table', 'request_timeout_seconds')
@@ -0,0 +1,28 @@
+"""add priority_lane to system_prompt_table
+
+Revision ID: e1b7d3a94c20
+Revises: 8c4a2e6f1b37
+Create Date: 2026-02-18 15:32:09.871460
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e1b7d3a94c20'
+down_revision: Union[str, Sequence[str], None] = '8c4a2e6f1b37'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('system_prompt_table', sa.Column('priority_lane', sa.Text(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('system_prompt_table', 'priority_lane')
@@ -0,0 +1,31 @@
+"""add fallback_models to system_prompt_table and ai_model to llm_prompt_response_table
+
+Revision ID: f4a9c2e7b813
+Revises: b6e2f0c8d413
+Create Date: 2026-02-23 09:41:12.530184
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f4a9c2e7b813'
+down_revision: Union[str, Sequence[str], None] = 'b6e2f0c8d413'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('system_prompt_table', sa.Column('fallback_models', postgresql.ARRAY(sa.Text()), nullable=True))
+    op.add_column('llm_prompt_response_table', sa.Column('ai_model', sa.Text(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('llm_prompt_response_table', 'ai_model')
+    op.drop_column('system_prompt_table', 'fallback_models')
@@ -0,0 +1,180 @@
+# import fast api related libraries and packages
+from fastapi import APIRouter, Depends, Request
+
+# import request response model
+from app.models.api_request_response_model.response_models import APIResponse
+
+# import controllers
+from app.controllers.diagnostics_controller import DiagnosticsController
+
+# import controller dependencies 
+from app.dependencies.controller_dependencies import get_diagnostics_controller
+
+# import logging utility
+from app.utils.logger import LoggerFactory
+
+# import info logger messages
+from app.utils.logger_info_messages import LoggerInfoMessages, DiagnosticsApiUrls
+
+# get base url for the fast-api server
+from app.utils.get_base_url import FastApiServer
+
+router = APIRouter(tags=["diagnostics_apis"])
+
+# initialize logging utility
+info_logger = LoggerFactory.get_info_logger()
+error_logger = LoggerFactory.get_error_logger()
+debug_logger = LoggerFactory.get_debug_logger()
+
+@router.get("/diagnostics/hf_http_pool", response_model=APIResponse)
+def get_hugging_face_http_pool_stats(
+    http_request: Request,
+    controller: DiagnosticsController = Depends(get_diagnostics_controller)
+):
+    BASE_URL_FAST_API_SERVER = FastApiServer.get_base_url(request=http_request)
+    info_logger.info(f"get_hugging_face_http_pool_stats | url = {BASE_URL_FAST_API_SERVER}{DiagnosticsApiUrls.HF_HTTP_POOL_STATS.value} | {LoggerInfoMessages.API_HIT_SUCCESS.value}")
+    return controller.get_hugging_face_http_pool_stats()
+
+@router.get("/diagnostics/llm_response_cache", response_model=APIResponse)
+def get_llm_response_cache_stats(
+    http_request: Request,
+    controller: DiagnosticsController = Depends(get_diagnostics_controller)
+):
+    BASE_URL_FAST_API_SERVER = FastApiServer.get_base_url(request=http_request)
+    info_logger.info(f"get_llm_response_cache_stats | url = {BASE_URL_FAST_API_SERVER}{DiagnosticsApiUrls.LLM_RESPONSE_CACHE_STATS.value} | {LoggerInfoMessages.API_HIT_SUCCESS.value}")
+    return controller.get_llm_response_cache_stats()
+
+@router.get("/diagnostics/llm_single_flight", response_model=APIResponse)
+def get_llm_single_flight_stats(
+    http_request: Request,
+    controller: DiagnosticsController = Depends(get_diagnostics_controller)
+):
+    BASE_URL_FAST_API_SERVER = FastApiServer.get_base_url(request=http_request)
+    info_logger.info(f"get_llm_single_flight_stats | url = {BASE_URL_FAST_API_SERVER}{DiagnosticsApiUrls.LLM_SINGLE_FLIGHT_STATS.value} | {LoggerInfoMessages.API_HIT_SUCCESS.value}")
+    return controller.get_llm_single_flight_stats()
+
+@router.get("/diagnostics/circuit_breakers", response_model=APIResponse)
+def get_circuit_breaker_states(
+    http_request: Request,
+    controller: DiagnosticsController = Depends(get_diagnostics_controller)
+):
+    BASE_URL_FAST_API_SERVER = FastApiServer.get_base_url(request=http_request)
+    info_logger.info(f"get_circuit_breaker_states | url = {BASE_URL_FAST_API_SERVER}{DiagnosticsApiUrls.CIRCUIT_BREAKER_STATES.value} | {LoggerInfoMessages.API_HIT_SUCCESS.value}")
+    return controller.get_circuit_breaker_states()
+
+@router.get("/diagnostics/llm_concurrency_limiter", response_model=APIResponse)
+def get_llm_concurrency_limiter_stats(
+    http_request: Request,
+    controller: DiagnosticsController = Depends(get_diagnostics_controller)
+):
+    BASE_URL_FAST_API_SERVER = FastApiServer.get_base_url(request=http_request)
+    info_logger.info(f"get_llm_concurrency_limiter_stats | url = {BASE_URL_FAST_API_SERVER}{DiagnosticsApiUrls.LLM_CONCURRENCY_LIMITER_STATS.value} | {LoggerInfoMessages.API_HIT_SUCCESS.value}")
+    return controller.get_llm_concurrency_limiter_stats()
+
+@router.get("/diagnostics/rate_limiter", response_model=APIResponse)
+def get_rate_limiter_stats(
+    http_request: Request,
+    controller: DiagnosticsController = Depends(get_diagnostics_controller)
+):
+    BASE_URL_FAST_API_SERVER = FastApiServer.get_base_url(request=http_request)
+    info_logger.info(f"get_rate_limiter_stats | url = {BASE_URL_FAST_API_SERVER}{DiagnosticsApiUrls.RATE_LIMITER_STATS.value} | {LoggerInfoMessages.API_HIT_SUCCESS.value}")
+    return controller.get_rate_limiter_stats()
+
+@router.get("/diagnostics/llm_retries", response_model=APIResponse)
+def get_llm_retry_stats(
+    http_request: Request,
+    controller: DiagnosticsController = Depends(get_diagnostics_controller)
+):
+    BASE_URL_FAST_API_SERVER = FastApiServer.get_base_url(request=http_request)
+    info_logger.info(f"get_llm_retry_stats | url = {BASE_URL_FAST_API_SERVER}{DiagnosticsApiUrls.LLM_RETRY_STATS.value} | {LoggerInfoMessages.API_HIT_SUCCESS.value}")
+    return controller.get_llm_retry_stats()
+
+@router.get("/diagnostics/llm_hedging", response_model=APIResponse)
+def get_llm_hedging_stats(
+    http_request: Request,
+    controller: DiagnosticsController = Depends(get_diagnostics_controller)
+):
+    BASE_URL_FAST_API_SERVER = FastApiServer.get_base_url(request=http_request)
+    info_logger.info(f"get_llm_hedging_stats | url = {BASE_URL_FAST_API_SERVER}{DiagnosticsApiUrls.LLM_HEDGING_STATS.value} | {LoggerInfoMessages.API_HIT_SUCCESS.value}")
+    return controller.get_llm_hedging_stats()
+
+@router.get("/diagnostics/llm_endpoints", response_model=APIResponse)
+def get_llm_endpoint_stats(
+    http_request: Request,
+    controller: DiagnosticsController = Depends(get_diagnostics_controller)
+):
+    BASE_URL_FAST_API_SERVER = FastApiServer.get_base_url(request=http_request)
+    info_logger.info(f"get_llm_endpoint_stats | url = {BASE_URL_FAST_API_SERVER}{DiagnosticsApiUrls.LLM_ENDPOINT_STATS.value} | {LoggerInfoMessages.API_HIT_SUCCESS.value}")
+    return controller.get_llm_endpoint_stats()
+
+@router.get("/diagnostics/llm_job_queue", response_model=APIResponse)
+def get_llm_job_queue_stats(
+    http_request: Request,
+    controller: DiagnosticsController = Depends(get_diagnostics_controller)
+):
+    BASE_URL_FAST_API_SERVER = FastApiServer.get_base_url(request=http_request)
+    info_logger.info(f"get_llm_job_queue_stats | url = {BASE_URL_FAST_API_SERVER}{DiagnosticsApiUrls.LLM_JOB_QUEUE_STATS.value} | {LoggerInfoMessages.API_HIT_SUCCESS.value}")
+    return controller.get_llm_job_queue_stats()
+
+@router.get("/diagnostics/agent_locks", response_model=APIResponse)
+def get_agent_lock_stats(
+    http_request: Request,
+    controller: DiagnosticsController = Depends(get_diagnostics_controller)
+):
+    BASE_URL_FAST_API_SERVER = FastApiServer.get_base_url(request=http_request)
+    info_logger.info(f"get_agent_lock_stats | url = {BASE_URL_FAST_API_SERVER}{DiagnosticsApiUrls.AGENT_LOCK_STATS.value} | {LoggerInfoMessages.API_HIT_SUCCESS.value}")
+    return controller.get_agent_lock_stats()
+
+@router.get("/diagnostics/admission_control", response_model=APIResponse)
+def get_admission_control_stats(
+    http_request: Request,
+    controller: DiagnosticsController = Depends(get_diagnostics_controller)
+):
+    BASE_URL_FAST_API_SERVER = FastApiServer.get_base_url(request=http_request)
+    info_logger.info(f"get_admission_control_stats | url = {BASE_URL_FAST_API_SERVER}{DiagnosticsApiUrls.ADMISSION_CONTROL_STATS.value} | {LoggerInfoMessages.API_HIT_SUCCESS.value}")
+    return controller.get_admission_control_stats()
+
+@router.get("/diagnostics/request_deadlines", response_model=APIResponse)
+def get_request_deadline_stats(
+    http_request: Request,
+    controller: DiagnosticsController = Depends(get_diagnostics_controller)
+):
+    BASE_URL_FAST_API_SERVER = FastApiServer.get_base_url(request=http_request)
+    info_logger.info(f"get_request_deadline_stats | url = {BASE_URL_FAST_API_SERVER}{DiagnosticsApiUrls.REQUEST_DEADLINE_STATS.value} | {LoggerInfoMessages.API_HIT_SUCCESS.value}")
+    return controller.get_request_deadline_stats()
+
+@router.get("/diagnostics/request_cancellations", response_model=APIResponse)
+def get_request_cancellation_stats(
+    http_request: Request,
+    controller: DiagnosticsController = Depends(get_diagnostics_controller)
+):
+    BASE_URL_FAST_API_SERVER = FastApiServer.get_base_url(request=http_request)
+    info_logger.info(f"get_request_cancellation_stats | url = {BASE_URL_FAST_API_SERVER}{DiagnosticsApiUrls.REQUEST_CANCELLATION_STATS.value} | {LoggerInfoMessages.API_HIT_SUCCESS.value}")
+    return controller.get_request_cancellation_stats()
+
+@router.get("/diagnostics/model_fallback", response_model=APIResponse)
+def get_model_fallback_stats(
+    http_request: Request,
+    controller: DiagnosticsController = Depends(get_diagnostics_controller)
+):
+    BASE_URL_FAST_API_SERVER = FastApiServer.get_base_url(request=http_request)
+    info_logger.info(f"get_model_fallback_stats | url = {BASE_URL_FAST_API_SERVER}{DiagnosticsApiUrls.MODEL_FALLBACK_STATS.value} | {LoggerInfoMessages.API_HIT_SUCCESS.value}")
+    return controller.get_model_fallback_stats()
+
+@router.get("/diagnostics/adaptive_timeouts", response_model=APIResponse)
+def get_adaptive_timeout_stats(
+    http_request: Request,
+    controller: DiagnosticsController = Depends(get_diagnostics_controller)
+):
+    BASE_URL_FAST_API_SERVER = FastApiServer.get_base_url(request=http_request)
+    info_logger.info(f"get_adaptive_timeout_stats | url = {BASE_URL_FAST_API_SERVER}{DiagnosticsApiUrls.ADAPTIVE_TIMEOUT_STATS.value} | {LoggerInfoMessages.API_HIT_SUCCESS.value}")
+    return controller.get_adaptive_timeout_stats()
+
+@router.get("/diagnostics/request_body_encoder", response_model=APIResponse)
+def get_request_body_encoder_stats(
+    http_request: Request,
+    controller: DiagnosticsController = Depends(get_diagnostics_controller)
+):
+    BASE_URL_FAST_API_SERVER = FastApiServer.get_base_url(request=http_request)
+    info_logger.info(f"get_request_body_encoder_stats | url = {BASE_URL_FAST_API_SERVER}{DiagnosticsApiUrls.REQUEST_BODY_ENCODER_STATS.value} | {LoggerInfoMessages.API_HIT_SUCCESS.value}")
+    return controller.get_request_body_encoder_stats()
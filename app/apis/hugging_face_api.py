@@ -1,5 +1,5 @@
 # import fast api related libraries and packages
-from fastapi import APIRouter, Depends, BackgroundTasks, Request, Body
+from fastapi import APIRouter, Depends, BackgroundTasks, Request, Body, Header, status
 
 # import request response model
 from app.models.api_request_response_model.request_models import (HuggingFacePromptRequest, ResetHuggingFaceAIModelContextRequest)
@@ -9,7 +9,7 @@ from app.models.api_request_response_model.response_models import APIResponse
 from app.controllers.hugging_face_ai_model_controllers import HuggingFaceAIModelController
 
 # import controller dependencies 
-from app.dependencies.controller_dependencies import get_hugging_face_ai_model_controller
+from app.dependencies.controller_dependencies import get_hugging_face_ai_model_controller, admit_prompt_request
 
 # import logging utility
 from app.utils.logger import LoggerFactory
@@ -36,15 +36,50 @@ def get_ai_models(
     info_logger.info(f"get_ai_models | url = {BASE_URL_FAST_API_SERVER}{HuggingFaceAPIUrls.HUGGING_FACE_GET_AI_MODELS.value} | {LoggerInfoMessages.API_HIT_SUCCESS.value}")
     return controller.get_models()
 
-@router.post("/hugging_face/user_prompt", response_model=APIResponse)
+@router.post("/hugging_face/user_prompt", response_model=APIResponse, dependencies=[Depends(admit_prompt_request)])
 async def process_user_prompt_hugging_face(
     request: HuggingFacePromptRequest,
     http_request: Request,
+    x_llm_cache_bypass: bool = Header(default=False, description="Skip the llm response cache lookup for this request"),
+    x_llm_priority: str | None = Header(default=None, description="Priority lane for this request (overrides the agent's priority_lane)"),
+    x_request_timeout: float | None = Header(default=None, gt=0, description="Seconds this client waits for the answer (overrides the agent's request_timeout_seconds)"),
     controller: HuggingFaceAIModelController = Depends(get_hugging_face_ai_model_controller)
 ):
     BASE_URL_FAST_API_SERVER = FastApiServer.get_base_url(request=http_request)
     info_logger.info(f"process_user_prompt_api | url = {BASE_URL_FAST_API_SERVER}{HuggingFaceAPIUrls.HUGGING_FACE_PROCESS_PROMPT.value} | {LoggerInfoMessages.API_HIT_SUCCESS.value}")
-    return await controller.process_hugging_face_prompt_request(request)
+    return await controller.process_hugging_face_prompt_request(request, bypass_cache=x_llm_cache_bypass, priority_lane=x_llm_priority, request_timeout_seconds=x_request_timeout, http_request=http_request)
+
+@router.post("/hugging_face/user_prompt/stream", dependencies=[Depends(admit_prompt_request)])
+async def process_user_prompt_hugging_face_stream(
+    request: HuggingFacePromptRequest,
+    http_request: Request,
+    x_llm_priority: str | None = Header(default=None, description="Priority lane for this request (overrides the agent's priority_lane)"),
+    x_request_timeout: float | None = Header(default=None, gt=0, description="Seconds this client waits for the stream to start (overrides the agent's request_timeout_seconds)"),
+    controller: HuggingFaceAIModelController = Depends(get_hugging_face_ai_model_controller)
+):
+    BASE_URL_FAST_API_SERVER = FastApiServer.get_base_url(request=http_request)
+    info_logger.info(f"process_user_prompt_hugging_face_stream | url = {BASE_URL_FAST_API_SERVER}{HuggingFaceAPIUrls.HUGGING_FACE_PROCESS_PROMPT_STREAM.value} | {LoggerInfoMessages.API_HIT_SUCCESS.value}")
+    return await controller.process_hugging_face_prompt_stream_request(request, priority_lane=x_llm_priority, request_timeout_seconds=x_request_timeout)
+
+@router.post("/hugging_face/jobs", response_model=APIResponse, status_code=status.HTTP_202_ACCEPTED)
+def submit_user_prompt_job_hugging_face(
+    request: HuggingFacePromptRequest,
+    http_request: Request,
+    controller: HuggingFaceAIModelController = Depends(get_hugging_face_ai_model_controller)
+):
+    BASE_URL_FAST_API_SERVER = FastApiServer.get_base_url(request=http_request)
+    info_logger.info(f"submit_user_prompt_job_hugging_face | url = {BASE_URL_FAST_API_SERVER}{HuggingFaceAPIUrls.HUGGING_FACE_SUBMIT_PROMPT_JOB.value} | {LoggerInfoMessages.API_HIT_SUCCESS.value}")
+    return controller.submit_prompt_job(request)
+
+@router.get("/hugging_face/jobs/{job_id}", response_model=APIResponse)
+def get_user_prompt_job_hugging_face(
+    job_id: str,
+    http_request: Request,
+    controller: HuggingFaceAIModelController = Depends(get_hugging_face_ai_model_controller)
+):
+    BASE_URL_FAST_API_SERVER = FastApiServer.get_base_url(request=http_request)
+    info_logger.info(f"get_user_prompt_job_hugging_face | url = {BASE_URL_FAST_API_SERVER}{HuggingFaceAPIUrls.HUGGING_FACE_GET_PROMPT_JOB.value.format(job_id=job_id)} | {LoggerInfoMessages.API_HIT_SUCCESS.value}")
+    return controller.get_prompt_job(job_id)
 
 @router.delete("/hugging_face/reset_ai_agent_context", response_model=APIResponse)
 def reset_ai_agent_context(
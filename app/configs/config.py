@@ -24,6 +24,17 @@ class ProjectConfigurations(Enum):
         default=None,
         cast=str
     )
+    # pool of the async engine used by the prompt endpoints (one connection per prompt while it reads / stores its turn)
+    DB_ASYNC_POOL_SIZE : int = config(
+        "DB_ASYNC_POOL_SIZE",
+        default=10,
+        cast=int
+    )
+    DB_ASYNC_MAX_OVERFLOW : int = config(
+        "DB_ASYNC_MAX_OVERFLOW",
+        default=20,
+        cast=int
+    )
 
     # ---------------------------------------------------------------------------------------------------------------------------------
     # HUGGINGFACE RELATED CONFIGURATIONS
@@ -38,3 +49,636 @@ class ProjectConfigurations(Enum):
         default=None,
         cast=str
     )
+    # optional: several OpenAI compatible endpoints (comma separated) used for every model instead of HF_API_URL
+    HF_API_URLS : str = config(
+        "HF_API_URLS",
+        default="",
+        cast=str
+    )
+    # optional: endpoints per model as json, e.g. {"meta-llama/Llama-3.1-8B-Instruct": ["http://tgi-1/v1/chat/completions", "http://tgi-2/v1/chat/completions"]}
+    HF_MODEL_ENDPOINTS : str = config(
+        "HF_MODEL_ENDPOINTS",
+        default="{}",
+        cast=str
+    )
+
+    # ---------------------------------------------------------------------------------------------------------------------------------
+    # HUGGINGFACE HTTP CLIENT RELATED CONFIGURATIONS
+    # ---------------------------------------------------------------------------------------------------------------------------------
+    HF_HTTP2_ENABLED : bool = config(
+        "HF_HTTP2_ENABLED",
+        default=True,
+        cast=bool
+    )
+    HF_PRECONNECT_ON_STARTUP : bool = config(
+        "HF_PRECONNECT_ON_STARTUP",
+        default=True,
+        cast=bool
+    )
+    HF_MAX_CONNECTIONS : int = config(
+        "HF_MAX_CONNECTIONS",
+        default=50,
+        cast=int
+    )
+    HF_MAX_KEEPALIVE_CONNECTIONS : int = config(
+        "HF_MAX_KEEPALIVE_CONNECTIONS",
+        default=20,
+        cast=int
+    )
+    HF_KEEPALIVE_EXPIRY_SECONDS : float = config(
+        "HF_KEEPALIVE_EXPIRY_SECONDS",
+        default=30.0,
+        cast=float
+    )
+    HF_CONNECT_TIMEOUT_SECONDS : float = config(
+        "HF_CONNECT_TIMEOUT_SECONDS",
+        default=5.0,
+        cast=float
+    )
+    HF_READ_TIMEOUT_SECONDS : float = config(
+        "HF_READ_TIMEOUT_SECONDS",
+        default=120.0,
+        cast=float
+    )
+    HF_WRITE_TIMEOUT_SECONDS : float = config(
+        "HF_WRITE_TIMEOUT_SECONDS",
+        default=5.0,
+        cast=float
+    )
+    HF_POOL_TIMEOUT_SECONDS : float = config(
+        "HF_POOL_TIMEOUT_SECONDS",
+        default=5.0,
+        cast=float
+    )
+
+    # ---------------------------------------------------------------------------------------------------------------------------------
+    # LLM RESPONSE CACHE RELATED CONFIGURATIONS
+    # ---------------------------------------------------------------------------------------------------------------------------------
+    # global kill switch, agents still have to opt in with response_cache_ttl_seconds on their system prompt
+    LLM_RESPONSE_CACHE_ENABLED : bool = config(
+        "LLM_RESPONSE_CACHE_ENABLED",
+        default=True,
+        cast=bool
+    )
+    LLM_RESPONSE_CACHE_MAX_ENTRIES : int = config(
+        "LLM_RESPONSE_CACHE_MAX_ENTRIES",
+        default=1000,
+        cast=int
+    )
+    LLM_RESPONSE_CACHE_MAX_BYTES : int = config(
+        "LLM_RESPONSE_CACHE_MAX_BYTES",
+        default=50 * 1024 * 1024,
+        cast=int
+    )
+    # pre-encoded json of the messages sent upstream (system prompts and history turns), 0 disables it
+    LLM_BODY_FRAGMENT_CACHE_MAX_BYTES : int = config(
+        "LLM_BODY_FRAGMENT_CACHE_MAX_BYTES",
+        default=64 * 1024 * 1024,
+        cast=int
+    )
+
+    # ---------------------------------------------------------------------------------------------------------------------------------
+    # LLM REQUEST COALESCING RELATED CONFIGURATIONS
+    # ---------------------------------------------------------------------------------------------------------------------------------
+    LLM_SINGLE_FLIGHT_ENABLED : bool = config(
+        "LLM_SINGLE_FLIGHT_ENABLED",
+        default=True,
+        cast=bool
+    )
+    # opt-in: an identical prompt of the agent arriving this long after the first one was answered gets the same answer
+    # (no new turn is stored), 0 = only prompts arriving while the first one is in flight are coalesced
+    LLM_SINGLE_FLIGHT_REUSE_SECONDS : float = config(
+        "LLM_SINGLE_FLIGHT_REUSE_SECONDS",
+        default=0.0,
+        cast=float
+    )
+
+    # ---------------------------------------------------------------------------------------------------------------------------------
+    # CIRCUIT BREAKER RELATED CONFIGURATIONS (one breaker per hugging face endpoint + model)
+    # ---------------------------------------------------------------------------------------------------------------------------------
+    CIRCUIT_BREAKER_ENABLED : bool = config(
+        "CIRCUIT_BREAKER_ENABLED",
+        default=True,
+        cast=bool
+    )
+    CIRCUIT_BREAKER_FAILURE_RATE_THRESHOLD : float = config(
+        "CIRCUIT_BREAKER_FAILURE_RATE_THRESHOLD",
+        default=0.5,
+        cast=float
+    )
+    CIRCUIT_BREAKER_MINIMUM_CALLS : int = config(
+        "CIRCUIT_BREAKER_MINIMUM_CALLS",
+        default=10,
+        cast=int
+    )
+    CIRCUIT_BREAKER_WINDOW_SECONDS : float = config(
+        "CIRCUIT_BREAKER_WINDOW_SECONDS",
+        default=60.0,
+        cast=float
+    )
+    CIRCUIT_BREAKER_OPEN_SECONDS : float = config(
+        "CIRCUIT_BREAKER_OPEN_SECONDS",
+        default=30.0,
+        cast=float
+    )
+    CIRCUIT_BREAKER_HALF_OPEN_MAX_CALLS : int = config(
+        "CIRCUIT_BREAKER_HALF_OPEN_MAX_CALLS",
+        default=3,
+        cast=int
+    )
+
+    # ---------------------------------------------------------------------------------------------------------------------------------
+    # ADAPTIVE CONCURRENCY LIMITER RELATED CONFIGURATIONS (process wide cap on in-flight hugging face calls)
+    # ---------------------------------------------------------------------------------------------------------------------------------
+    LLM_CONCURRENCY_LIMITER_ENABLED : bool = config(
+        "LLM_CONCURRENCY_LIMITER_ENABLED",
+        default=True,
+        cast=bool
+    )
+    LLM_CONCURRENCY_INITIAL_LIMIT : int = config(
+        "LLM_CONCURRENCY_INITIAL_LIMIT",
+        default=20,
+        cast=int
+    )
+    LLM_CONCURRENCY_MIN_LIMIT : int = config(
+        "LLM_CONCURRENCY_MIN_LIMIT",
+        default=2,
+        cast=int
+    )
+    LLM_CONCURRENCY_MAX_LIMIT : int = config(
+        "LLM_CONCURRENCY_MAX_LIMIT",
+        default=50,
+        cast=int
+    )
+    LLM_CONCURRENCY_BACKOFF_RATIO : float = config(
+        "LLM_CONCURRENCY_BACKOFF_RATIO",
+        default=0.9,
+        cast=float
+    )
+    LLM_CONCURRENCY_LATENCY_TOLERANCE : float = config(
+        "LLM_CONCURRENCY_LATENCY_TOLERANCE",
+        default=2.0,
+        cast=float
+    )
+    LLM_CONCURRENCY_MAX_QUEUE : int = config(
+        "LLM_CONCURRENCY_MAX_QUEUE",
+        default=200,
+        cast=int
+    )
+    LLM_CONCURRENCY_QUEUE_TIMEOUT_SECONDS : float = config(
+        "LLM_CONCURRENCY_QUEUE_TIMEOUT_SECONDS",
+        default=10.0,
+        cast=float
+    )
+    # priority lanes of the limiter queue, "name:weight" from the highest to the lowest priority
+    LLM_PRIORITY_LANES : str = config(
+        "LLM_PRIORITY_LANES",
+        default="interactive:8,batch:1",
+        cast=str
+    )
+    # "weighted" (weighted round robin between the lanes) or "strict" (a lower lane only runs when the higher ones are empty)
+    LLM_PRIORITY_MODE : str = config(
+        "LLM_PRIORITY_MODE",
+        default="weighted",
+        cast=str
+    )
+    LLM_PRIORITY_DEFAULT_LANE : str = config(
+        "LLM_PRIORITY_DEFAULT_LANE",
+        default="interactive",
+        cast=str
+    )
+    # starvation protection: a call that waited this long is served next whatever its lane
+    LLM_PRIORITY_MAX_WAIT_SECONDS : float = config(
+        "LLM_PRIORITY_MAX_WAIT_SECONDS",
+        default=4.0,
+        cast=float
+    )
+    # CoDel style queue management: once the queue has not drained for LLM_CONCURRENCY_CODEL_INTERVAL_SECONDS,
+    # callers that already waited longer than LLM_CONCURRENCY_CODEL_TARGET_SECONDS are rejected instead of served late
+    LLM_CONCURRENCY_CODEL_ENABLED : bool = config(
+        "LLM_CONCURRENCY_CODEL_ENABLED",
+        default=False,
+        cast=bool
+    )
+    LLM_CONCURRENCY_CODEL_TARGET_SECONDS : float = config(
+        "LLM_CONCURRENCY_CODEL_TARGET_SECONDS",
+        default=0.5,
+        cast=float
+    )
+    LLM_CONCURRENCY_CODEL_INTERVAL_SECONDS : float = config(
+        "LLM_CONCURRENCY_CODEL_INTERVAL_SECONDS",
+        default=2.0,
+        cast=float
+    )
+
+    # ---------------------------------------------------------------------------------------------------------------------------------
+    # RATE LIMITING RELATED CONFIGURATIONS (token buckets per agent and per model, 0 disables a bucket)
+    # ---------------------------------------------------------------------------------------------------------------------------------
+    RATE_LIMIT_ENABLED : bool = config(
+        "RATE_LIMIT_ENABLED",
+        default=True,
+        cast=bool
+    )
+    # memory (single node) | postgres (shared by every worker, needs the rate_limit_bucket_table migration)
+    RATE_LIMIT_STORE : str = config(
+        "RATE_LIMIT_STORE",
+        default="memory",
+        cast=str
+    )
+    RATE_LIMIT_AGENT_REQUESTS_PER_MINUTE : int = config(
+        "RATE_LIMIT_AGENT_REQUESTS_PER_MINUTE",
+        default=60,
+        cast=int
+    )
+    RATE_LIMIT_AGENT_TOKENS_PER_MINUTE : int = config(
+        "RATE_LIMIT_AGENT_TOKENS_PER_MINUTE",
+        default=100000,
+        cast=int
+    )
+    RATE_LIMIT_MODEL_REQUESTS_PER_MINUTE : int = config(
+        "RATE_LIMIT_MODEL_REQUESTS_PER_MINUTE",
+        default=600,
+        cast=int
+    )
+    RATE_LIMIT_MODEL_TOKENS_PER_MINUTE : int = config(
+        "RATE_LIMIT_MODEL_TOKENS_PER_MINUTE",
+        default=1000000,
+        cast=int
+    )
+    RATE_LIMIT_FAIR_SHARE_ENABLED : bool = config(
+        "RATE_LIMIT_FAIR_SHARE_ENABLED",
+        default=True,
+        cast=bool
+    )
+    RATE_LIMIT_FAIR_SHARE_WINDOW_SECONDS : float = config(
+        "RATE_LIMIT_FAIR_SHARE_WINDOW_SECONDS",
+        default=60.0,
+        cast=float
+    )
+
+    # ---------------------------------------------------------------------------------------------------------------------------------
+    # RETRY POLICY RELATED CONFIGURATIONS (hugging face calls)
+    # ---------------------------------------------------------------------------------------------------------------------------------
+    LLM_RETRY_MAX_ATTEMPTS : int = config(
+        "LLM_RETRY_MAX_ATTEMPTS",
+        default=3,
+        cast=int
+    )
+    LLM_RETRY_BASE_DELAY_SECONDS : float = config(
+        "LLM_RETRY_BASE_DELAY_SECONDS",
+        default=0.5,
+        cast=float
+    )
+    LLM_RETRY_MAX_DELAY_SECONDS : float = config(
+        "LLM_RETRY_MAX_DELAY_SECONDS",
+        default=8.0,
+        cast=float
+    )
+    LLM_RETRY_STATUS_CODES : str = config(
+        "LLM_RETRY_STATUS_CODES",
+        default="429,500,502,503,504",
+        cast=str
+    )
+    LLM_RETRY_MAX_RETRY_AFTER_SECONDS : float = config(
+        "LLM_RETRY_MAX_RETRY_AFTER_SECONDS",
+        default=10.0,
+        cast=float
+    )
+    LLM_RETRY_ON_READ_TIMEOUT : bool = config(
+        "LLM_RETRY_ON_READ_TIMEOUT",
+        default=True,
+        cast=bool
+    )
+    # retries may use at most this fraction of the base traffic (plus a small floor per second)
+    LLM_RETRY_BUDGET_RATIO : float = config(
+        "LLM_RETRY_BUDGET_RATIO",
+        default=0.2,
+        cast=float
+    )
+    LLM_RETRY_BUDGET_MIN_PER_SECOND : float = config(
+        "LLM_RETRY_BUDGET_MIN_PER_SECOND",
+        default=0.5,
+        cast=float
+    )
+    LLM_RETRY_BUDGET_MAX_TOKENS : float = config(
+        "LLM_RETRY_BUDGET_MAX_TOKENS",
+        default=20.0,
+        cast=float
+    )
+
+    # ---------------------------------------------------------------------------------------------------------------------------------
+    # HEDGED REQUESTS RELATED CONFIGURATIONS (hugging face calls, off by default)
+    # ---------------------------------------------------------------------------------------------------------------------------------
+    LLM_HEDGING_ENABLED : bool = config(
+        "LLM_HEDGING_ENABLED",
+        default=False,
+        cast=bool
+    )
+    LLM_HEDGE_PERCENTILE : float = config(
+        "LLM_HEDGE_PERCENTILE",
+        default=95.0,
+        cast=float
+    )
+    LLM_HEDGE_MIN_SAMPLES : int = config(
+        "LLM_HEDGE_MIN_SAMPLES",
+        default=20,
+        cast=int
+    )
+    LLM_HEDGE_LATENCY_WINDOW : int = config(
+        "LLM_HEDGE_LATENCY_WINDOW",
+        default=200,
+        cast=int
+    )
+    LLM_HEDGE_MIN_DELAY_SECONDS : float = config(
+        "LLM_HEDGE_MIN_DELAY_SECONDS",
+        default=0.2,
+        cast=float
+    )
+    LLM_HEDGE_BUDGET_RATIO : float = config(
+        "LLM_HEDGE_BUDGET_RATIO",
+        default=0.05,
+        cast=float
+    )
+    LLM_HEDGE_BUDGET_MAX_TOKENS : float = config(
+        "LLM_HEDGE_BUDGET_MAX_TOKENS",
+        default=10.0,
+        cast=float
+    )
+
+    # ---------------------------------------------------------------------------------------------------------------------------------
+    # ENDPOINT LOAD BALANCING RELATED CONFIGURATIONS (only used when a model has more than one endpoint)
+    # ---------------------------------------------------------------------------------------------------------------------------------
+    LLM_ENDPOINT_EWMA_ALPHA : float = config(
+        "LLM_ENDPOINT_EWMA_ALPHA",
+        default=0.3,
+        cast=float
+    )
+    LLM_ENDPOINT_EJECT_CONSECUTIVE_FAILURES : int = config(
+        "LLM_ENDPOINT_EJECT_CONSECUTIVE_FAILURES",
+        default=5,
+        cast=int
+    )
+    LLM_ENDPOINT_BASE_EJECTION_SECONDS : float = config(
+        "LLM_ENDPOINT_BASE_EJECTION_SECONDS",
+        default=30.0,
+        cast=float
+    )
+    LLM_ENDPOINT_MAX_EJECTION_SECONDS : float = config(
+        "LLM_ENDPOINT_MAX_EJECTION_SECONDS",
+        default=300.0,
+        cast=float
+    )
+    # consecutive successes after which a re-admitted endpoint counts as healthy again (its next ejection starts from the base time)
+    LLM_ENDPOINT_HEALTHY_AFTER_SUCCESSES : int = config(
+        "LLM_ENDPOINT_HEALTHY_AFTER_SUCCESSES",
+        default=20,
+        cast=int
+    )
+
+    # ---------------------------------------------------------------------------------------------------------------------------------
+    # PER AGENT SERIALIZATION RELATED CONFIGURATIONS (postgres advisory lock per agent_id, shared by every worker)
+    # ---------------------------------------------------------------------------------------------------------------------------------
+    AGENT_SERIALIZATION_ENABLED : bool = config(
+        "AGENT_SERIALIZATION_ENABLED",
+        default=True,
+        cast=bool
+    )
+    # how long a prompt waits for the previous prompt of the same agent before it is answered with 429
+    AGENT_LOCK_WAIT_TIMEOUT_SECONDS : float = config(
+        "AGENT_LOCK_WAIT_TIMEOUT_SECONDS",
+        default=25.0,
+        cast=float
+    )
+
+    # ---------------------------------------------------------------------------------------------------------------------------------
+    # ADMISSION CONTROL RELATED CONFIGURATIONS (load shedding on the prompt endpoints, 503 + Retry-After past any threshold)
+    # ---------------------------------------------------------------------------------------------------------------------------------
+    ADMISSION_CONTROL_ENABLED : bool = config(
+        "ADMISSION_CONTROL_ENABLED",
+        default=True,
+        cast=bool
+    )
+    # prompt requests being processed by this worker
+    ADMISSION_MAX_IN_FLIGHT : int = config(
+        "ADMISSION_MAX_IN_FLIGHT",
+        default=256,
+        cast=int
+    )
+    # calls waiting for an upstream slot while every slot is busy
+    ADMISSION_MAX_UPSTREAM_QUEUE : int = config(
+        "ADMISSION_MAX_UPSTREAM_QUEUE",
+        default=32,
+        cast=int
+    )
+    # recent wait for a database connection from the pool
+    ADMISSION_MAX_DB_POOL_WAIT_MS : float = config(
+        "ADMISSION_MAX_DB_POOL_WAIT_MS",
+        default=250.0,
+        cast=float
+    )
+    ADMISSION_MAX_EVENT_LOOP_LAG_MS : float = config(
+        "ADMISSION_MAX_EVENT_LOOP_LAG_MS",
+        default=200.0,
+        cast=float
+    )
+    ADMISSION_RETRY_AFTER_SECONDS : float = config(
+        "ADMISSION_RETRY_AFTER_SECONDS",
+        default=2.0,
+        cast=float
+    )
+
+    # ---------------------------------------------------------------------------------------------------------------------------------
+    # REQUEST DEADLINE RELATED CONFIGURATIONS (X-Request-Timeout header > agent request_timeout_seconds > default)
+    # ---------------------------------------------------------------------------------------------------------------------------------
+    # budget of a prompt request when neither the caller nor the agent sets one, 0 = only the max below applies
+    LLM_REQUEST_TIMEOUT_SECONDS : float = config(
+        "LLM_REQUEST_TIMEOUT_SECONDS",
+        default=60.0,
+        cast=float
+    )
+    # upper bound for any budget (header, agent or default), 0 = no upper bound
+    LLM_REQUEST_MAX_TIMEOUT_SECONDS : float = config(
+        "LLM_REQUEST_MAX_TIMEOUT_SECONDS",
+        default=300.0,
+        cast=float
+    )
+
+    # ---------------------------------------------------------------------------------------------------------------------------------
+    # CLIENT DISCONNECT RELATED CONFIGURATIONS
+    # ---------------------------------------------------------------------------------------------------------------------------------
+    # cancel the upstream call (and any pending retry) of a prompt request whose client went away
+    CANCEL_ON_CLIENT_DISCONNECT : bool = config(
+        "CANCEL_ON_CLIENT_DISCONNECT",
+        default=True,
+        cast=bool
+    )
+
+    # ---------------------------------------------------------------------------------------------------------------------------------
+    # MODEL FALLBACK RELATED CONFIGURATIONS
+    # ---------------------------------------------------------------------------------------------------------------------------------
+    # route an agent to the next model of its fallback chain while its own model misses the slo below
+    LLM_MODEL_FALLBACK_ENABLED : bool = config(
+        "LLM_MODEL_FALLBACK_ENABLED",
+        default=True,
+        cast=bool
+    )
+    # fallback chain per model for agents without their own fallback_models (JSON: model -> [fallback models])
+    LLM_MODEL_FALLBACKS : str = config(
+        "LLM_MODEL_FALLBACKS",
+        default="{}",
+        cast=str
+    )
+    # context window budget (tokens) per model (JSON: model -> tokens), models that are not listed use 3000
+    LLM_MODEL_CONTEXT_TOKENS : str = config(
+        "LLM_MODEL_CONTEXT_TOKENS",
+        default="{}",
+        cast=str
+    )
+    # sliding window of upstream calls the slo is checked on
+    LLM_MODEL_HEALTH_WINDOW_SECONDS : float = config(
+        "LLM_MODEL_HEALTH_WINDOW_SECONDS",
+        default=60.0,
+        cast=float
+    )
+    # no decision (degrade / recover) on fewer calls than this
+    LLM_MODEL_HEALTH_MIN_SAMPLES : int = config(
+        "LLM_MODEL_HEALTH_MIN_SAMPLES",
+        default=10,
+        cast=int
+    )
+    # p95 latency of a successful upstream call above this degrades the model
+    LLM_MODEL_SLO_P95_SECONDS : float = config(
+        "LLM_MODEL_SLO_P95_SECONDS",
+        default=30.0,
+        cast=float
+    )
+    # share of failed upstream calls (5xx, 429, timeouts, transport errors) above this degrades the model
+    LLM_MODEL_SLO_ERROR_RATE : float = config(
+        "LLM_MODEL_SLO_ERROR_RATE",
+        default=0.25,
+        cast=float
+    )
+    # a degraded model is used again after this long at the earliest
+    LLM_MODEL_FALLBACK_MIN_SECONDS : float = config(
+        "LLM_MODEL_FALLBACK_MIN_SECONDS",
+        default=30.0,
+        cast=float
+    )
+    # share of requests still sent to a degraded model to find out when it recovered
+    LLM_MODEL_FALLBACK_PROBE_RATIO : float = config(
+        "LLM_MODEL_FALLBACK_PROBE_RATIO",
+        default=0.05,
+        cast=float
+    )
+
+    # ---------------------------------------------------------------------------------------------------------------------------------
+    # GENERATION LIMITS RELATED CONFIGURATIONS
+    # ---------------------------------------------------------------------------------------------------------------------------------
+    # max_tokens sent upstream for agents without max_output_tokens, also the part of the context window kept free for the answer
+    LLM_DEFAULT_MAX_OUTPUT_TOKENS : int = config(
+        "LLM_DEFAULT_MAX_OUTPUT_TOKENS",
+        default=800,
+        cast=int
+    )
+    # hard cap on the answer length whatever the agent asks for
+    LLM_MAX_OUTPUT_TOKENS : int = config(
+        "LLM_MAX_OUTPUT_TOKENS",
+        default=2048,
+        cast=int
+    )
+    # hard cap on the wall time of one generation, a stream is cut off (truncated) and a blocking call fails with 504 (0 = no cap)
+    LLM_MAX_GENERATION_SECONDS : float = config(
+        "LLM_MAX_GENERATION_SECONDS",
+        default=120.0,
+        cast=float
+    )
+
+    # ---------------------------------------------------------------------------------------------------------------------------------
+    # ADAPTIVE TIMEOUT RELATED CONFIGURATIONS
+    # ---------------------------------------------------------------------------------------------------------------------------------
+    # learn the read timeout per model from its observed latency instead of using HF_READ_TIMEOUT_SECONDS for every model
+    LLM_ADAPTIVE_TIMEOUT_ENABLED : bool = config(
+        "LLM_ADAPTIVE_TIMEOUT_ENABLED",
+        default=True,
+        cast=bool
+    )
+    # latency quantile the timeout is derived from
+    LLM_ADAPTIVE_TIMEOUT_QUANTILE : float = config(
+        "LLM_ADAPTIVE_TIMEOUT_QUANTILE",
+        default=0.999,
+        cast=float
+    )
+    # headroom on top of the quantile
+    LLM_ADAPTIVE_TIMEOUT_FACTOR : float = config(
+        "LLM_ADAPTIVE_TIMEOUT_FACTOR",
+        default=2.0,
+        cast=float
+    )
+    LLM_ADAPTIVE_TIMEOUT_MIN_SECONDS : float = config(
+        "LLM_ADAPTIVE_TIMEOUT_MIN_SECONDS",
+        default=5.0,
+        cast=float
+    )
+    LLM_ADAPTIVE_TIMEOUT_MAX_SECONDS : float = config(
+        "LLM_ADAPTIVE_TIMEOUT_MAX_SECONDS",
+        default=300.0,
+        cast=float
+    )
+    # latency samples kept per model (rolling window)
+    LLM_ADAPTIVE_TIMEOUT_WINDOW : int = config(
+        "LLM_ADAPTIVE_TIMEOUT_WINDOW",
+        default=1000,
+        cast=int
+    )
+    # HF_READ_TIMEOUT_SECONDS is used until a model has this many samples
+    LLM_ADAPTIVE_TIMEOUT_MIN_SAMPLES : int = config(
+        "LLM_ADAPTIVE_TIMEOUT_MIN_SAMPLES",
+        default=50,
+        cast=int
+    )
+
+    # ---------------------------------------------------------------------------------------------------------------------------------
+    # AGENT CONTEXT RELATED CONFIGURATIONS (system prompt, tools and history loaded in one query per prompt)
+    # ---------------------------------------------------------------------------------------------------------------------------------
+    # (user prompt, llm response) turns read per history chunk, newest first. The first chunk comes with the agent context,
+    # the next ones (keyset on created_at, id) are only read while the context window still has room
+    LLM_CONTEXT_HISTORY_CHUNK_TURNS : int = config(
+        "LLM_CONTEXT_HISTORY_CHUNK_TURNS",
+        default=32,
+        cast=int
+    )
+
+    # ---------------------------------------------------------------------------------------------------------------------------------
+    # ASYNC JOB QUEUE RELATED CONFIGURATIONS (POST /process/hugging_face/jobs, processed by workers started in the app lifespan)
+    # ---------------------------------------------------------------------------------------------------------------------------------
+    LLM_JOB_QUEUE_ENABLED : bool = config(
+        "LLM_JOB_QUEUE_ENABLED",
+        default=True,
+        cast=bool
+    )
+    LLM_JOB_WORKERS : int = config(
+        "LLM_JOB_WORKERS",
+        default=4,
+        cast=int
+    )
+    LLM_JOB_POLL_INTERVAL_SECONDS : float = config(
+        "LLM_JOB_POLL_INTERVAL_SECONDS",
+        default=1.5,
+        cast=float
+    )
+    # a claimed job becomes visible to other workers again if its worker stops renewing the lease for this long
+    LLM_JOB_VISIBILITY_TIMEOUT_SECONDS : float = config(
+        "LLM_JOB_VISIBILITY_TIMEOUT_SECONDS",
+        default=90.0,
+        cast=float
+    )
+    LLM_JOB_MAX_ATTEMPTS : int = config(
+        "LLM_JOB_MAX_ATTEMPTS",
+        default=4,
+        cast=int
+    )
+    LLM_JOB_RETRY_BASE_DELAY_SECONDS : float = config(
+        "LLM_JOB_RETRY_BASE_DELAY_SECONDS",
+        default=15.0,
+        cast=float
+    )
@@ -0,0 +1,292 @@
+from fastapi import HTTPException, status
+
+from app.models.api_request_response_model.response_models import APIResponse
+
+# import success messages
+from app.utils.success_messages import DiagnosticsApiSuccessMessage
+
+# import services
+from app.services.hugging_face_http_client import HuggingFaceHTTPClient
+from app.services.llm_response_cache import LLMResponseCache
+from app.services.llm_single_flight import LLMSingleFlight
+from app.services.circuit_breaker import CircuitBreakerRegistry
+from app.services.adaptive_concurrency_limiter import AdaptiveConcurrencyLimiter
+from app.services.rate_limiter import RateLimiterService
+from app.services.retry_policy import RetryPolicy
+from app.services.request_hedger import RequestHedger
+from app.services.endpoint_balancer import EndpointBalancer
+from app.services.llm_job_queue import LLMJobWorkerPool
+from app.services.agent_lock import AgentLock
+from app.services.admission_controller import AdmissionController
+from app.services.request_deadline import RequestDeadline
+from app.services.request_cancellation import RequestCancellation
+from app.services.model_fallback import ModelFallback
+from app.services.adaptive_timeout import AdaptiveTimeout
+from app.services.request_body_encoder import RequestBodyEncoder
+
+# import logging utility
+from app.utils.logger import LoggerFactory
+
+# initialize logging utility
+info_logger = LoggerFactory.get_info_logger()
+error_logger = LoggerFactory.get_error_logger()
+debug_logger = LoggerFactory.get_debug_logger()
+
+class DiagnosticsController:
+    def __init__(self, http_client: HuggingFaceHTTPClient):
+        self.http_client = http_client
+
+    def get_hugging_face_http_pool_stats(self) -> APIResponse:
+        try:
+            info_logger.info(f"DiagnosticsController.get_hugging_face_http_pool_stats | Get hugging face http connection pool stats")
+            return APIResponse(
+                status = status.HTTP_200_OK,
+                message = DiagnosticsApiSuccessMessage.HF_HTTP_POOL_STATS_FETCHED.value,
+                data = self.http_client.get_pool_stats()
+            )
+        except Exception as e:
+            error_logger.error(f"DiagnosticsController.get_hugging_face_http_pool_stats | {str(e)}")
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=str(e)
+            )
+
+    def get_llm_response_cache_stats(self) -> APIResponse:
+        try:
+            info_logger.info(f"DiagnosticsController.get_llm_response_cache_stats | Get llm response cache stats")
+            return APIResponse(
+                status = status.HTTP_200_OK,
+                message = DiagnosticsApiSuccessMessage.LLM_RESPONSE_CACHE_STATS_FETCHED.value,
+                data = LLMResponseCache.stats()
+            )
+        except Exception as e:
+            error_logger.error(f"DiagnosticsController.get_llm_response_cache_stats | {str(e)}")
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=str(e)
+            )
+
+    def get_llm_single_flight_stats(self) -> APIResponse:
+        try:
+            info_logger.info(f"DiagnosticsController.get_llm_single_flight_stats | Get llm single flight stats")
+            return APIResponse(
+                status = status.HTTP_200_OK,
+                message = DiagnosticsApiSuccessMessage.LLM_SINGLE_FLIGHT_STATS_FETCHED.value,
+                data = LLMSingleFlight.stats()
+            )
+        except Exception as e:
+            error_logger.error(f"DiagnosticsController.get_llm_single_flight_stats | {str(e)}")
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=str(e)
+            )
+
+    def get_circuit_breaker_states(self) -> APIResponse:
+        try:
+            info_logger.info(f"DiagnosticsController.get_circuit_breaker_states | Get circuit breaker states")
+            return APIResponse(
+                status = status.HTTP_200_OK,
+                message = DiagnosticsApiSuccessMessage.CIRCUIT_BREAKER_STATES_FETCHED.value,
+                data = CircuitBreakerRegistry.snapshot_all()
+            )
+        except Exception as e:
+            error_logger.error(f"DiagnosticsController.get_circuit_breaker_states | {str(e)}")
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=str(e)
+            )
+
+    def get_llm_concurrency_limiter_stats(self) -> APIResponse:
+        try:
+            info_logger.info(f"DiagnosticsController.get_llm_concurrency_limiter_stats | Get llm concurrency limiter stats")
+            return APIResponse(
+                status = status.HTTP_200_OK,
+                message = DiagnosticsApiSuccessMessage.LLM_CONCURRENCY_LIMITER_STATS_FETCHED.value,
+                data = AdaptiveConcurrencyLimiter.stats()
+            )
+        except Exception as e:
+            error_logger.error(f"DiagnosticsController.get_llm_concurrency_limiter_stats | {str(e)}")
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=str(e)
+            )
+
+    def get_rate_limiter_stats(self) -> APIResponse:
+        try:
+            info_logger.info(f"DiagnosticsController.get_rate_limiter_stats | Get rate limiter stats")
+            return APIResponse(
+                status = status.HTTP_200_OK,
+                message = DiagnosticsApiSuccessMessage.RATE_LIMITER_STATS_FETCHED.value,
+                data = RateLimiterService.stats()
+            )
+        except Exception as e:
+            error_logger.error(f"DiagnosticsController.get_rate_limiter_stats | {str(e)}")
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=str(e)
+            )
+
+    def get_llm_retry_stats(self) -> APIResponse:
+        try:
+            info_logger.info(f"DiagnosticsController.get_llm_retry_stats | Get llm retry stats")
+            return APIResponse(
+                status = status.HTTP_200_OK,
+                message = DiagnosticsApiSuccessMessage.LLM_RETRY_STATS_FETCHED.value,
+                data = RetryPolicy.stats()
+            )
+        except Exception as e:
+            error_logger.error(f"DiagnosticsController.get_llm_retry_stats | {str(e)}")
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=str(e)
+            )
+
+    def get_llm_hedging_stats(self) -> APIResponse:
+        try:
+            info_logger.info(f"DiagnosticsController.get_llm_hedging_stats | Get llm hedging stats")
+            return APIResponse(
+                status = status.HTTP_200_OK,
+                message = DiagnosticsApiSuccessMessage.LLM_HEDGING_STATS_FETCHED.value,
+                data = RequestHedger.stats()
+            )
+        except Exception as e:
+            error_logger.error(f"DiagnosticsController.get_llm_hedging_stats | {str(e)}")
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=str(e)
+            )
+
+    def get_llm_endpoint_stats(self) -> APIResponse:
+        try:
+            info_logger.info(f"DiagnosticsController.get_llm_endpoint_stats | Get llm endpoint stats")
+            return APIResponse(
+                status = status.HTTP_200_OK,
+                message = DiagnosticsApiSuccessMessage.LLM_ENDPOINT_STATS_FETCHED.value,
+                data = EndpointBalancer.stats()
+            )
+        except Exception as e:
+            error_logger.error(f"DiagnosticsController.get_llm_endpoint_stats | {str(e)}")
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=str(e)
+            )
+
+    def get_llm_job_queue_stats(self) -> APIResponse:
+        try:
+            info_logger.info(f"DiagnosticsController.get_llm_job_queue_stats | Get llm job queue stats")
+            return APIResponse(
+                status = status.HTTP_200_OK,
+                message = DiagnosticsApiSuccessMessage.LLM_JOB_QUEUE_STATS_FETCHED.value,
+                data = LLMJobWorkerPool.stats()
+            )
+        except Exception as e:
+            error_logger.error(f"DiagnosticsController.get_llm_job_queue_stats | {str(e)}")
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=str(e)
+            )
+
+    def get_agent_lock_stats(self) -> APIResponse:
+        try:
+            info_logger.info(f"DiagnosticsController.get_agent_lock_stats | Get agent lock stats")
+            return APIResponse(
+                status = status.HTTP_200_OK,
+                message = DiagnosticsApiSuccessMessage.AGENT_LOCK_STATS_FETCHED.value,
+                data = AgentLock.stats()
+            )
+        except Exception as e:
+            error_logger.error(f"DiagnosticsController.get_agent_lock_stats | {str(e)}")
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=str(e)
+            )
+
+    def get_admission_control_stats(self) -> APIResponse:
+        try:
+            info_logger.info(f"DiagnosticsController.get_admission_control_stats | Get admission control stats")
+            return APIResponse(
+                status = status.HTTP_200_OK,
+                message = DiagnosticsApiSuccessMessage.ADMISSION_CONTROL_STATS_FETCHED.value,
+                data = AdmissionController.stats()
+            )
+        except Exception as e:
+            error_logger.error(f"DiagnosticsController.get_admission_control_stats | {str(e)}")
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=str(e)
+            )
+
+    def get_request_deadline_stats(self) -> APIResponse:
+        try:
+            info_logger.info(f"DiagnosticsController.get_request_deadline_stats | Get request deadline stats")
+            return APIResponse(
+                status = status.HTTP_200_OK,
+                message = DiagnosticsApiSuccessMessage.REQUEST_DEADLINE_STATS_FETCHED.value,
+                data = RequestDeadline.stats()
+            )
+        except Exception as e:
+            error_logger.error(f"DiagnosticsController.get_request_deadline_stats | {str(e)}")
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=str(e)
+            )
+
+    def get_request_cancellation_stats(self) -> APIResponse:
+        try:
+            info_logger.info(f"DiagnosticsController.get_request_cancellation_stats | Get request cancellation stats")
+            return APIResponse(
+                status = status.HTTP_200_OK,
+                message = DiagnosticsApiSuccessMessage.REQUEST_CANCELLATION_STATS_FETCHED.value,
+                data = RequestCancellation.stats()
+            )
+        except Exception as e:
+            error_logger.error(f"DiagnosticsController.get_request_cancellation_stats | {str(e)}")
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=str(e)
+            )
+
+    def get_model_fallback_stats(self) -> APIResponse:
+        try:
+            info_logger.info(f"DiagnosticsController.get_model_fallback_stats | Get model fallback stats")
+            return APIResponse(
+                status = status.HTTP_200_OK,
+                message = DiagnosticsApiSuccessMessage.MODEL_FALLBACK_STATS_FETCHED.value,
+                data = ModelFallback.stats()
+            )
+        except Exception as e:
+            error_logger.error(f"DiagnosticsController.get_model_fallback_stats | {str(e)}")
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=str(e)
+            )
+
+    def get_adaptive_timeout_stats(self) -> APIResponse:
+        try:
+            info_logger.info(f"DiagnosticsController.get_adaptive_timeout_stats | Get adaptive timeout stats")
+            return APIResponse(
+                status = status.HTTP_200_OK,
+                message = DiagnosticsApiSuccessMessage.ADAPTIVE_TIMEOUT_STATS_FETCHED.value,
+                data = AdaptiveTimeout.stats()
+            )
+        except Exception as e:
+            error_logger.error(f"DiagnosticsController.get_adaptive_timeout_stats | {str(e)}")
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=str(e)
+            )
+
+    def get_request_body_encoder_stats(self) -> APIResponse:
+        try:
+            info_logger.info(f"DiagnosticsController.get_request_body_encoder_stats | Get request body encoder stats")
+            return APIResponse(
+                status = status.HTTP_200_OK,
+                message = DiagnosticsApiSuccessMessage.REQUEST_BODY_ENCODER_STATS_FETCHED.value,
+                data = RequestBodyEncoder.stats()
+            )
+        except Exception as e:
+            error_logger.error(f"DiagnosticsController.get_request_body_encoder_stats | {str(e)}")
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=str(e)
+            )
@@ -1,9 +1,12 @@
-from fastapi import HTTPException, status, BackgroundTasks
+from fastapi import HTTPException, status, BackgroundTasks, Request
+from fastapi.responses import StreamingResponse
+
+import math
 
 from app.models.api_request_response_model.response_models import (APIResponse, APIResponseMultipleData)
 
 # import common success and error messages
-from app.utils.error_messages import PromptApiErrorMessages
+from app.utils.error_messages import PromptApiErrorMessages, HuggingFaceAIModelAPIErrorMessage
 from app.utils.success_messages import HuggingFaceAIModelAPISuccessMessage
 
 # load hugging face ai model list
@@ -14,12 +17,17 @@ from app.utils.logger import LoggerFactory
 
 # import services
 from app.services.process_hugging_face_ai_prompt import ProcessHuggingFaceAIPromptService
+from app.services.hugging_face_http_client import HuggingFaceHTTPClient
+from app.services.llm_job_queue import LLMJobQueueService
+from app.services.request_deadline import RequestDeadline
+from app.services.request_cancellation import RequestCancellation, ClientDisconnectedError, CLIENT_CLOSED_REQUEST
 
 # load project configurations
 from app.configs.config import ProjectConfigurations
 
 # db orm related imports
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
 # initialize logging utility
 info_logger = LoggerFactory.get_info_logger()
@@ -28,9 +36,26 @@ debug_logger = LoggerFactory.get_debug_logger()
 
 class HuggingFaceAIModelController:
 
-    def __init__(self, db: Session):
+    def __init__(self, db: Session, http_client: HuggingFaceHTTPClient, async_db: AsyncSession = None):
         self.db = db
-        self.process_prompt_service_obj = ProcessHuggingFaceAIPromptService(hugging_face_auth_token=ProjectConfigurations.HUGGING_FACE_AUTH_TOKEN.value,HF_API_URL = ProjectConfigurations.HF_API_URL.value, db=db)
+        self.async_db = async_db
+        self.process_prompt_service_obj = ProcessHuggingFaceAIPromptService(hugging_face_auth_token=ProjectConfigurations.HUGGING_FACE_AUTH_TOKEN.value,HF_API_URL = ProjectConfigurations.HF_API_URL.value, db=db, http_client=http_client, async_db=async_db)
+        self.job_queue_service_obj = LLMJobQueueService(db=db)
+
+    @staticmethod
+    def _raise_if_retry_later(result) -> None:
+        """
+        Overload / fail fast responses (429, 503) carry retry_after_seconds and are returned as real http errors
+        with a Retry-After header so that clients and load balancers back off.
+        """
+        retry_after_seconds = (result.data or {}).get("retry_after_seconds") if isinstance(result.data, dict) else None
+        if retry_after_seconds is None:
+            return
+        raise HTTPException(
+            status_code=result.status_code,
+            detail=result.message,
+            headers={"Retry-After": str(max(1, math.ceil(retry_after_seconds)))}
+        )
 
     def get_models(self) -> APIResponse:
         try:
@@ -52,11 +77,18 @@ class HuggingFaceAIModelController:
                 detail=str(e)
             )
     
-    async def process_hugging_face_prompt_request(self, request) -> APIResponse:
+    async def process_hugging_face_prompt_request(self, request, bypass_cache : bool = False, priority_lane : str = None, request_timeout_seconds : float = None, http_request : Request = None) -> APIResponse:
         try:
+            deadline = RequestDeadline.start(timeout_seconds=request_timeout_seconds)
             info_logger.info(f"HuggingFaceAIModelController.process_hugging_face_prompt_request | Started to process user prompt | user_prompt = {request.user_prompt}")
-            result = await self.process_prompt_service_obj.process_user_prompt_llm(request=request) 
+            # the upstream call is cancelled if the client disconnects meanwhile
+            result = await RequestCancellation.run(
+                http_request,
+                self.process_prompt_service_obj.process_user_prompt_llm(request=request, bypass_cache=bypass_cache, priority_lane=priority_lane, deadline=deadline),
+                endpoint="user_prompt"
+            )
             if not result.status:
+                self._raise_if_retry_later(result)
                 return APIResponse(
                     status=result.status_code,
                     message=result.message
@@ -66,6 +98,12 @@ class HuggingFaceAIModelController:
                 message = result.message,
                 data=result.data
             )
+        except ClientDisconnectedError:
+            # nobody reads this response, it only shows up in the access log
+            raise HTTPException(
+                status_code=CLIENT_CLOSED_REQUEST,
+                detail=HuggingFaceAIModelAPIErrorMessage.LLM_CLIENT_DISCONNECTED.value
+            )
         except HTTPException:
             raise
         except Exception as e:
@@ -75,6 +113,81 @@ class HuggingFaceAIModelController:
                 detail=str(e)
             )
         
+    async def process_hugging_face_prompt_stream_request(self, request, priority_lane : str = None, request_timeout_seconds : float = None) -> StreamingResponse:
+        try:
+            deadline = RequestDeadline.start(timeout_seconds=request_timeout_seconds)
+            info_logger.info(f"HuggingFaceAIModelController.process_hugging_face_prompt_stream_request | Started to stream user prompt | user_prompt = {request.user_prompt}")
+            result = await self.process_prompt_service_obj.prepare_user_prompt_llm_stream(request=request, priority_lane=priority_lane, deadline=deadline)
+            if not result.status:
+                self._raise_if_retry_later(result)
+                raise HTTPException(
+                    status_code=result.status_code,
+                    detail=result.message
+                )
+            return StreamingResponse(
+                result.data["events"],
+                media_type="text/event-stream",
+                headers={
+                    "Cache-Control": "no-cache",
+                    # stop reverse proxies (nginx) from buffering the stream
+                    "X-Accel-Buffering": "no"
+                }
+            )
+        except HTTPException:
+            raise
+        except Exception as e:
+            error_logger.error(f"HuggingFaceAIModelController.process_hugging_face_prompt_stream_request | {str(e)}")
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=str(e)
+            )
+
+    def submit_prompt_job(self, request) -> APIResponse:
+        try:
+            info_logger.info(f"HuggingFaceAIModelController.submit_prompt_job | Queue user prompt job | agent_id = {request.agent_id}")
+            result = self.job_queue_service_obj.submit(request=request)
+            if not result.status:
+                raise HTTPException(
+                    status_code=result.status_code,
+                    detail=result.message
+                )
+            return APIResponse(
+                status = status.HTTP_202_ACCEPTED,
+                message = result.message,
+                data=result.data
+            )
+        except HTTPException:
+            raise
+        except Exception as e:
+            error_logger.error(f"HuggingFaceAIModelController.submit_prompt_job | {str(e)}")
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=str(e)
+            )
+
+    def get_prompt_job(self, job_id: str) -> APIResponse:
+        try:
+            info_logger.info(f"HuggingFaceAIModelController.get_prompt_job | Get user prompt job | job_id = {job_id}")
+            result = self.job_queue_service_obj.get(job_id=job_id)
+            if not result.status:
+                raise HTTPException(
+                    status_code=result.status_code,
+                    detail=result.message
+                )
+            return APIResponse(
+                status = status.HTTP_200_OK,
+                message = result.message,
+                data=result.data
+            )
+        except HTTPException:
+            raise
+        except Exception as e:
+            error_logger.error(f"HuggingFaceAIModelController.get_prompt_job | {str(e)}")
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=str(e)
+            )
+
     def reset_huggingface_model_context(self,request) -> APIResponse:
         try:
             info_logger.info(f"HuggingFaceAIModelController.reset_huggingface_model_context | Reset ai agent context | agent_id = {request.agent_id}")
@@ -107,7 +107,7 @@ class PromptController:
             if operation_type == DbRecordLevelOperationType.INSERT.value:
                 info_logger.info(f"PromptController.process_system_prompt | insert agent name in the database")
                 with self.db.begin():
-                    result = self.system_prompt_repo.insert(agent_id = request.agent_id, ai_model=request.ai_model,system_prompt = request.system_prompt)
+                    result = self.system_prompt_repo.insert(agent_id = request.agent_id, ai_model=request.ai_model,system_prompt = request.system_prompt, response_cache_ttl_seconds=request.response_cache_ttl_seconds, priority_lane=request.priority_lane, request_timeout_seconds=request.request_timeout_seconds, fallback_models=request.fallback_models, max_output_tokens=request.max_output_tokens, temperature=request.temperature, stop_sequences=request.stop_sequences)
                 if not result.status:
                     error_logger.error(f"PromptController.process_system_prompt | error = {result.message}")
                     raise HTTPException(
@@ -121,7 +121,14 @@ class PromptController:
                     result = self.system_prompt_repo.update(
                         agent_id=request.agent_id,
                         ai_model=request.ai_model, 
-                        system_prompt=request.system_prompt
+                        system_prompt=request.system_prompt,
+                        response_cache_ttl_seconds=request.response_cache_ttl_seconds,
+                        priority_lane=request.priority_lane,
+                        request_timeout_seconds=request.request_timeout_seconds,
+                        fallback_models=request.fallback_models,
+                        max_output_tokens=request.max_output_tokens,
+                        temperature=request.temperature,
+                        stop_sequences=request.stop_sequences
                     )
                 if not result.status:
                     error_logger.error(f"PromptController.process_system_prompt | operation_type = {operation_type} | error = {result.message}")
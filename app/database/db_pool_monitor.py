@@ -0,0 +1,106 @@
+import itertools
+import threading
+import time
+from collections import deque
+
+from sqlalchemy.pool import QueuePool, AsyncAdaptedQueuePool
+
+"""
+Measures how long callers wait to check a connection out of the request pool.
+Used as an overload signal by the admission control (app/services/admission_controller.py).
+"""
+
+class DBPoolMonitor:
+    # only waits from the last few seconds count, an old spike must not keep shedding load
+    _window_seconds = 5.0
+
+    _lock = threading.Lock()
+    # (finished_at, wait_seconds)
+    _samples: "deque[tuple[float, float]]" = deque(maxlen=2000)
+    # wait id -> started waiting at, for checkouts that are still blocked
+    # (not keyed by thread, the checkouts of the async pool all wait on the event loop thread)
+    _waiting_since: dict[int, float] = {}
+    _wait_ids = itertools.count()
+    _counters = {
+        "checkouts": 0,
+        "checkout_failures": 0,
+    }
+
+    @classmethod
+    def start_wait(cls) -> int:
+        """
+        Returns the wait id to pass to end_wait().
+        """
+        with cls._lock:
+            wait_id = next(cls._wait_ids)
+            cls._waiting_since[wait_id] = time.monotonic()
+        return wait_id
+
+    @classmethod
+    def end_wait(cls, wait_id: int, failed: bool = False) -> None:
+        now = time.monotonic()
+        with cls._lock:
+            started_at = cls._waiting_since.pop(wait_id, now)
+            cls._samples.append((now, now - started_at))
+            cls._counters["checkouts"] += 1
+            if failed:
+                cls._counters["checkout_failures"] += 1
+
+    @classmethod
+    def recent_wait_seconds(cls) -> float:
+        """
+        p90 of the checkout waits of the last few seconds, or the age of the oldest checkout still blocked if that is longer.
+        """
+        now = time.monotonic()
+        with cls._lock:
+            waits = sorted(wait for finished_at, wait in cls._samples if now - finished_at <= cls._window_seconds)
+            oldest_waiter = min(cls._waiting_since.values(), default=None)
+        recent = waits[min(len(waits) - 1, int(0.9 * len(waits)))] if waits else 0.0
+        blocked = now - oldest_waiter if oldest_waiter is not None else 0.0
+        return max(recent, blocked)
+
+    @staticmethod
+    def _pool_stats(pool) -> dict:
+        return {
+            "pool_size": pool.size(),
+            "checked_out": pool.checkedout(),
+            "overflow": pool.overflow(),
+        }
+
+    @classmethod
+    def stats(cls, pool=None, async_pool=None) -> dict:
+        data = {
+            **cls._counters,
+            "waiting_now": len(cls._waiting_since),
+            "recent_wait_ms": round(cls.recent_wait_seconds() * 1000, 2),
+        }
+        if pool is not None:
+            data.update(cls._pool_stats(pool))
+        if async_pool is not None:
+            data["async_pool"] = cls._pool_stats(async_pool)
+        return data
+
+class _TimedCheckout:
+    """
+    Reports every checkout wait of the pool it is mixed into to DBPoolMonitor.
+    """
+
+    def _do_get(self):
+        wait_id = DBPoolMonitor.start_wait()
+        failed = True
+        try:
+            connection = super()._do_get()
+            failed = False
+            return connection
+        finally:
+            DBPoolMonitor.end_wait(wait_id, failed=failed)
+
+class TimedQueuePool(_TimedCheckout, QueuePool):
+    """
+    QueuePool of the sync engine that reports every checkout wait to DBPoolMonitor.
+    """
+
+class TimedAsyncAdaptedQueuePool(_TimedCheckout, AsyncAdaptedQueuePool):
+    """
+    Pool of the async engine that reports every checkout wait to DBPoolMonitor.
+    """
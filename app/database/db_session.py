@@ -1,6 +1,8 @@
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
 from app.configs.config import ProjectConfigurations
+from app.database.db_pool_monitor import TimedQueuePool, TimedAsyncAdaptedQueuePool
 
 """
 This file will serve as a single source of database access through out the entire project
@@ -10,17 +12,47 @@ DATABASE_URL = ProjectConfigurations.DB_CONNECTION_STRING.value
 
 engine = create_engine(
     DATABASE_URL,
+    # checkout waits feed the admission control
+    poolclass=TimedQueuePool,
     pool_size=10,
     max_overflow=20,
     pool_pre_ping=True,
 )
 
+# Async engine for the prompt hot path (async routes), its queries never block the event loop.
+# psycopg 3 is async capable, the same postgresql+psycopg url gets its async driver here.
+async_engine = create_async_engine(
+    DATABASE_URL,
+    poolclass=TimedAsyncAdaptedQueuePool,
+    pool_size=int(ProjectConfigurations.DB_ASYNC_POOL_SIZE.value),
+    max_overflow=int(ProjectConfigurations.DB_ASYNC_MAX_OVERFLOW.value),
+    pool_pre_ping=True,
+)
+
+# Dedicated pool for the per agent advisory locks (see app/services/agent_lock.py).
+# A lock connection is held for a whole llm call so it must not take connections away from the request sessions,
+# there is one per upstream slot and a prompt waits for one as long as it would wait for a slot.
+advisory_lock_engine = create_engine(
+    DATABASE_URL,
+    pool_size=int(ProjectConfigurations.LLM_CONCURRENCY_MAX_LIMIT.value),
+    max_overflow=0,
+    pool_timeout=float(ProjectConfigurations.LLM_CONCURRENCY_QUEUE_TIMEOUT_SECONDS.value),
+    pool_pre_ping=True,
+)
+
 SessionLocal = sessionmaker(
     bind=engine,
     autoflush=False,
     autocommit=False
 )
 
+# rows are turned into dicts inside the transaction, nothing is lazy loaded after a commit
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine,
+    autoflush=False,
+    expire_on_commit=False
+)
+
 # This will get the database session
 def get_db():
     db = SessionLocal()
@@ -28,3 +60,8 @@ def get_db():
         yield db
     finally:
         db.close()
+
+# This will get the async database session (async routes)
+async def get_async_db():
+    async with AsyncSessionLocal() as async_db:
+        yield async_db
@@ -1,10 +1,35 @@
-from fastapi import Depends
+import math
+from fastapi import Depends, Request, HTTPException, status
 from sqlalchemy.orm import Session
-from app.database.db_session import get_db
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database.db_session import get_db, get_async_db
 from app.controllers.agent_controllers import AgentController
 from app.controllers.prompt_controllers import PromptController
 from app.controllers.hugging_face_ai_model_controllers import HuggingFaceAIModelController
 from app.controllers.ai_agent_tools_controller import AIAgentToolController
+from app.controllers.diagnostics_controller import DiagnosticsController
+from app.services.hugging_face_http_client import HuggingFaceHTTPClient
+from app.services.admission_controller import AdmissionController, AdmissionRejectedError
+from app.utils.error_messages import HuggingFaceAIModelAPIErrorMessage
+
+# This will get the process wide hugging face http client created in the app lifespan
+def get_hugging_face_http_client(request: Request) -> HuggingFaceHTTPClient:
+    return request.app.state.hf_http_client
+
+# Load shedding for the prompt endpoints, runs before the db session is opened so a rejected request costs almost nothing
+async def admit_prompt_request():
+    try:
+        AdmissionController.admit()
+    except AdmissionRejectedError as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=HuggingFaceAIModelAPIErrorMessage.LLM_SERVICE_OVERLOADED.value,
+            headers={"Retry-After": str(max(1, math.ceil(e.retry_after_seconds)))}
+        )
+    try:
+        yield
+    finally:
+        AdmissionController.release()
 
 def get_agent_controller(
     db: Session = Depends(get_db),
@@ -16,12 +41,20 @@ def get_prompt_controller(
 ) -> PromptController:
     return PromptController(db)
 
+# both sessions are lazy, a connection is only checked out by the one the endpoint uses
 def get_hugging_face_ai_model_controller(
     db: Session = Depends(get_db),
+    async_db: AsyncSession = Depends(get_async_db),
+    http_client: HuggingFaceHTTPClient = Depends(get_hugging_face_http_client),
 ) -> HuggingFaceAIModelController:
-    return HuggingFaceAIModelController(db)
+    return HuggingFaceAIModelController(db, http_client, async_db)
 
 def get_ai_agent_tool_controller(
     db: Session = Depends(get_db),
 ) -> AIAgentToolController:
     return AIAgentToolController(db)
+
+def get_diagnostics_controller(
+    http_client: HuggingFaceHTTPClient = Depends(get_hugging_face_http_client),
+) -> DiagnosticsController:
+    return DiagnosticsController(http_client)
@@ -1,3 +1,5 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI,status, Request, HTTPException
 from fastapi.responses import JSONResponse
 
@@ -6,6 +8,16 @@ from app.apis.prompt_apis import router as prompt_api_routers
 from app.apis.hugging_face_api import router as hugging_face_api_routers
 from app.apis.agent_api import router as agent_api_routers
 from app.apis.agent_tool_apis import router as agent_tools_api_routers
+from app.apis.diagnostics_api import router as diagnostics_api_routers
+
+# import app scoped services
+from app.services.hugging_face_http_client import HuggingFaceHTTPClient
+from app.services.llm_job_queue import LLMJobWorkerPool
+from app.services.admission_controller import AdmissionController
+from app.database.db_session import async_engine
+
+# load project configurations
+from app.configs.config import ProjectConfigurations
 
 # import logging utility
 from app.utils.logger import LoggerFactory
@@ -21,7 +33,33 @@ info_logger = LoggerFactory.get_info_logger()
 error_logger = LoggerFactory.get_error_logger()
 debug_logger = LoggerFactory.get_debug_logger()
 
-app = FastAPI(title = "Relevance Agentic AI")
+# Everything that must live exactly once per process is created and torn down here
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    hf_http_client = HuggingFaceHTTPClient(HF_API_URL=ProjectConfigurations.HF_API_URL.value)
+    await hf_http_client.start()
+    app.state.hf_http_client = hf_http_client
+    # samples the event loop lag used by the admission control
+    await AdmissionController.start()
+    # workers for POST /process/hugging_face/jobs, they share the http client above
+    llm_job_worker_pool = None
+    if ProjectConfigurations.LLM_JOB_QUEUE_ENABLED.value and int(ProjectConfigurations.LLM_JOB_WORKERS.value) > 0:
+        llm_job_worker_pool = LLMJobWorkerPool(http_client=hf_http_client)
+        await llm_job_worker_pool.start()
+    info_logger.info(f"lifespan | app scoped services started")
+    try:
+        yield
+    finally:
+        # stop the workers first, their running jobs go back to the queue
+        if llm_job_worker_pool is not None:
+            await llm_job_worker_pool.stop()
+        await hf_http_client.close()
+        await AdmissionController.stop()
+        # close the connections of the async pool on this event loop
+        await async_engine.dispose()
+        info_logger.info(f"lifespan | app scoped services stopped")
+
+app = FastAPI(title = "Relevance Agentic AI", lifespan=lifespan)
 
 # include custome routes here
 # ingest_data router
@@ -29,6 +67,7 @@ app.include_router(prompt_api_routers, prefix="/process")
 app.include_router(hugging_face_api_routers, prefix="/process")
 app.include_router(agent_api_routers, prefix="/process")
 app.include_router(agent_tools_api_routers, prefix="/process")
+app.include_router(diagnostics_api_routers, prefix="/process")
 
 # Global error exception response handler
 @app.exception_handler(HTTPException)
@@ -38,7 +77,9 @@ async def http_exception_handler(request: Request, exc: HTTPException):
         content={
             "status": exc.status_code,
             "error": exc.detail
-        }
+        },
+        # keep headers such as Retry-After
+        headers=getattr(exc, "headers", None)
     )
 
 # Test api
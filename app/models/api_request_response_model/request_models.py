@@ -1,7 +1,7 @@
 from pydantic import BaseModel, Field, model_validator
 from fastapi import HTTPException, status
 from typing import List, Dict, Any, Optional
-from app.utils.error_messages import (PromptApiErrorMessages, AIAgentToolApiErrorMessage, AgentApiErrorMessages)
+from app.utils.error_messages import (PromptApiErrorMessages, AIAgentToolApiErrorMessage, AgentApiErrorMessages, HuggingFaceAIModelAPIErrorMessage)
 from app.utils.field_descriptions import (SetAgentToolToAnAgentRequestFieldDescription, PromptRequestFieldDescriptions, AgentRequestFieldDescription, SystemPromptRequestFieldDescription)
 
 # import logging utility
@@ -10,6 +10,9 @@ from app.utils.logger import LoggerFactory
 # import info logger messages
 from app.utils.logger_info_messages import LoggerInfoMessages
 
+# priority lanes are defined by the upstream concurrency limiter
+from app.services.adaptive_concurrency_limiter import AdaptiveConcurrencyLimiter
+
 # initialize logging utility
 info_logger = LoggerFactory.get_info_logger()
 error_logger = LoggerFactory.get_error_logger()
@@ -39,6 +42,13 @@ class SystemPromptRequest(BaseModel):
     agent_id : str = Field(default_factory=None, description = SystemPromptRequestFieldDescription.AGENT_ID_MESSAGE.value)
     ai_model : Optional[str] = Field(default="meta-llama/Llama-3.1-8B-Instruct",description=PromptRequestFieldDescriptions.AI_MODEL.value)
     system_prompt : Optional[str] = Field(default_factory=None, description = SystemPromptRequestFieldDescription.SYSTEM_PROMPT_MESSAGE.value)
+    response_cache_ttl_seconds : Optional[int] = Field(default=None, ge=0, description = SystemPromptRequestFieldDescription.RESPONSE_CACHE_TTL_SECONDS.value)
+    priority_lane : Optional[str] = Field(default=None, description = SystemPromptRequestFieldDescription.PRIORITY_LANE.value)
+    request_timeout_seconds : Optional[int] = Field(default=None, gt=0, description = SystemPromptRequestFieldDescription.REQUEST_TIMEOUT_SECONDS.value)
+    fallback_models : Optional[List[str]] = Field(default=None, description = SystemPromptRequestFieldDescription.FALLBACK_MODELS.value)
+    max_output_tokens : Optional[int] = Field(default=None, gt=0, description = SystemPromptRequestFieldDescription.MAX_OUTPUT_TOKENS.value)
+    temperature : Optional[float] = Field(default=None, ge=0, le=2, description = SystemPromptRequestFieldDescription.TEMPERATURE.value)
+    stop_sequences : Optional[List[str]] = Field(default=None, max_length=4, description = SystemPromptRequestFieldDescription.STOP_SEQUENCES.value)
     @model_validator(mode="after")
     def validate_fields(self):
         if not self.agent_id:
@@ -47,6 +57,12 @@ class SystemPromptRequest(BaseModel):
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail=AgentApiErrorMessages.AI_AGENT_ID_EMPTY.value
             )
+        if self.priority_lane and not AdaptiveConcurrencyLimiter.is_lane(self.priority_lane):
+            error_logger.error(f"SystemPromptRequest.validate_fields | error = {HuggingFaceAIModelAPIErrorMessage.LLM_PRIORITY_LANE_INVALID.value.format(self.priority_lane, AdaptiveConcurrencyLimiter.lanes())}")
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=HuggingFaceAIModelAPIErrorMessage.LLM_PRIORITY_LANE_INVALID.value.format(self.priority_lane, ", ".join(AdaptiveConcurrencyLimiter.lanes()))
+            )
         return self
 
 # This is only used in get requests
@@ -0,0 +1,61 @@
+from sqlalchemy import BigInteger, Integer, Text, TIMESTAMP, Index, func
+from sqlalchemy.orm import Mapped, mapped_column
+from app.database.base import Base
+
+class LLMPromptJob(Base):
+    """
+    Queue of prompts submitted through POST /process/hugging_face/jobs.
+    status : queued -> running -> succeeded | failed (a running job whose lease expired is claimed again)
+    """
+    __tablename__ = "llm_prompt_job_table"
+    __table_args__ = (
+        # workers look for the oldest claimable job
+        Index("ix_llm_prompt_job_table_status_available_at", "status", "available_at"),
+    )
+
+    id: Mapped[int] = mapped_column(BigInteger, primary_key=True, autoincrement=True)
+    job_id: Mapped[str] = mapped_column(Text, nullable=False, unique=True)
+    ai_agent_id: Mapped[str] = mapped_column(Text, nullable=False)
+    user_prompt: Mapped[str] = mapped_column(Text, nullable=False)
+    status: Mapped[str] = mapped_column(Text, nullable=False, server_default="queued")
+    attempts: Mapped[int] = mapped_column(Integer, nullable=False, server_default="0")
+    max_attempts: Mapped[int] = mapped_column(Integer, nullable=False)
+    llm_prompt_response: Mapped[str | None] = mapped_column(Text, nullable=True)
+    error_status_code: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    error_message: Mapped[str | None] = mapped_column(Text, nullable=True)
+    # a queued job is not claimed before this time (used for retry back off)
+    available_at: Mapped[str] = mapped_column(
+        TIMESTAMP(timezone=True),
+        server_default=func.now(),
+        nullable=False
+    )
+    # lease of the worker that is running the job
+    locked_by: Mapped[str | None] = mapped_column(Text, nullable=True)
+    locked_until: Mapped[str | None] = mapped_column(TIMESTAMP(timezone=True), nullable=True)
+    finished_at: Mapped[str | None] = mapped_column(TIMESTAMP(timezone=True), nullable=True)
+
+    created_at: Mapped[str] = mapped_column(
+        TIMESTAMP(timezone=True),
+        server_default=func.now()
+    )
+    updated_at: Mapped[str] = mapped_column(
+        TIMESTAMP(timezone=True),
+        server_default=func.now(),
+        onupdate=func.now()
+    )
+    def to_dict(self) -> dict:
+        return {
+            "job_id": self.job_id,
+            "ai_agent_id": self.ai_agent_id,
+            "user_prompt": self.user_prompt,
+            "status": self.status,
+            "attempts": self.attempts,
+            "max_attempts": self.max_attempts,
+            "llm_prompt_response": self.llm_prompt_response,
+            "error_status_code": self.error_status_code,
+            "error_message": self.error_message,
+            "available_at": self.available_at,
+            "finished_at": self.finished_at,
+            "created_at": self.created_at,
+            "updated_at": self.updated_at,
+        }
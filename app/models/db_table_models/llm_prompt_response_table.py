@@ -1,14 +1,27 @@
-from sqlalchemy import BigInteger, Text, TIMESTAMP, func
+from sqlalchemy import BigInteger, Boolean, Text, TIMESTAMP, Index, func, false
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import Mapped, mapped_column
 from app.database.base import Base
 
 class LLMPromptResponseTable(Base):
     __tablename__ = "llm_prompt_response_table"
+    __table_args__ = (
+        # join of every history turn to its response
+        Index("ix_llm_prompt_response_table_llm_user_prompt_id", "llm_user_prompt_id"),
+        # reset_agent
+        Index("ix_llm_prompt_response_table_ai_agent_id", "ai_agent_id"),
+    )
 
     id: Mapped[int] = mapped_column(BigInteger, primary_key=True, autoincrement=True)
     llm_user_prompt_id: Mapped[int] = mapped_column(BigInteger, nullable=False, unique=False)
     llm_prompt_response : Mapped[str] = mapped_column(Text, nullable=False)
     ai_agent_id: Mapped[str] = mapped_column(Text, nullable=False)
+    # model that actually generated the response (the agent's model or one of its fallbacks), NULL for older rows
+    ai_model: Mapped[str | None] = mapped_column(Text, nullable=True)
+    # the answer was cut off by the output token or generation time cap
+    truncated: Mapped[bool] = mapped_column(Boolean, nullable=False, server_default=false())
+    # {model name: tokens of the text with that model's tokenizer}, filled at insert and backfilled while building context windows
+    token_counts: Mapped[dict | None] = mapped_column(JSONB, nullable=True)
 
     created_at: Mapped[str] = mapped_column(
         TIMESTAMP(timezone=True),
@@ -25,6 +38,9 @@ class LLMPromptResponseTable(Base):
             "llm_user_prompt_id": self.llm_user_prompt_id,
             "llm_prompt_response": self.llm_prompt_response,
             "ai_agent_id": self.ai_agent_id,
+            "ai_model": self.ai_model,
+            "truncated": self.truncated,
+            "token_counts": self.token_counts,
             "created_at": self.created_at,
             "updated_at": self.updated_at,
         }
@@ -0,0 +1,23 @@
+from sqlalchemy import Text, Float, TIMESTAMP, func
+from sqlalchemy.orm import Mapped, mapped_column
+from app.database.base import Base
+
+class RateLimitBucket(Base):
+    """
+    Shared token bucket state used when RATE_LIMIT_STORE=postgres (multi worker deployments)
+    """
+    __tablename__ = "rate_limit_bucket_table"
+
+    bucket_key: Mapped[str] = mapped_column(Text, primary_key=True)
+    tokens: Mapped[float] = mapped_column(Float, nullable=False)
+    updated_at: Mapped[str] = mapped_column(
+        TIMESTAMP(timezone=True),
+        server_default=func.now(),
+        nullable=False
+    )
+    def to_dict(self) -> dict:
+        return {
+            "bucket_key": self.bucket_key,
+            "tokens": self.tokens,
+            "updated_at": self.updated_at,
+        }
@@ -1,4 +1,5 @@
-from sqlalchemy import BigInteger, Text, TIMESTAMP, func
+from sqlalchemy import BigInteger, Float, Integer, Text, TIMESTAMP, func
+from sqlalchemy.dialects.postgresql import ARRAY
 from sqlalchemy.orm import Mapped, mapped_column
 from app.database.base import Base
 
@@ -9,6 +10,19 @@ class SystemPrompt(Base):
     llm_system_prompt: Mapped[str] = mapped_column(Text, nullable=False)
     ai_agent_id: Mapped[str] = mapped_column(Text, nullable=False, unique=True)
     ai_model : Mapped[str] = mapped_column(Text, nullable=False)
+    # opt-in exact match response cache, NULL / 0 means the agent is never cached
+    response_cache_ttl_seconds : Mapped[int | None] = mapped_column(Integer, nullable=True)
+    # priority lane of the upstream queue (see LLM_PRIORITY_LANES), NULL means LLM_PRIORITY_DEFAULT_LANE
+    priority_lane : Mapped[str | None] = mapped_column(Text, nullable=True)
+    # time budget of a prompt when the caller sends no X-Request-Timeout, NULL means LLM_REQUEST_TIMEOUT_SECONDS
+    request_timeout_seconds : Mapped[int | None] = mapped_column(Integer, nullable=True)
+    # models used (in this order) while ai_model misses its slo, NULL means LLM_MODEL_FALLBACKS
+    fallback_models : Mapped[list[str] | None] = mapped_column(ARRAY(Text), nullable=True)
+    # generation settings sent with every call, NULL max_output_tokens means LLM_DEFAULT_MAX_OUTPUT_TOKENS,
+    # NULL temperature / stop_sequences are not sent (model default)
+    max_output_tokens : Mapped[int | None] = mapped_column(Integer, nullable=True)
+    temperature : Mapped[float | None] = mapped_column(Float, nullable=True)
+    stop_sequences : Mapped[list[str] | None] = mapped_column(ARRAY(Text), nullable=True)
     created_at: Mapped[str] = mapped_column(
         TIMESTAMP(timezone=True),
         server_default=func.now()
@@ -24,6 +38,13 @@ class SystemPrompt(Base):
             "llm_system_prompt": self.llm_system_prompt,
             "ai_agent_id": self.ai_agent_id,
             "ai_model": self.ai_model,
+            "response_cache_ttl_seconds": self.response_cache_ttl_seconds,
+            "priority_lane": self.priority_lane,
+            "request_timeout_seconds": self.request_timeout_seconds,
+            "fallback_models": self.fallback_models,
+            "max_output_tokens": self.max_output_tokens,
+            "temperature": self.temperature,
+            "stop_sequences": self.stop_sequences,
             "created_at": self.created_at,
             "updated_at": self.updated_at,
         }
@@ -1,13 +1,20 @@
-from sqlalchemy import BigInteger, Text, TIMESTAMP, func
+from sqlalchemy import BigInteger, Text, TIMESTAMP, Index, func, text
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import Mapped, mapped_column
 from app.database.base import Base
 
 class UserPrompt(Base):
     __tablename__ = "user_prompt_table"
+    __table_args__ = (
+        # history tail of an agent (newest first), user prompt listing and reset_agent
+        Index("ix_user_prompt_table_ai_agent_id_created_at", "ai_agent_id", text("created_at DESC"), text("id DESC")),
+    )
 
     id: Mapped[int] = mapped_column(BigInteger, primary_key=True, autoincrement=True)
     llm_user_prompt: Mapped[str] = mapped_column(Text, nullable=False)
     ai_agent_id: Mapped[str] = mapped_column(Text, nullable=False)
+    # {model name: tokens of the text with that model's tokenizer}, filled at insert and backfilled while building context windows
+    token_counts: Mapped[dict | None] = mapped_column(JSONB, nullable=True)
 
     created_at: Mapped[str] = mapped_column(
         TIMESTAMP(timezone=True),
@@ -23,6 +30,7 @@ class UserPrompt(Base):
             "id": self.id,
             "llm_user_prompt": self.llm_user_prompt,
             "ai_agent_id": self.ai_agent_id,
+            "token_counts": self.token_counts,
             "created_at": self.created_at,
             "updated_at": self.updated_at,
         }
@@ -0,0 +1,279 @@
+from datetime import datetime
+from typing import NamedTuple
+
+# db orm related imports
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import bindparam, select, text, tuple_
+from sqlalchemy.dialects.postgresql import JSONB
+
+# import the tables
+from app.models.db_table_models.user_prompt_table import UserPrompt
+from app.models.db_table_models.llm_prompt_response_table import LLMPromptResponseTable
+
+# import messages
+from app.utils.success_messages import HuggingFaceAIModelAPISuccessMessage
+from app.utils.error_messages import (AgentApiErrorMessages, SystemPromptApiErrorMessages)
+
+# import class response model
+from app.models.class_return_model.services_class_response_models import RepositoryClassResponse
+
+# import status codes from fast-api
+from fastapi import status
+
+# import logging utility
+from app.utils.logger import LoggerFactory
+
+# initialize logging utility
+info_logger = LoggerFactory.get_info_logger()
+error_logger = LoggerFactory.get_error_logger()
+debug_logger = LoggerFactory.get_debug_logger()
+
+class HistoryTurn(NamedTuple):
+    # id / created_at of the user prompt, the keyset of the next (older) chunk
+    id: int
+    created_at: datetime
+    user_prompt: str
+    llm_response: str
+    # {model name: tokens} stored with the prompt / response (empty for rows of before the counts were stored)
+    user_prompt_tokens: dict
+    llm_response_tokens: dict
+
+class AgentContext(NamedTuple):
+    agent_id: str
+    ai_model: str
+    llm_system_prompt: str
+    # the per agent settings of the system_prompt_table row (same keys as SystemPrompt.to_dict(), no timestamps)
+    settings: dict
+    # [{"agent_tool_name": ...}], newest first (what ToolPromptBuilder takes)
+    tools: list[dict]
+    # first chunk of the history, newest first (get_turns_before reads the older ones)
+    history_chunk: list[HistoryTurn]
+
+# The agent must exist (there are no foreign keys, ai_agent_table is the source of truth), the system prompt row
+# drives everything else: its tools and the newest :history_limit turns, both aggregated into one json value per row
+# so the whole context comes back as a single row.
+_LOAD_AGENT_CONTEXT_SQL = text(
+    """
+    WITH agent AS (
+        SELECT ai_agent_id FROM ai_agent_table WHERE ai_agent_id = :agent_id
+    )
+    SELECT
+        agent.ai_agent_id IS NOT NULL AS agent_exists,
+        prompt.id,
+        prompt.llm_system_prompt,
+        prompt.ai_model,
+        prompt.response_cache_ttl_seconds,
+        prompt.priority_lane,
+        prompt.request_timeout_seconds,
+        prompt.fallback_models,
+        prompt.max_output_tokens,
+        prompt.temperature,
+        prompt.stop_sequences,
+        tools.tools,
+        history.turns
+    FROM (SELECT 1) AS one
+    LEFT JOIN agent ON TRUE
+    LEFT JOIN system_prompt_table AS prompt ON prompt.ai_agent_id = :agent_id
+    LEFT JOIN LATERAL (
+        SELECT coalesce(json_agg(json_build_object('agent_tool_name', tool.agent_tool_name) ORDER BY tool.created_at DESC), '[]'::json) AS tools
+        FROM attached_ai_tools_table AS tool
+        WHERE tool.ai_agent_id = prompt.ai_agent_id
+    ) AS tools ON TRUE
+    LEFT JOIN LATERAL (
+        SELECT coalesce(json_agg(json_build_array(tail.id, tail.created_at, tail.llm_user_prompt, tail.llm_prompt_response, tail.user_prompt_tokens, tail.llm_response_tokens) ORDER BY tail.created_at DESC, tail.id DESC), '[]'::json) AS turns
+        FROM (
+            SELECT
+                user_prompt.id, user_prompt.created_at, user_prompt.llm_user_prompt, response.llm_prompt_response,
+                user_prompt.token_counts AS user_prompt_tokens, response.token_counts AS llm_response_tokens
+            FROM user_prompt_table AS user_prompt
+            JOIN llm_prompt_response_table AS response ON response.llm_user_prompt_id = user_prompt.id
+            WHERE user_prompt.ai_agent_id = prompt.ai_agent_id
+            ORDER BY user_prompt.created_at DESC, user_prompt.id DESC
+            LIMIT :history_limit
+        ) AS tail
+    ) AS history ON TRUE
+    """
+)
+
+# merge one model's count into the stored counts, the other models' counts are kept
+_SAVE_USER_PROMPT_TOKENS_SQL = text(
+    "UPDATE user_prompt_table SET token_counts = coalesce(token_counts, '{}'::jsonb) || :token_counts WHERE id = :turn_id"
+).bindparams(bindparam("token_counts", type_=JSONB))
+_SAVE_LLM_RESPONSE_TOKENS_SQL = text(
+    "UPDATE llm_prompt_response_table SET token_counts = coalesce(token_counts, '{}'::jsonb) || :token_counts WHERE llm_user_prompt_id = :turn_id"
+).bindparams(bindparam("token_counts", type_=JSONB))
+
+_SETTINGS_COLUMNS = (
+    "id",
+    "llm_system_prompt",
+    "ai_model",
+    "response_cache_ttl_seconds",
+    "priority_lane",
+    "request_timeout_seconds",
+    "fallback_models",
+    "max_output_tokens",
+    "temperature",
+    "stop_sequences",
+)
+
+class AgentContextRepository:
+    """
+    Everything a prompt needs before the llm call (agent, system prompt and settings, attached tools,
+    tail of the conversation) in ONE round trip, plus the backfill of the token counts of the history. AsyncSession.
+    """
+    def __init__(self, db : AsyncSession):
+        self.db = db
+        debug_logger.debug(f"AgentContextRepository.__init__ | AgentContextRepository initialized | db = {self.db}")
+
+    async def load(self, agent_id : str = None, history_limit : int = None) -> RepositoryClassResponse:
+        """
+        history_limit is the number of (user prompt, llm response) turns of the first history chunk.
+        On success data is an AgentContext.
+        """
+        try:
+            if not agent_id or agent_id is None or agent_id == "":
+                error_logger.error(f"AgentContextRepository.load | {AgentApiErrorMessages.AI_AGENT_ID_EMPTY.value}")
+                return RepositoryClassResponse(
+                    status=False,
+                    status_code = status.HTTP_400_BAD_REQUEST,
+                    message=AgentApiErrorMessages.AI_AGENT_ID_EMPTY.value
+                )
+
+            row = (await self.db.execute(
+                _LOAD_AGENT_CONTEXT_SQL,
+                {"agent_id": agent_id, "history_limit": history_limit}
+            )).mappings().one()
+
+            if not row["agent_exists"]:
+                error_logger.error(f"AgentContextRepository.load | {AgentApiErrorMessages.AGENT_ID_NOT_FOUND.value} | agent_id = {agent_id}")
+                return RepositoryClassResponse(
+                    status=False,
+                    status_code = status.HTTP_404_NOT_FOUND,
+                    message=AgentApiErrorMessages.AGENT_ID_NOT_FOUND.value
+                )
+            if row["id"] is None:
+                error_logger.error(f"AgentContextRepository.load | {SystemPromptApiErrorMessages.SYSTEM_PROMPT_NOT_FOUND.value.format(agent_id)}")
+                return RepositoryClassResponse(
+                    status=False,
+                    status_code = status.HTTP_404_NOT_FOUND,
+                    message=SystemPromptApiErrorMessages.SYSTEM_PROMPT_NOT_FOUND.value.format(agent_id)
+                )
+
+            context = AgentContext(
+                agent_id=agent_id,
+                ai_model=row["ai_model"],
+                llm_system_prompt=row["llm_system_prompt"],
+                settings={"ai_agent_id": agent_id, **{column: row[column] for column in _SETTINGS_COLUMNS}},
+                tools=row["tools"],
+                history_chunk=[
+                    HistoryTurn(
+                        id=turn_id,
+                        created_at=datetime.fromisoformat(created_at),
+                        user_prompt=user_prompt,
+                        llm_response=llm_response,
+                        user_prompt_tokens=user_prompt_tokens or {},
+                        llm_response_tokens=llm_response_tokens or {}
+                    )
+                    for turn_id, created_at, user_prompt, llm_response, user_prompt_tokens, llm_response_tokens in row["turns"]
+                ]
+            )
+            debug_logger.debug(f"AgentContextRepository.load | {HuggingFaceAIModelAPISuccessMessage.LLM_CONTEXT_FETCHED.value} | agent_id = {agent_id}, tools = {len(context.tools)}, turns = {len(row['turns'])}")
+            return RepositoryClassResponse(
+                status = True,
+                status_code = status.HTTP_200_OK,
+                message = HuggingFaceAIModelAPISuccessMessage.LLM_CONTEXT_FETCHED.value,
+                data = context
+            )
+        except Exception as e:
+            error_logger.error(f"AgentContextRepository.load | {str(e)}")
+            return RepositoryClassResponse(
+                status = False,
+                status_code = status.HTTP_500_INTERNAL_SERVER_ERROR,
+                message = str(e)
+            )
+
+    async def get_turns_before(self, agent_id : str = None, before : HistoryTurn = None, limit : int = None) -> RepositoryClassResponse:
+        """
+        The limit turns older than before, newest first (keyset on (created_at, id), served by
+        ix_user_prompt_table_ai_agent_id_created_at so the cost does not grow with the history).
+        On success data is a list of HistoryTurn, shorter than limit once the start of the history is reached.
+        """
+        try:
+            if not agent_id or agent_id is None or agent_id == "":
+                error_logger.error(f"AgentContextRepository.get_turns_before | {AgentApiErrorMessages.AI_AGENT_ID_EMPTY.value}")
+                return RepositoryClassResponse(
+                    status=False,
+                    status_code = status.HTTP_400_BAD_REQUEST,
+                    message=AgentApiErrorMessages.AI_AGENT_ID_EMPTY.value
+                )
+
+            obj = (
+                select(
+                    UserPrompt.id,
+                    UserPrompt.created_at,
+                    UserPrompt.llm_user_prompt,
+                    LLMPromptResponseTable.llm_prompt_response,
+                    UserPrompt.token_counts,
+                    LLMPromptResponseTable.token_counts
+                )
+                .join(
+                    LLMPromptResponseTable,
+                    LLMPromptResponseTable.llm_user_prompt_id == UserPrompt.id
+                )
+                .where(
+                    UserPrompt.ai_agent_id == agent_id,
+                    tuple_(UserPrompt.created_at, UserPrompt.id) < tuple_(before.created_at, before.id)
+                )
+                .order_by(UserPrompt.created_at.desc(), UserPrompt.id.desc())
+                .limit(limit)
+            )
+            rows = (await self.db.execute(obj)).all()
+            turns = [
+                HistoryTurn(
+                    id=turn_id,
+                    created_at=created_at,
+                    user_prompt=user_prompt,
+                    llm_response=llm_response,
+                    user_prompt_tokens=user_prompt_tokens or {},
+                    llm_response_tokens=llm_response_tokens or {}
+                )
+                for turn_id, created_at, user_prompt, llm_response, user_prompt_tokens, llm_response_tokens in rows
+            ]
+            debug_logger.debug(f"AgentContextRepository.get_turns_before | {HuggingFaceAIModelAPISuccessMessage.LLM_CONTEXT_FETCHED.value} | agent_id = {agent_id}, before_id = {before.id}, turns = {len(turns)}")
+            return RepositoryClassResponse(
+                status = True,
+                status_code = status.HTTP_200_OK,
+                message = HuggingFaceAIModelAPISuccessMessage.LLM_CONTEXT_FETCHED.value,
+                data = turns
+            )
+        except Exception as e:
+            error_logger.error(f"AgentContextRepository.get_turns_before | {str(e)}")
+            return RepositoryClassResponse(
+                status = False,
+                status_code = status.HTTP_500_INTERNAL_SERVER_ERROR,
+                message = str(e)
+            )
+
+    async def save_token_counts(self, user_prompt_tokens : list[dict] = None, llm_response_tokens : list[dict] = None) -> RepositoryClassResponse:
+        """
+        Backfill of counts that were missing when a context window was built.
+        Both lists hold {"turn_id": HistoryTurn.id, "token_counts": {model name: tokens}}.
+        """
+        try:
+            if user_prompt_tokens:
+                await self.db.execute(_SAVE_USER_PROMPT_TOKENS_SQL, user_prompt_tokens)
+            if llm_response_tokens:
+                await self.db.execute(_SAVE_LLM_RESPONSE_TOKENS_SQL, llm_response_tokens)
+            debug_logger.debug(f"AgentContextRepository.save_token_counts | {HuggingFaceAIModelAPISuccessMessage.LLM_TOKEN_COUNTS_SAVED.value} | user_prompts = {len(user_prompt_tokens or [])}, llm_responses = {len(llm_response_tokens or [])}")
+            return RepositoryClassResponse(
+                status = True,
+                status_code = status.HTTP_200_OK,
+                message = HuggingFaceAIModelAPISuccessMessage.LLM_TOKEN_COUNTS_SAVED.value
+            )
+        except Exception as e:
+            error_logger.error(f"AgentContextRepository.save_token_counts | {str(e)}")
+            return RepositoryClassResponse(
+                status = False,
+                status_code = status.HTTP_500_INTERNAL_SERVER_ERROR,
+                message = str(e)
+            )
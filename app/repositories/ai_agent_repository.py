@@ -3,6 +3,7 @@ import time
 
 # db orm related imports
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import (select, update, delete, text, func)
 
 # imports related to database table models
@@ -251,3 +252,52 @@ class AIAgentRepository:
                     status_code = status.HTTP_500_INTERNAL_SERVER_ERROR,
                     message = str(e)
                 ) 
+
+class AsyncAIAgentRepository:
+    """
+    AsyncSession variant of the AIAgentRepository methods the prompt endpoints use.
+    """
+    def __init__(self, db: AsyncSession):
+        self.db = db
+        debug_logger.debug(f"AsyncAIAgentRepository.__init__ | AsyncAIAgentRepository initialized | database_session = {self.db}")
+
+    async def get_one(self, agent_id: str = None, agent_name: str = None) -> RepositoryClassResponse:
+        try:
+            obj = select(AIAgentName)
+            if agent_id and agent_name:
+                error_logger.error(f"AsyncAIAgentRepository.get_one | {AgentApiErrorMessages.AGENT_ID_NOT_FOUND.value}")
+                return RepositoryClassResponse(
+                    status=False,
+                    status_code = status.HTTP_400_BAD_REQUEST,
+                    message=AgentApiErrorMessages.AI_AGENT_NAME_AND_AGENT_ID_IS_NOT_REQUIRED.value
+                )
+            if agent_id:
+                obj = obj.where(AIAgentName.ai_agent_id == agent_id)
+            if agent_name:
+                obj = obj.where(AIAgentName.ai_agent_name == agent_name)
+
+            row = (await self.db.execute(obj)).scalar_one_or_none()
+            if not row:
+                error_logger.error(
+                    f"AsyncAIAgentRepository.get_one | {AgentApiErrorMessages.AGENT_ID_NOT_FOUND.value} | agent_id = {agent_id}"
+                )
+                return RepositoryClassResponse(
+                    status=False,
+                    status_code = status.HTTP_404_NOT_FOUND,
+                    message=AgentApiErrorMessages.AGENT_ID_NOT_FOUND.value
+                )
+            row = row.to_dict()
+            debug_logger.debug(f"AsyncAIAgentRepository.get_one | {AiAgentApiSuccessMessage.AGENT_NAME_FETCHED.value} | db_response = {row}")
+            return RepositoryClassResponse(
+                        status = True,
+                        status_code = status.HTTP_200_OK,
+                        message = AiAgentApiSuccessMessage.AGENT_NAME_FETCHED.value,
+                        data = row
+                    )
+        except Exception as e:
+            error_logger.error(f"AsyncAIAgentRepository.get_one | {str(e)}")
+            return RepositoryClassResponse(
+                    status = False,
+                    status_code = status.HTTP_500_INTERNAL_SERVER_ERROR,
+                    message = str(e)
+                )
@@ -0,0 +1,323 @@
+# db orm related imports
+from sqlalchemy.orm import Session
+from sqlalchemy import (select, update, func, and_, or_)
+
+# imports related to database table models
+from app.models.db_table_models.llm_prompt_job_table import LLMPromptJob
+
+# import messages
+from app.utils.success_messages import (LLMPromptJobSuccessMessages)
+from app.utils.error_messages import (AgentApiErrorMessages, LLMPromptJobErrorMessages)
+
+# import class response model
+from app.models.class_return_model.services_class_response_models import RepositoryClassResponse
+
+# import status codes from fast-api
+from fastapi import status
+
+# import logging utility
+from app.utils.logger import LoggerFactory
+
+# initialize logging utility
+info_logger = LoggerFactory.get_info_logger()
+error_logger = LoggerFactory.get_error_logger()
+debug_logger = LoggerFactory.get_debug_logger()
+
+class LLMPromptJobRepository:
+    """
+    Postgres backed job queue for long running prompts.
+    Workers claim jobs with SELECT ... FOR UPDATE SKIP LOCKED so they never wait on each other,
+    and hold a lease (locked_by / locked_until) that they renew while the job runs.
+    Every update of a running job is guarded by locked_by so a worker whose lease expired can not overwrite the new owner.
+    """
+    def __init__(self, db : Session):
+        self.db = db
+
+    @staticmethod
+    def _seconds_from_now(seconds : float):
+        return func.clock_timestamp() + func.make_interval(0, 0, 0, 0, 0, 0, seconds)
+
+    def insert(self, job_id : str, agent_id : str, user_prompt : str, max_attempts : int) -> RepositoryClassResponse:
+        try:
+            if not agent_id:
+                error_logger.error(f"LLMPromptJobRepository.insert | {AgentApiErrorMessages.AI_AGENT_ID_EMPTY.value}")
+                return RepositoryClassResponse(
+                    status=False,
+                    status_code = status.HTTP_400_BAD_REQUEST,
+                    message=AgentApiErrorMessages.AI_AGENT_ID_EMPTY.value
+                )
+            obj = LLMPromptJob(
+                job_id = job_id,
+                ai_agent_id = agent_id,
+                user_prompt = user_prompt,
+                max_attempts = max_attempts
+            )
+            self.db.add(obj)
+            self.db.flush()
+            self.db.refresh(obj)
+            row = obj.to_dict()
+
+            debug_logger.debug(f"LLMPromptJobRepository.insert | {LLMPromptJobSuccessMessages.JOB_QUEUED.value} | job_id = {job_id}, agent_id = {agent_id}")
+            return RepositoryClassResponse(
+                status = True,
+                status_code = status.HTTP_201_CREATED,
+                message = LLMPromptJobSuccessMessages.JOB_QUEUED.value,
+                data = row
+            )
+        except Exception as e:
+            error_logger.error(f"LLMPromptJobRepository.insert | {str(e)}")
+            return RepositoryClassResponse(
+                status = False,
+                status_code = status.HTTP_500_INTERNAL_SERVER_ERROR,
+                message = str(e)
+            )
+
+    def get_one(self, job_id : str) -> RepositoryClassResponse:
+        try:
+            if not job_id:
+                error_logger.error(f"LLMPromptJobRepository.get_one | {LLMPromptJobErrorMessages.JOB_ID_EMPTY.value}")
+                return RepositoryClassResponse(
+                    status=False,
+                    status_code = status.HTTP_400_BAD_REQUEST,
+                    message=LLMPromptJobErrorMessages.JOB_ID_EMPTY.value
+                )
+            obj = select(LLMPromptJob).where(LLMPromptJob.job_id == job_id)
+            row = self.db.execute(obj).scalar_one_or_none()
+            if not row:
+                error_logger.error(f"LLMPromptJobRepository.get_one | {LLMPromptJobErrorMessages.JOB_NOT_FOUND.value.format(job_id)}")
+                return RepositoryClassResponse(
+                    status=False,
+                    status_code = status.HTTP_404_NOT_FOUND,
+                    message=LLMPromptJobErrorMessages.JOB_NOT_FOUND.value.format(job_id)
+                )
+            row = row.to_dict()
+            debug_logger.debug(f"LLMPromptJobRepository.get_one | db_response = {row}")
+            return RepositoryClassResponse(
+                status = True,
+                status_code = status.HTTP_200_OK,
+                message = LLMPromptJobSuccessMessages.JOB_FETCHED.value,
+                data = row
+            )
+        except Exception as e:
+            error_logger.error(f"LLMPromptJobRepository.get_one | {str(e)}")
+            return RepositoryClassResponse(
+                status = False,
+                status_code = status.HTTP_500_INTERNAL_SERVER_ERROR,
+                message = str(e)
+            )
+
+    def expire_stale(self) -> RepositoryClassResponse:
+        """
+        Fail running jobs whose worker stopped renewing the lease after their last attempt.
+        (Jobs with attempts left are simply claimed again by claim().)
+        """
+        try:
+            obj = (
+                update(LLMPromptJob)
+                .where(and_(
+                    LLMPromptJob.status == "running",
+                    LLMPromptJob.locked_until < func.clock_timestamp(),
+                    LLMPromptJob.attempts >= LLMPromptJob.max_attempts,
+                ))
+                .values(
+                    status = "failed",
+                    error_status_code = status.HTTP_504_GATEWAY_TIMEOUT,
+                    error_message = LLMPromptJobErrorMessages.JOB_LEASE_EXPIRED.value,
+                    locked_by = None,
+                    locked_until = None,
+                    finished_at = func.clock_timestamp()
+                )
+                .execution_options(synchronize_session=False)
+            )
+            result = self.db.execute(obj)
+            self.db.flush()
+
+            if result.rowcount:
+                error_logger.warning(f"LLMPromptJobRepository.expire_stale | jobs failed after their lease expired | count = {result.rowcount}")
+            return RepositoryClassResponse(
+                status = True,
+                status_code = status.HTTP_200_OK,
+                message = LLMPromptJobSuccessMessages.JOB_FINISHED.value,
+                data = {"expired": result.rowcount}
+            )
+        except Exception as e:
+            error_logger.error(f"LLMPromptJobRepository.expire_stale | {str(e)}")
+            return RepositoryClassResponse(
+                status = False,
+                status_code = status.HTTP_500_INTERNAL_SERVER_ERROR,
+                message = str(e)
+            )
+
+    def claim(self, worker_id : str, visibility_timeout_seconds : float) -> RepositoryClassResponse:
+        """
+        Lease the oldest claimable job (queued and due, or running with an expired lease).
+        data is None when there is nothing to do.
+        """
+        try:
+            now = func.clock_timestamp()
+            next_job_id = (
+                select(LLMPromptJob.id)
+                .where(and_(
+                    LLMPromptJob.attempts < LLMPromptJob.max_attempts,
+                    or_(
+                        and_(LLMPromptJob.status == "queued", LLMPromptJob.available_at <= now),
+                        and_(LLMPromptJob.status == "running", LLMPromptJob.locked_until < now),
+                    )
+                ))
+                .order_by(LLMPromptJob.available_at, LLMPromptJob.id)
+                .limit(1)
+                # rows locked by another worker's claim are skipped instead of waited on
+                .with_for_update(skip_locked=True)
+                .scalar_subquery()
+            )
+            obj = (
+                update(LLMPromptJob)
+                .where(LLMPromptJob.id == next_job_id)
+                .values(
+                    status = "running",
+                    attempts = LLMPromptJob.attempts + 1,
+                    locked_by = worker_id,
+                    locked_until = self._seconds_from_now(visibility_timeout_seconds),
+                    updated_at = now
+                )
+                .returning(LLMPromptJob)
+                .execution_options(synchronize_session=False)
+            )
+            row = self.db.execute(obj).scalar_one_or_none()
+            self.db.flush()
+
+            if row is None:
+                return RepositoryClassResponse(
+                    status = True,
+                    status_code = status.HTTP_200_OK,
+                    message = LLMPromptJobSuccessMessages.NO_JOB_TO_CLAIM.value,
+                    data = None
+                )
+            row = row.to_dict()
+            debug_logger.debug(f"LLMPromptJobRepository.claim | {LLMPromptJobSuccessMessages.JOB_CLAIMED.value} | job_id = {row['job_id']}, worker_id = {worker_id}, attempt = {row['attempts']}")
+            return RepositoryClassResponse(
+                status = True,
+                status_code = status.HTTP_200_OK,
+                message = LLMPromptJobSuccessMessages.JOB_CLAIMED.value,
+                data = row
+            )
+        except Exception as e:
+            error_logger.error(f"LLMPromptJobRepository.claim | {str(e)}")
+            return RepositoryClassResponse(
+                status = False,
+                status_code = status.HTTP_500_INTERNAL_SERVER_ERROR,
+                message = str(e)
+            )
+
+    def _update_leased(self, job_id : str, worker_id : str, values : dict, message : str, method : str) -> RepositoryClassResponse:
+        try:
+            obj = (
+                update(LLMPromptJob)
+                .where(and_(
+                    LLMPromptJob.job_id == job_id,
+                    LLMPromptJob.status == "running",
+                    LLMPromptJob.locked_by == worker_id,
+                ))
+                .values(**values, updated_at = func.clock_timestamp())
+                .execution_options(synchronize_session=False)
+            )
+            result = self.db.execute(obj)
+            self.db.flush()
+
+            if result.rowcount == 0:
+                error_logger.warning(f"LLMPromptJobRepository.{method} | {LLMPromptJobErrorMessages.JOB_LEASE_LOST.value} | job_id = {job_id}, worker_id = {worker_id}")
+                return RepositoryClassResponse(
+                    status = False,
+                    status_code = status.HTTP_409_CONFLICT,
+                    message = LLMPromptJobErrorMessages.JOB_LEASE_LOST.value
+                )
+            debug_logger.debug(f"LLMPromptJobRepository.{method} | {message} | job_id = {job_id}, worker_id = {worker_id}")
+            return RepositoryClassResponse(
+                status = True,
+                status_code = status.HTTP_200_OK,
+                message = message,
+                data = {}
+            )
+        except Exception as e:
+            error_logger.error(f"LLMPromptJobRepository.{method} | {str(e)}")
+            return RepositoryClassResponse(
+                status = False,
+                status_code = status.HTTP_500_INTERNAL_SERVER_ERROR,
+                message = str(e)
+            )
+
+    def extend_lease(self, job_id : str, worker_id : str, visibility_timeout_seconds : float) -> RepositoryClassResponse:
+        return self._update_leased(
+            job_id=job_id,
+            worker_id=worker_id,
+            values={"locked_until": self._seconds_from_now(visibility_timeout_seconds)},
+            message=LLMPromptJobSuccessMessages.JOB_LEASE_EXTENDED.value,
+            method="extend_lease"
+        )
+
+    def mark_succeeded(self, job_id : str, worker_id : str, llm_prompt_response : str) -> RepositoryClassResponse:
+        return self._update_leased(
+            job_id=job_id,
+            worker_id=worker_id,
+            values={
+                "status": "succeeded",
+                "llm_prompt_response": llm_prompt_response,
+                "error_status_code": None,
+                "error_message": None,
+                "locked_by": None,
+                "locked_until": None,
+                "finished_at": func.clock_timestamp(),
+            },
+            message=LLMPromptJobSuccessMessages.JOB_FINISHED.value,
+            method="mark_succeeded"
+        )
+
+    def mark_failed(self, job_id : str, worker_id : str, error_status_code : int, error_message : str) -> RepositoryClassResponse:
+        return self._update_leased(
+            job_id=job_id,
+            worker_id=worker_id,
+            values={
+                "status": "failed",
+                "error_status_code": error_status_code,
+                "error_message": error_message,
+                "locked_by": None,
+                "locked_until": None,
+                "finished_at": func.clock_timestamp(),
+            },
+            message=LLMPromptJobSuccessMessages.JOB_FINISHED.value,
+            method="mark_failed"
+        )
+
+    def reschedule(self, job_id : str, worker_id : str, delay_seconds : float, error_status_code : int, error_message : str) -> RepositoryClassResponse:
+        return self._update_leased(
+            job_id=job_id,
+            worker_id=worker_id,
+            values={
+                "status": "queued",
+                "error_status_code": error_status_code,
+                "error_message": error_message,
+                "available_at": self._seconds_from_now(delay_seconds),
+                "locked_by": None,
+                "locked_until": None,
+            },
+            message=LLMPromptJobSuccessMessages.JOB_RESCHEDULED.value,
+            method="reschedule"
+        )
+
+    def release(self, job_id : str, worker_id : str) -> RepositoryClassResponse:
+        """
+        Put a job back in the queue without using up an attempt (worker shutting down).
+        """
+        return self._update_leased(
+            job_id=job_id,
+            worker_id=worker_id,
+            values={
+                "status": "queued",
+                "attempts": func.greatest(LLMPromptJob.attempts - 1, 0),
+                "available_at": func.clock_timestamp(),
+                "locked_by": None,
+                "locked_until": None,
+            },
+            message=LLMPromptJobSuccessMessages.JOB_RELEASED.value,
+            method="release"
+        )
@@ -1,5 +1,6 @@
 # db orm related imports
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import (select, update, delete, text, func)
 
 # imports related to database table models
@@ -7,7 +8,7 @@ from app.models.db_table_models.llm_prompt_response_table import LLMPromptRespon
 from app.models.db_table_models.user_prompt_table import UserPrompt
 
 # import repositories
-from app.repositories.user_prompt_repository import UserPromptRepository
+from app.repositories.user_prompt_repository import UserPromptRepository, AsyncUserPromptRepository
 
 # import messages
 from app.utils.success_messages import HuggingFaceAIModelAPISuccessMessage
@@ -49,7 +50,7 @@ class LLmPromptResponseRepository:
                 message=str(e)
             )
 
-    def insert(self,agent_id : str, llm_user_prompt_id : int, llm_prompt_response : str, commit : bool = False) -> RepositoryClassResponse:
+    def insert(self,agent_id : str, llm_user_prompt_id : int, llm_prompt_response : str, commit : bool = False, ai_model : str = None, truncated : bool = False) -> RepositoryClassResponse:
         try:
             if not agent_id or agent_id is None or agent_id == "":
                 error_logger.error(f"LLmPromptResponseRepository.insert | {AgentApiErrorMessages.AI_AGENT_ID_EMPTY.value}")
@@ -84,7 +85,8 @@ class LLmPromptResponseRepository:
                 llm_user_prompt_id = llm_user_prompt_id,
                 llm_prompt_response = llm_prompt_response,
                 ai_agent_id = agent_id,
-
+                ai_model = ai_model,
+                truncated = truncated
             )
             self.db.add(obj)
             self.db.flush()
@@ -190,4 +192,93 @@ class LLmPromptResponseRepository:
                     status = False,
                     status_code = status.HTTP_500_INTERNAL_SERVER_ERROR,
                     message = str(e)
-            )
\ No newline at end of file
+            )
+
+class AsyncLLmPromptResponseRepository:
+    """
+    AsyncSession variant of the LLmPromptResponseRepository methods the prompt endpoints use.
+    """
+    def __init__(self, db : AsyncSession):
+        self.db = db
+        debug_logger.debug(f"AsyncLLmPromptResponseRepository.__init__ | AsyncLLmPromptResponseRepository initialized | db = {self.db}")
+        self.user_prompt_repo = AsyncUserPromptRepository(db=db)
+
+    async def check_if_user_prompt_exists(self, llm_user_prompt_id : int) -> RepositoryClassResponse:
+        try:
+            user_prompt_repo_result = await self.user_prompt_repo.get_one(llm_user_prompt_id=llm_user_prompt_id)
+            return RepositoryClassResponse(
+                    status=user_prompt_repo_result.status,
+                    status_code = user_prompt_repo_result.status_code,
+                    message=user_prompt_repo_result.message
+                )
+        except Exception as e:
+            error_logger.error(f"AsyncLLmPromptResponseRepository.check_if_user_prompt_exists | {str(e)}")
+            return RepositoryClassResponse(
+                status=False,
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                message=str(e)
+            )
+
+    async def insert(self,agent_id : str, llm_user_prompt_id : int, llm_prompt_response : str, ai_model : str = None, truncated : bool = False, verify_user_prompt : bool = True, token_counts : dict = None) -> RepositoryClassResponse:
+        """
+        verify_user_prompt=False skips the user prompt lookup when it was inserted in the same transaction.
+        token_counts is {model name: tokens} of the response.
+        """
+        try:
+            if not agent_id or agent_id is None or agent_id == "":
+                error_logger.error(f"AsyncLLmPromptResponseRepository.insert | {AgentApiErrorMessages.AI_AGENT_ID_EMPTY.value}")
+                return RepositoryClassResponse(
+                    status=False,
+                    status_code = status.HTTP_400_BAD_REQUEST,
+                    message=AgentApiErrorMessages.AI_AGENT_ID_EMPTY.value
+                )
+            if not llm_user_prompt_id or llm_user_prompt_id is None or llm_user_prompt_id < 1:
+                error_logger.error(f"AsyncLLmPromptResponseRepository.insert | {UserPromptApiErrorMessages.USER_PROMPT_ID_EMPTY.value}")
+                return RepositoryClassResponse(
+                    status=False,
+                    status_code = status.HTTP_400_BAD_REQUEST,
+                    message=UserPromptApiErrorMessages.USER_PROMPT_ID_EMPTY.value
+                )
+            if not llm_prompt_response or llm_prompt_response is None or llm_prompt_response == "":
+                error_logger.error(f"AsyncLLmPromptResponseRepository.insert | {LLmPromptResponseErrorMessage.LLM_PROMPT_RESPONSE_EMPTY.value}")
+                return RepositoryClassResponse(
+                    status=False,
+                    status_code = status.HTTP_400_BAD_REQUEST,
+                    message=LLmPromptResponseErrorMessage.LLM_PROMPT_RESPONSE_EMPTY.value
+                )
+            if verify_user_prompt:
+                result = await self.check_if_user_prompt_exists(llm_user_prompt_id)
+                if not result.status:
+                    return RepositoryClassResponse(
+                            status = result.status,
+                            status_code = result.status_code,
+                            message = result.message
+                        )
+
+            obj = LLMPromptResponseTable(
+                llm_user_prompt_id = llm_user_prompt_id,
+                llm_prompt_response = llm_prompt_response,
+                ai_agent_id = agent_id,
+                ai_model = ai_model,
+                truncated = truncated,
+                token_counts = token_counts
+            )
+            self.db.add(obj)
+            await self.db.flush()
+            await self.db.refresh(obj)
+            row = obj.to_dict()
+
+            debug_logger.debug(f"AsyncLLmPromptResponseRepository.insert | {HuggingFaceAIModelAPISuccessMessage.LLM_RESPONSE_INSERT.value} | db_response = {row}")
+            return RepositoryClassResponse(
+                status=True,
+                status_code=status.HTTP_201_CREATED,
+                message=HuggingFaceAIModelAPISuccessMessage.LLM_RESPONSE_INSERT.value,
+                data=row
+            )
+        except Exception as e:
+            error_logger.error(f"AsyncLLmPromptResponseRepository.insert | {str(e)}")
+            return RepositoryClassResponse(
+                status=False,
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                message=str(e)
+            )
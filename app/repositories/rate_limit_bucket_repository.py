@@ -0,0 +1,119 @@
+# db orm related imports
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import (select, update, text, func, and_)
+
+# imports related to database table models
+from app.models.db_table_models.rate_limit_bucket_table import RateLimitBucket
+
+# import messages
+from app.utils.success_messages import (RateLimitBucketSuccessMessages)
+
+# import class response model
+from app.models.class_return_model.services_class_response_models import RepositoryClassResponse
+
+# import status codes from fast-api
+from fastapi import status
+
+# import logging utility
+from app.utils.logger import LoggerFactory
+
+# initialize logging utility
+info_logger = LoggerFactory.get_info_logger()
+error_logger = LoggerFactory.get_error_logger()
+debug_logger = LoggerFactory.get_debug_logger()
+
+class RateLimitBucketRepository:
+    """
+    Token buckets shared by every worker through postgres (AsyncSession, used from the prompt endpoints).
+    Must be used inside a transaction: refill() locks the bucket row until the transaction ends,
+    so a refill followed by consume() is atomic across workers.
+    """
+    def __init__(self, db : AsyncSession):
+        self.db = db
+
+    async def refill(self, bucket_key : str, capacity : float, refill_per_second : float) -> RepositoryClassResponse:
+        try:
+            # create the bucket full, or top it up by the time passed since the last update (never above capacity)
+            obj = text(
+                """
+                INSERT INTO rate_limit_bucket_table AS bucket (bucket_key, tokens, updated_at)
+                VALUES (:bucket_key, :capacity, clock_timestamp())
+                ON CONFLICT (bucket_key) DO UPDATE
+                SET tokens = LEAST(
+                        CAST(:capacity AS double precision),
+                        bucket.tokens + EXTRACT(EPOCH FROM (clock_timestamp() - bucket.updated_at)) * :refill_per_second
+                    ),
+                    updated_at = clock_timestamp()
+                RETURNING tokens
+                """
+            )
+            tokens = (await self.db.execute(
+                obj,
+                {"bucket_key": bucket_key, "capacity": capacity, "refill_per_second": refill_per_second}
+            )).scalar_one()
+
+            debug_logger.debug(f"RateLimitBucketRepository.refill | bucket_key = {bucket_key}, tokens = {tokens}")
+            return RepositoryClassResponse(
+                status = True,
+                status_code = status.HTTP_200_OK,
+                message = RateLimitBucketSuccessMessages.BUCKET_REFILLED.value,
+                data = {"tokens": float(tokens)}
+            )
+        except Exception as e:
+            error_logger.error(f"RateLimitBucketRepository.refill | {str(e)}")
+            return RepositoryClassResponse(
+                status = False,
+                status_code = status.HTTP_500_INTERNAL_SERVER_ERROR,
+                message = str(e)
+            )
+
+    async def consume(self, bucket_key : str, cost : float) -> RepositoryClassResponse:
+        try:
+            obj = (
+                update(RateLimitBucket)
+                .where(RateLimitBucket.bucket_key == bucket_key)
+                .values(tokens=RateLimitBucket.tokens - cost)
+            )
+            await self.db.execute(obj)
+            await self.db.flush()
+
+            debug_logger.debug(f"RateLimitBucketRepository.consume | bucket_key = {bucket_key}, cost = {cost}")
+            return RepositoryClassResponse(
+                status = True,
+                status_code = status.HTTP_200_OK,
+                message = RateLimitBucketSuccessMessages.BUCKET_CONSUMED.value,
+                data = {}
+            )
+        except Exception as e:
+            error_logger.error(f"RateLimitBucketRepository.consume | {str(e)}")
+            return RepositoryClassResponse(
+                status = False,
+                status_code = status.HTTP_500_INTERNAL_SERVER_ERROR,
+                message = str(e)
+            )
+
+    async def count_active(self, key_prefix : str, window_seconds : float, exclude_key : str = None) -> RepositoryClassResponse:
+        try:
+            conditions = [
+                RateLimitBucket.bucket_key.startswith(key_prefix, autoescape=True),
+                RateLimitBucket.updated_at > func.clock_timestamp() - func.make_interval(0, 0, 0, 0, 0, 0, window_seconds),
+            ]
+            if exclude_key:
+                conditions.append(RateLimitBucket.bucket_key != exclude_key)
+            obj = select(func.count()).select_from(RateLimitBucket).where(and_(*conditions))
+            count = (await self.db.execute(obj)).scalar_one()
+
+            debug_logger.debug(f"RateLimitBucketRepository.count_active | key_prefix = {key_prefix}, count = {count}")
+            return RepositoryClassResponse(
+                status = True,
+                status_code = status.HTTP_200_OK,
+                message = RateLimitBucketSuccessMessages.ACTIVE_BUCKETS_COUNTED.value,
+                data = {"count": int(count)}
+            )
+        except Exception as e:
+            error_logger.error(f"RateLimitBucketRepository.count_active | {str(e)}")
+            return RepositoryClassResponse(
+                status = False,
+                status_code = status.HTTP_500_INTERNAL_SERVER_ERROR,
+                message = str(e)
+            )
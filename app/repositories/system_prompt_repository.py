@@ -66,7 +66,7 @@ class SystemPromptRepository:
                 message = str(e)
             )
     
-    def insert(self,agent_id : str, ai_model : str, system_prompt : str) -> RepositoryClassResponse:
+    def insert(self,agent_id : str, ai_model : str, system_prompt : str, response_cache_ttl_seconds : int = None, priority_lane : str = None, request_timeout_seconds : int = None, fallback_models : list[str] = None, max_output_tokens : int = None, temperature : float = None, stop_sequences : list[str] = None) -> RepositoryClassResponse:
         try:
             if not system_prompt or system_prompt is None or system_prompt == "":
                 error_logger.error(f"SystemPromptRepository.insert | System prompt is not provided in the request | system_prompt = {system_prompt}")
@@ -93,7 +93,14 @@ class SystemPromptRepository:
             obj = SystemPrompt(
                 llm_system_prompt=system_prompt,
                 ai_agent_id=agent_id,
-                ai_model=ai_model
+                ai_model=ai_model,
+                response_cache_ttl_seconds=response_cache_ttl_seconds,
+                priority_lane=priority_lane,
+                request_timeout_seconds=request_timeout_seconds,
+                fallback_models=fallback_models or None,
+                max_output_tokens=max_output_tokens,
+                temperature=temperature,
+                stop_sequences=stop_sequences or None
             )
             self.db.add(obj)
             self.db.flush()
@@ -114,7 +121,7 @@ class SystemPromptRepository:
                 message=str(e)
             )
     
-    def update(self, agent_id: str, ai_model : str, system_prompt: str) -> RepositoryClassResponse:
+    def update(self, agent_id: str, ai_model : str, system_prompt: str, response_cache_ttl_seconds : int = None, priority_lane : str = None, request_timeout_seconds : int = None, fallback_models : list[str] = None, max_output_tokens : int = None, temperature : float = None, stop_sequences : list[str] = None) -> RepositoryClassResponse:
         try:
             if (not system_prompt or system_prompt is None or system_prompt == "") and (not ai_model or ai_model is None or ai_model == ""):
                 error_logger.error(f"SystemPromptRepository.update | Both system_prompt and ai_model is not provided in the request body")
@@ -149,6 +156,28 @@ class SystemPromptRepository:
             if ai_model and ai_model.strip():
                 obj.ai_model = ai_model
 
+            if response_cache_ttl_seconds is not None:
+                obj.response_cache_ttl_seconds = response_cache_ttl_seconds
+
+            if priority_lane:
+                obj.priority_lane = priority_lane
+
+            if request_timeout_seconds is not None:
+                obj.request_timeout_seconds = request_timeout_seconds
+
+            # an empty list removes the agent's own chain
+            if fallback_models is not None:
+                obj.fallback_models = fallback_models or None
+
+            if max_output_tokens is not None:
+                obj.max_output_tokens = max_output_tokens
+
+            if temperature is not None:
+                obj.temperature = temperature
+
+            if stop_sequences is not None:
+                obj.stop_sequences = stop_sequences or None
+
             # ORM handles updated_at automatically (onupdate=func.now())
             self.db.flush()
             self.db.refresh(obj)
@@ -3,13 +3,14 @@ import time
 
 # db orm related imports
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import (select, update, delete, text, func, and_)
 
 # imports related to database table models
 from app.models.db_table_models.user_prompt_table import UserPrompt
 
 # import repositories
-from app.repositories.ai_agent_repository import AIAgentRepository
+from app.repositories.ai_agent_repository import AIAgentRepository, AsyncAIAgentRepository
 
 # import messages
 from app.utils.success_messages import ( UserPromptApiSuccessMessages)
@@ -394,4 +395,127 @@ class UserPromptRepository:
                     status = False,
                     status_code = status.HTTP_500_INTERNAL_SERVER_ERROR,
                     message = str(e)
-                )
\ No newline at end of file
+                )
+
+class AsyncUserPromptRepository:
+    """
+    AsyncSession variant of the UserPromptRepository methods the prompt endpoints use.
+    """
+    def __init__(self, db : AsyncSession):
+        self.db = db
+        debug_logger.debug(f"AsyncUserPromptRepository.__init__ | AsyncUserPromptRepository initialized | database_session = {self.db}")
+        self.ai_agent_repo = AsyncAIAgentRepository(db=self.db)
+
+    async def check_if_ai_agent_name_exists(self, agent_id : str) -> RepositoryClassResponse:
+        try:
+            result = await self.ai_agent_repo.get_one(
+                    agent_id=agent_id
+                )
+            if not result.status:
+                error_logger.error(f"AsyncUserPromptRepository.check_if_ai_agent_name_exists | operation_type = {DbRecordLevelOperationType.GET_ONE.value} | error = {result.message}")
+                return RepositoryClassResponse(
+                    status = False,
+                    status_code = status.HTTP_404_NOT_FOUND,
+                    message = AgentApiErrorMessages.AGENT_ID_NOT_FOUND.value
+                )
+            debug_logger.debug(f"AsyncUserPromptRepository.check_if_ai_agent_name_exists | result = {result}")
+            return RepositoryClassResponse(
+                    status = True,
+                    status_code = result.status_code,
+                    message = result.message,
+                    data=result.data
+                )
+        except Exception as e:
+            error_logger.error(f"AsyncUserPromptRepository.check_if_ai_agent_name_exists | {str(e)}")
+            return RepositoryClassResponse(
+                status = False,
+                status_code = status.HTTP_500_INTERNAL_SERVER_ERROR,
+                message = str(e)
+            )
+
+    async def insert(self,agent_id : str, user_prompt : str, verify_agent : bool = True, token_counts : dict = None) -> RepositoryClassResponse:
+        """
+        verify_agent=False skips the agent lookup when the caller already knows the agent exists (e.g. from AgentContextRepository.load).
+        token_counts is {model name: tokens} of the prompt.
+        """
+        try:
+            if not agent_id or agent_id is None or agent_id == "":
+                error_logger.error(f"AsyncUserPromptRepository.insert | User prompt is not provided in the request | user_prompt = {agent_id}")
+                return RepositoryClassResponse(
+                    status=False,
+                    status_code = status.HTTP_400_BAD_REQUEST,
+                    message=AgentApiErrorMessages.AI_AGENT_ID_EMPTY.value
+                )
+            if not user_prompt or user_prompt is None or user_prompt == "":
+                error_logger.error(f"AsyncUserPromptRepository.insert | User prompt is not provided in the request | user_prompt = {user_prompt}")
+                return RepositoryClassResponse(
+                    status=False,
+                    status_code = status.HTTP_400_BAD_REQUEST,
+                    message=UserPromptApiErrorMessages.USER_PROMPT_EMPTY.value
+                )
+            if verify_agent:
+                result = await self.check_if_ai_agent_name_exists(agent_id)
+                if not result.status:
+                    error_logger.error(f"AsyncUserPromptRepository.insert | result = {result}")
+                    return RepositoryClassResponse(
+                            status = result.status,
+                            status_code = result.status_code,
+                            message = result.message
+                        )
+
+            obj = UserPrompt(
+                llm_user_prompt=user_prompt,
+                ai_agent_id=agent_id,
+                token_counts=token_counts,
+            )
+
+            self.db.add(obj)
+            await self.db.flush()
+            await self.db.refresh(obj)
+            row = obj.to_dict()
+
+            debug_logger.debug(f"AsyncUserPromptRepository.insert | insert user_prompt | db_response = {row}")
+            return RepositoryClassResponse(
+                status=True,
+                status_code=status.HTTP_201_CREATED,
+                message=UserPromptApiSuccessMessages.USER_PROMPT_INSERTED.value,
+                data=row
+            )
+        except Exception as e:
+            error_logger.error(f"AsyncUserPromptRepository.insert | {str(e)}")
+            return RepositoryClassResponse(
+                status=False,
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                message=str(e)
+            )
+
+    async def get_one(self, llm_user_prompt_id : int) -> RepositoryClassResponse:
+        try:
+            obj = select(UserPrompt).where(UserPrompt.id==llm_user_prompt_id)
+            row = (await self.db.execute(obj)).scalar_one_or_none()
+
+            if not row:
+                error_logger.error(
+                    f"AsyncUserPromptRepository.get_one | {UserPromptApiErrorMessages.USER_PROMPT_NOT_FOUND_MESSAGE.value} "
+                )
+                return RepositoryClassResponse(
+                    status=False,
+                    status_code = status.HTTP_404_NOT_FOUND,
+                    message=UserPromptApiErrorMessages.USER_PROMPT_NOT_FOUND_MESSAGE.value
+                )
+
+            row = row.to_dict()
+            debug_logger.debug(f"AsyncUserPromptRepository.get_one | {UserPromptApiSuccessMessages.USER_PROMPT_FETCHED.value} | user_prompt = {row}")
+            return RepositoryClassResponse(
+                            status = True,
+                            status_code = status.HTTP_200_OK,
+                            message = UserPromptApiSuccessMessages.USER_PROMPT_FETCHED.value,
+                            data=row
+                        )
+        except Exception as e:
+            error_logger.error(f"AsyncUserPromptRepository.get_one | {str(e)}")
+            return RepositoryClassResponse(
+                    status = False,
+                    status_code = status.HTTP_500_INTERNAL_SERVER_ERROR,
+                    message = str(e)
+                )
@@ -0,0 +1,402 @@
+import asyncio
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+
+# import library required for making request to hugging face
+import httpx
+
+# load project configurations
+from app.configs.config import ProjectConfigurations
+
+# import logging utility
+from app.utils.logger import LoggerFactory
+
+# initialize logging utility
+info_logger = LoggerFactory.get_info_logger()
+error_logger = LoggerFactory.get_error_logger()
+debug_logger = LoggerFactory.get_debug_logger()
+
+class ConcurrencyLimitExceededError(Exception):
+    def __init__(self, reason: str, retry_after_seconds: float):
+        super().__init__(f"upstream concurrency limit exceeded ({reason})")
+        self.reason = reason
+        self.retry_after_seconds = retry_after_seconds
+
+class UpstreamPermit:
+    """
+    One in-flight slot. The caller reports how the upstream answered so the limiter can adapt.
+    """
+
+    SUCCESS = "success"
+    OVERLOAD = "overload"
+
+    # what the latency sample measures: the whole generation (blocking) or the time to the response headers (stream)
+    BLOCKING = "blocking"
+    STREAM = "stream"
+
+    def __init__(self, in_flight_at_acquire: int):
+        self.started_at = time.perf_counter()
+        self.in_flight_at_acquire = in_flight_at_acquire
+        self.outcome = None
+        self.latency_seconds = None
+        self.latency_key = None
+
+    def record_status(self, status_code: int, model_name: str = None, kind: str = None) -> None:
+        """
+        model_name / kind say what the latency is comparable with, the latency gradient is kept per (model, kind).
+        """
+        self.latency_seconds = time.perf_counter() - self.started_at
+        self.latency_key = (model_name, kind)
+        # 429 and 5xx are the upstream telling us to slow down
+        self.outcome = self.OVERLOAD if (status_code >= 500 or status_code == 429) else self.SUCCESS
+
+    def record_overload(self) -> None:
+        self.latency_seconds = time.perf_counter() - self.started_at
+        self.outcome = self.OVERLOAD
+
+class _LatencyGradient:
+    """
+    Short / long term latency averages of one kind of sample (model, call kind).
+    """
+    def __init__(self):
+        self.short_latency = None
+        self.long_latency = None
+        self.samples = 0
+
+    def add(self, latency: float) -> None:
+        self.short_latency = latency if self.short_latency is None else 0.3 * latency + 0.7 * self.short_latency
+        self.long_latency = latency if self.long_latency is None else 0.02 * latency + 0.98 * self.long_latency
+        self.samples += 1
+
+class AdaptiveConcurrencyLimiter:
+    """
+    Process wide AIMD limiter for outbound LLM calls
+
+    - At most `limit` upstream calls are in flight, extra callers wait in a queue (bounded length and wait time)
+    - The queue has one FIFO lane per priority class (LLM_PRIORITY_LANES). A free slot goes to the lanes by weighted
+      round robin or strictly by priority (LLM_PRIORITY_MODE), except that a call waiting longer than
+      LLM_PRIORITY_MAX_WAIT_SECONDS is served first so low priority work can not starve
+    - Optional CoDel style shedding (LLM_CONCURRENCY_CODEL_ENABLED): once the queue has not drained for a whole interval,
+      a caller that already waited longer than the target is rejected when its turn comes (and new callers only wait
+      up to the target), so under overload the queue stays short and the calls that do run are still useful
+    - Additive increase: every healthy answer while the window is in use grows the limit by 1/limit
+    - Multiplicative decrease: a 429 / 5xx / timeout, or a short term latency that drifts far above
+      the long term latency, shrinks the limit (at most once per cooldown so a burst of failures counts once).
+      The latency averages are kept per (model, call kind) so a full R1 generation is never compared with the
+      time to headers of a stream or with a small model's answers
+
+    Only used from the event loop so it does not need a lock.
+    """
+
+    _min_limit = int(ProjectConfigurations.LLM_CONCURRENCY_MIN_LIMIT.value)
+    _max_limit = int(ProjectConfigurations.LLM_CONCURRENCY_MAX_LIMIT.value)
+    _backoff_ratio = float(ProjectConfigurations.LLM_CONCURRENCY_BACKOFF_RATIO.value)
+    _latency_tolerance = float(ProjectConfigurations.LLM_CONCURRENCY_LATENCY_TOLERANCE.value)
+    _max_queue = int(ProjectConfigurations.LLM_CONCURRENCY_MAX_QUEUE.value)
+    _queue_timeout_seconds = float(ProjectConfigurations.LLM_CONCURRENCY_QUEUE_TIMEOUT_SECONDS.value)
+
+    # [(lane, weight), ...] from the highest to the lowest priority
+    _lanes = [
+        (lane.split(":")[0].strip(), max(1, int(lane.split(":")[1]) if ":" in lane else 1))
+        for lane in str(ProjectConfigurations.LLM_PRIORITY_LANES.value).split(",") if lane.strip()
+    ]
+    _lane_weights = dict(_lanes)
+    _strict_priority = str(ProjectConfigurations.LLM_PRIORITY_MODE.value).lower() == "strict"
+    _max_wait_seconds = float(ProjectConfigurations.LLM_PRIORITY_MAX_WAIT_SECONDS.value)
+    _codel_target_seconds = float(ProjectConfigurations.LLM_CONCURRENCY_CODEL_TARGET_SECONDS.value)
+    _codel_interval_seconds = float(ProjectConfigurations.LLM_CONCURRENCY_CODEL_INTERVAL_SECONDS.value)
+
+    _limit = float(ProjectConfigurations.LLM_CONCURRENCY_INITIAL_LIMIT.value)
+    _in_flight = 0
+    # lane -> FIFO of (future, enqueued_at)
+    _waiters: "dict[str, deque[tuple[asyncio.Future, float]]]" = {lane: deque() for lane in _lane_weights}
+    # smooth weighted round robin state
+    _current_weights = {lane: 0 for lane in _lane_weights}
+    # last time nobody was waiting, the queue is "standing" when that is more than a CoDel interval ago
+    _queue_empty_at = time.monotonic()
+
+    # exponentially weighted moving averages of the upstream latency, every kind of sample together
+    # (slot hold time estimate for the admission control and the decrease cooldown, not compared with each other)
+    _short_latency = None
+    _long_latency = None
+    # (model, call kind) -> _LatencyGradient, what the "latency is rising" decrease compares
+    _gradients: "dict[tuple[str, str], _LatencyGradient]" = {}
+    # samples a gradient needs before its long term average means anything
+    _min_gradient_samples = 5
+    _last_decrease_at = 0.0
+
+    _counters = {
+        "acquired": 0,
+        "queued": 0,
+        "rejected_queue_full": 0,
+        "rejected_queue_timeout": 0,
+        "rejected_queue_delay": 0,
+        "increases": 0,
+        "decreases": 0,
+    }
+    _lane_counters = {
+        lane: {
+            "acquired": 0,
+            "queued": 0,
+            "rejected_queue_full": 0,
+            "rejected_queue_timeout": 0,
+            "rejected_queue_delay": 0,
+            "served_after_max_wait": 0,
+            "peak_queued": 0,
+            "avg_wait_ms": 0.0,
+        }
+        for lane in _lane_weights
+    }
+
+    @classmethod
+    def _capacity(cls) -> int:
+        return max(cls._min_limit, int(cls._limit))
+
+    @classmethod
+    def is_lane(cls, lane: str) -> bool:
+        return lane in cls._lane_weights
+
+    @classmethod
+    def lanes(cls) -> list[str]:
+        return [lane for lane, _ in cls._lanes]
+
+    @classmethod
+    def resolve_lane(cls, *candidates: str | None) -> str:
+        """
+        First known lane among the candidates (e.g. request header, agent setting), else LLM_PRIORITY_DEFAULT_LANE.
+        """
+        for lane in candidates:
+            if lane and cls.is_lane(lane):
+                return lane
+        default_lane = str(ProjectConfigurations.LLM_PRIORITY_DEFAULT_LANE.value)
+        return default_lane if cls.is_lane(default_lane) else cls._lanes[0][0]
+
+    @classmethod
+    def _queued(cls) -> int:
+        return sum(len(waiters) for waiters in cls._waiters.values())
+
+    @classmethod
+    def load(cls) -> dict:
+        """
+        Live numbers for the admission control.
+        """
+        return {
+            "in_flight": cls._in_flight,
+            "capacity": cls._capacity(),
+            "queued": cls._queued(),
+            "long_latency_seconds": cls._long_latency,
+        }
+
+    @classmethod
+    def _queue_standing(cls, now: float) -> bool:
+        return (
+            ProjectConfigurations.LLM_CONCURRENCY_CODEL_ENABLED.value
+            and cls._queued() > 0
+            and now - cls._queue_empty_at >= cls._codel_interval_seconds
+        )
+
+    @classmethod
+    def _pick_lane(cls) -> str | None:
+        """
+        Lane whose first waiter gets the next free slot.
+        """
+        for waiters in cls._waiters.values():
+            # drop waiters that already gave up
+            while waiters and waiters[0][0].done():
+                waiters.popleft()
+        non_empty = [lane for lane, _ in cls._lanes if cls._waiters[lane]]
+        if not non_empty:
+            cls._queue_empty_at = time.monotonic()
+            return None
+
+        if len(non_empty) == 1:
+            return non_empty[0]
+
+        # starvation protection: the oldest waiter goes first once it waited too long
+        oldest_lane = min(non_empty, key=lambda lane: cls._waiters[lane][0][1])
+        if time.monotonic() - cls._waiters[oldest_lane][0][1] >= cls._max_wait_seconds:
+            cls._lane_counters[oldest_lane]["served_after_max_wait"] += 1
+            return oldest_lane
+
+        if cls._strict_priority:
+            return non_empty[0]
+
+        # smooth weighted round robin (interleaves the lanes instead of serving them in bursts)
+        total_weight = 0
+        for lane in non_empty:
+            cls._current_weights[lane] += cls._lane_weights[lane]
+            total_weight += cls._lane_weights[lane]
+        picked = max(non_empty, key=lambda lane: cls._current_weights[lane])
+        cls._current_weights[picked] -= total_weight
+        return picked
+
+    @classmethod
+    def _wake_waiters(cls) -> None:
+        while cls._in_flight < cls._capacity():
+            lane = cls._pick_lane()
+            if lane is None:
+                return
+            now = time.monotonic()
+            standing = cls._queue_standing(now)
+            waiter, enqueued_at = cls._waiters[lane].popleft()
+            if standing and now - enqueued_at > cls._codel_target_seconds:
+                # the answer would come too late to be useful, free the caller now and try the next one
+                cls._counters["rejected_queue_delay"] += 1
+                cls._lane_counters[lane]["rejected_queue_delay"] += 1
+                waiter.set_exception(ConcurrencyLimitExceededError(reason="queue delay", retry_after_seconds=cls._codel_interval_seconds))
+                continue
+            # hand the slot over directly so nobody can jump the queue
+            cls._in_flight += 1
+            waiter.set_result(True)
+            wait_ms = (time.monotonic() - enqueued_at) * 1000
+            lane_counters = cls._lane_counters[lane]
+            lane_counters["avg_wait_ms"] = 0.1 * wait_ms + 0.9 * lane_counters["avg_wait_ms"]
+
+    @classmethod
+    async def acquire(cls, lane: str | None = None) -> UpstreamPermit:
+        lane = cls.resolve_lane(lane)
+        lane_counters = cls._lane_counters[lane]
+        if cls._in_flight < cls._capacity() and not cls._queued():
+            cls._in_flight += 1
+            cls._counters["acquired"] += 1
+            lane_counters["acquired"] += 1
+            return UpstreamPermit(in_flight_at_acquire=cls._in_flight)
+
+        # every lane has its own bound so a batch backlog can not fill the queue for interactive calls
+        waiters = cls._waiters[lane]
+        if len(waiters) >= cls._max_queue:
+            cls._counters["rejected_queue_full"] += 1
+            lane_counters["rejected_queue_full"] += 1
+            raise ConcurrencyLimitExceededError(reason="queue full", retry_after_seconds=cls._queue_timeout_seconds)
+
+        now = time.monotonic()
+        if not cls._queued():
+            cls._queue_empty_at = now
+        # while the queue is standing new callers only wait up to the CoDel target
+        queue_timeout_seconds = min(cls._queue_timeout_seconds, cls._codel_target_seconds) if cls._queue_standing(now) else cls._queue_timeout_seconds
+        waiter = asyncio.get_running_loop().create_future()
+        entry = (waiter, now)
+        waiters.append(entry)
+        cls._counters["queued"] += 1
+        lane_counters["queued"] += 1
+        lane_counters["peak_queued"] = max(lane_counters["peak_queued"], len(waiters))
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter), timeout=queue_timeout_seconds)
+        except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+            if waiter.done() and not waiter.cancelled() and waiter.exception() is None:
+                # the slot was handed to us at the same moment, give it back
+                cls._release_slot()
+            else:
+                waiter.cancel()
+                try:
+                    waiters.remove(entry)
+                except ValueError:
+                    pass
+            if isinstance(e, asyncio.CancelledError):
+                raise
+            cls._counters["rejected_queue_timeout"] += 1
+            lane_counters["rejected_queue_timeout"] += 1
+            debug_logger.debug(f"AdaptiveConcurrencyLimiter.acquire | gave up waiting for an upstream slot | lane = {lane}, limit = {cls._limit:.2f}, in_flight = {cls._in_flight}, queued = {cls._queued()}")
+            raise ConcurrencyLimitExceededError(reason="queue timeout", retry_after_seconds=cls._queue_timeout_seconds)
+
+        cls._counters["acquired"] += 1
+        lane_counters["acquired"] += 1
+        return UpstreamPermit(in_flight_at_acquire=cls._in_flight)
+
+    @classmethod
+    def _release_slot(cls) -> None:
+        cls._in_flight = max(0, cls._in_flight - 1)
+        cls._wake_waiters()
+
+    @classmethod
+    def _decrease(cls, reason: str) -> None:
+        now = time.monotonic()
+        cooldown = cls._short_latency or 1.0
+        if now - cls._last_decrease_at < cooldown:
+            return
+        old_limit = cls._limit
+        cls._limit = max(float(cls._min_limit), cls._limit * cls._backoff_ratio)
+        cls._last_decrease_at = now
+        cls._counters["decreases"] += 1
+        info_logger.info(f"AdaptiveConcurrencyLimiter._decrease | {reason} | limit {old_limit:.2f} -> {cls._limit:.2f}")
+
+    @classmethod
+    def release(cls, permit: UpstreamPermit) -> None:
+        if permit.outcome == UpstreamPermit.OVERLOAD:
+            cls._decrease(reason="upstream overloaded")
+        elif permit.outcome == UpstreamPermit.SUCCESS:
+            latency = permit.latency_seconds
+            cls._short_latency = latency if cls._short_latency is None else 0.3 * latency + 0.7 * cls._short_latency
+            cls._long_latency = latency if cls._long_latency is None else 0.02 * latency + 0.98 * cls._long_latency
+            gradient = cls._gradients.get(permit.latency_key)
+            if gradient is None:
+                gradient = cls._gradients[permit.latency_key] = _LatencyGradient()
+            gradient.add(latency)
+
+            if gradient.samples >= cls._min_gradient_samples and gradient.short_latency > gradient.long_latency * cls._latency_tolerance:
+                cls._decrease(reason="latency is rising")
+            elif permit.in_flight_at_acquire * 2 >= cls._capacity() and cls._limit < cls._max_limit:
+                # only grow when the window is actually being used, an idle service must not inflate the limit
+                cls._limit = min(float(cls._max_limit), cls._limit + 1.0 / cls._limit)
+                cls._counters["increases"] += 1
+        # no outcome means the call was cancelled before the upstream answered, nothing to learn from it
+        cls._release_slot()
+
+    @classmethod
+    @asynccontextmanager
+    async def slot(cls, lane: str | None = None):
+        """
+        async with AdaptiveConcurrencyLimiter.slot(lane) as permit: ... permit.record_status(resp.status_code)
+        Timeouts and connection errors inside the block are recorded as overload automatically.
+        When the limiter is disabled the permit is still returned but nothing is limited (and lanes do not matter).
+        """
+        if not ProjectConfigurations.LLM_CONCURRENCY_LIMITER_ENABLED.value:
+            yield UpstreamPermit(in_flight_at_acquire=0)
+            return
+
+        permit = await cls.acquire(lane=lane)
+        try:
+            yield permit
+        except (httpx.TimeoutException, httpx.TransportError):
+            if permit.outcome is None:
+                permit.record_overload()
+            raise
+        finally:
+            cls.release(permit)
+
+    @classmethod
+    def stats(cls) -> dict:
+        return {
+            **cls._counters,
+            "enabled": ProjectConfigurations.LLM_CONCURRENCY_LIMITER_ENABLED.value,
+            "limit": round(cls._limit, 2),
+            "min_limit": cls._min_limit,
+            "max_limit": cls._max_limit,
+            "in_flight": cls._in_flight,
+            "queued": cls._queued(),
+            "priority_mode": "strict" if cls._strict_priority else "weighted",
+            "codel_enabled": ProjectConfigurations.LLM_CONCURRENCY_CODEL_ENABLED.value,
+            "queue_standing": cls._queue_standing(time.monotonic()),
+            "lanes": {
+                lane: {
+                    **cls._lane_counters[lane],
+                    "avg_wait_ms": round(cls._lane_counters[lane]["avg_wait_ms"], 2),
+                    "weight": weight,
+                    "queued_now": len(cls._waiters[lane]),
+                }
+                for lane, weight in cls._lanes
+            },
+            "short_latency_ms": round(cls._short_latency * 1000, 2) if cls._short_latency is not None else None,
+            "long_latency_ms": round(cls._long_latency * 1000, 2) if cls._long_latency is not None else None,
+            "latency_gradients": [
+                {
+                    "model": model_name,
+                    "kind": kind,
+                    "samples": gradient.samples,
+                    "short_latency_ms": round(gradient.short_latency * 1000, 2),
+                    "long_latency_ms": round(gradient.long_latency * 1000, 2),
+                }
+                for (model_name, kind), gradient in cls._gradients.items()
+            ],
+        }
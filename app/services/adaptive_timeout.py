@@ -0,0 +1,121 @@
+import time
+from collections import deque
+
+# load project configurations
+from app.configs.config import ProjectConfigurations
+
+# import logging utility
+from app.utils.logger import LoggerFactory
+
+# initialize logging utility
+info_logger = LoggerFactory.get_info_logger()
+error_logger = LoggerFactory.get_error_logger()
+debug_logger = LoggerFactory.get_debug_logger()
+
+class _LatencyWindow:
+    def __init__(self, max_samples: int):
+        self.samples = deque(maxlen=max_samples)
+        self.timeout_seconds = None
+        self.timeouts = 0
+        self.updated_at = None
+
+    def quantile(self, q: float) -> float:
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+class AdaptiveTimeout:
+    """
+    Read timeout per (model, call kind) learned from the latencies the upstream actually had
+
+    - blocking: a chat completion only sends its first byte once the whole answer is generated, the sample is the full call
+    - stream: the longest wait for a single read of the stream (response headers, first token, gaps between tokens),
+      which is what the httpx read timeout applies to
+    The timeout is the LLM_ADAPTIVE_TIMEOUT_QUANTILE of the last LLM_ADAPTIVE_TIMEOUT_WINDOW samples
+    x LLM_ADAPTIVE_TIMEOUT_FACTOR, clamped to [LLM_ADAPTIVE_TIMEOUT_MIN_SECONDS, LLM_ADAPTIVE_TIMEOUT_MAX_SECONDS].
+    A call that timed out is kept as a sample of the time it waited, so a timeout that is too short grows instead of
+    only learning from the calls that were fast enough. Until LLM_ADAPTIVE_TIMEOUT_MIN_SAMPLES samples exist
+    HF_READ_TIMEOUT_SECONDS is used.
+    Only used from the event loop so it does not need a lock.
+    """
+
+    BLOCKING = "blocking"
+    STREAM = "stream"
+
+    # sorting the window on every call is wasteful, the timeout is recomputed every few samples
+    _recompute_every = 10
+
+    _windows: dict[tuple[str, str], _LatencyWindow] = {}
+
+    @classmethod
+    def _window(cls, model_name: str, kind: str) -> _LatencyWindow:
+        window = cls._windows.get((model_name, kind))
+        if window is None:
+            window = cls._windows[(model_name, kind)] = _LatencyWindow(max_samples=int(ProjectConfigurations.LLM_ADAPTIVE_TIMEOUT_WINDOW.value))
+        return window
+
+    @classmethod
+    def _recompute(cls, model_name: str, kind: str, window: _LatencyWindow) -> None:
+        if len(window.samples) < int(ProjectConfigurations.LLM_ADAPTIVE_TIMEOUT_MIN_SAMPLES.value):
+            window.timeout_seconds = None
+            return
+        learned = window.quantile(float(ProjectConfigurations.LLM_ADAPTIVE_TIMEOUT_QUANTILE.value)) * float(ProjectConfigurations.LLM_ADAPTIVE_TIMEOUT_FACTOR.value)
+        timeout_seconds = min(
+            float(ProjectConfigurations.LLM_ADAPTIVE_TIMEOUT_MAX_SECONDS.value),
+            max(float(ProjectConfigurations.LLM_ADAPTIVE_TIMEOUT_MIN_SECONDS.value), learned)
+        )
+        if window.timeout_seconds is None or abs(timeout_seconds - window.timeout_seconds) >= 0.1 * window.timeout_seconds:
+            debug_logger.debug(f"AdaptiveTimeout._recompute | read timeout updated | model = {model_name}, kind = {kind}, timeout = {timeout_seconds:.2f}s, samples = {len(window.samples)}")
+        window.timeout_seconds = timeout_seconds
+        window.updated_at = time.monotonic()
+
+    @classmethod
+    def _add(cls, model_name: str, kind: str, latency_seconds: float) -> _LatencyWindow:
+        window = cls._window(model_name, kind)
+        window.samples.append(latency_seconds)
+        if window.timeout_seconds is None or len(window.samples) % cls._recompute_every == 0:
+            cls._recompute(model_name, kind, window)
+        return window
+
+    @classmethod
+    def record(cls, model_name: str, kind: str, latency_seconds: float) -> None:
+        cls._add(model_name, kind, latency_seconds)
+
+    @classmethod
+    def record_timeout(cls, model_name: str, kind: str, waited_seconds: float) -> None:
+        window = cls._add(model_name, kind, waited_seconds)
+        window.timeouts += 1
+
+    @classmethod
+    def read_timeout(cls, model_name: str, kind: str) -> float:
+        default_seconds = float(ProjectConfigurations.HF_READ_TIMEOUT_SECONDS.value)
+        if not ProjectConfigurations.LLM_ADAPTIVE_TIMEOUT_ENABLED.value:
+            return default_seconds
+        window = cls._windows.get((model_name, kind))
+        if window is None or window.timeout_seconds is None:
+            return default_seconds
+        return window.timeout_seconds
+
+    @classmethod
+    def stats(cls) -> dict:
+        now = time.monotonic()
+        return {
+            "enabled": ProjectConfigurations.LLM_ADAPTIVE_TIMEOUT_ENABLED.value,
+            "default_read_timeout_seconds": float(ProjectConfigurations.HF_READ_TIMEOUT_SECONDS.value),
+            "quantile": float(ProjectConfigurations.LLM_ADAPTIVE_TIMEOUT_QUANTILE.value),
+            "factor": float(ProjectConfigurations.LLM_ADAPTIVE_TIMEOUT_FACTOR.value),
+            "timeouts": [
+                {
+                    "model": model_name,
+                    "kind": kind,
+                    "read_timeout_seconds": round(cls.read_timeout(model_name, kind), 2),
+                    "learned": window.timeout_seconds is not None,
+                    "samples": len(window.samples),
+                    "p50_ms": round(window.quantile(0.5) * 1000, 2) if window.samples else None,
+                    "p99_ms": round(window.quantile(0.99) * 1000, 2) if window.samples else None,
+                    "max_ms": round(max(window.samples) * 1000, 2) if window.samples else None,
+                    "timed_out": window.timeouts,
+                    "updated_seconds_ago": round(now - window.updated_at, 2) if window.updated_at is not None else None,
+                }
+                for (model_name, kind), window in cls._windows.items()
+            ],
+        }
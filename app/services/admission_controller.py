@@ -0,0 +1,159 @@
+import time
+
+# import asynchronous i/o
+import asyncio
+
+# live overload signals
+from app.services.adaptive_concurrency_limiter import AdaptiveConcurrencyLimiter
+from app.database.db_pool_monitor import DBPoolMonitor
+from app.database.db_session import engine, async_engine
+
+# load project configurations
+from app.configs.config import ProjectConfigurations
+
+# import logging utility
+from app.utils.logger import LoggerFactory
+
+# initialize logging utility
+info_logger = LoggerFactory.get_info_logger()
+error_logger = LoggerFactory.get_error_logger()
+debug_logger = LoggerFactory.get_debug_logger()
+
+class AdmissionRejectedError(Exception):
+    def __init__(self, reason: str, retry_after_seconds: float):
+        super().__init__(f"request not admitted ({reason})")
+        self.reason = reason
+        self.retry_after_seconds = retry_after_seconds
+
+class AdmissionController:
+    """
+    Process wide load shedding for the prompt endpoints
+
+    A new request is rejected right away (503 + Retry-After) when any live signal is past its threshold:
+    - in_flight: prompt requests this worker is already processing (ADMISSION_MAX_IN_FLIGHT)
+    - upstream_queue: every upstream slot is busy and this many calls already wait for one (ADMISSION_MAX_UPSTREAM_QUEUE)
+    - db_pool_wait: recent wait for a database connection (ADMISSION_MAX_DB_POOL_WAIT_MS)
+    - event_loop_lag: how late the event loop runs a timer, sampled by a task started in the app lifespan (ADMISSION_MAX_EVENT_LOOP_LAG_MS)
+    Rejecting early is cheap, so the requests that are admitted still finish in time instead of all of them timing out together.
+
+    Only used from the event loop so it does not need a lock.
+    """
+
+    _lag_sample_interval_seconds = 0.25
+
+    _in_flight = 0
+    _event_loop_lag_seconds = 0.0
+    _lag_monitor_task: asyncio.Task | None = None
+
+    _counters = {
+        "admitted": 0,
+        "rejected_in_flight": 0,
+        "rejected_upstream_queue": 0,
+        "rejected_db_pool_wait": 0,
+        "rejected_event_loop_lag": 0,
+    }
+
+    @classmethod
+    async def _monitor_event_loop_lag(cls) -> None:
+        interval = cls._lag_sample_interval_seconds
+        while True:
+            started_at = time.perf_counter()
+            await asyncio.sleep(interval)
+            lag = max(0.0, time.perf_counter() - started_at - interval)
+            # rises at once, decays over a few samples
+            cls._event_loop_lag_seconds = lag if lag > cls._event_loop_lag_seconds else 0.5 * lag + 0.5 * cls._event_loop_lag_seconds
+
+    @classmethod
+    async def start(cls) -> None:
+        if cls._lag_monitor_task is None:
+            cls._lag_monitor_task = asyncio.create_task(cls._monitor_event_loop_lag(), name="event-loop-lag-monitor")
+            info_logger.info(f"AdmissionController.start | event loop lag monitor started")
+
+    @classmethod
+    async def stop(cls) -> None:
+        task, cls._lag_monitor_task = cls._lag_monitor_task, None
+        if task is None:
+            return
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+        info_logger.info(f"AdmissionController.stop | event loop lag monitor stopped")
+
+    @classmethod
+    def signals(cls) -> dict:
+        upstream = AdaptiveConcurrencyLimiter.load()
+        return {
+            "in_flight": cls._in_flight,
+            "upstream_in_flight": upstream["in_flight"],
+            "upstream_capacity": upstream["capacity"],
+            "upstream_queue": upstream["queued"],
+            "db_pool_wait_ms": round(DBPoolMonitor.recent_wait_seconds() * 1000, 2),
+            "event_loop_lag_ms": round(cls._event_loop_lag_seconds * 1000, 2),
+        }
+
+    @classmethod
+    def _upstream_retry_after_seconds(cls, upstream: dict) -> float:
+        # roughly how long the queue ahead needs to drain
+        latency = upstream["long_latency_seconds"] or 0.0
+        return upstream["queued"] / max(1, upstream["capacity"]) * latency
+
+    @classmethod
+    def _rejection(cls) -> AdmissionRejectedError | None:
+        retry_after_seconds = float(ProjectConfigurations.ADMISSION_RETRY_AFTER_SECONDS.value)
+
+        if cls._in_flight >= int(ProjectConfigurations.ADMISSION_MAX_IN_FLIGHT.value):
+            return AdmissionRejectedError(reason="in_flight", retry_after_seconds=retry_after_seconds)
+
+        upstream = AdaptiveConcurrencyLimiter.load()
+        if upstream["in_flight"] >= upstream["capacity"] and upstream["queued"] >= int(ProjectConfigurations.ADMISSION_MAX_UPSTREAM_QUEUE.value):
+            return AdmissionRejectedError(
+                reason="upstream_queue",
+                retry_after_seconds=max(retry_after_seconds, cls._upstream_retry_after_seconds(upstream))
+            )
+
+        if DBPoolMonitor.recent_wait_seconds() * 1000 >= float(ProjectConfigurations.ADMISSION_MAX_DB_POOL_WAIT_MS.value):
+            return AdmissionRejectedError(reason="db_pool_wait", retry_after_seconds=retry_after_seconds)
+
+        if cls._event_loop_lag_seconds * 1000 >= float(ProjectConfigurations.ADMISSION_MAX_EVENT_LOOP_LAG_MS.value):
+            return AdmissionRejectedError(reason="event_loop_lag", retry_after_seconds=retry_after_seconds)
+
+        return None
+
+    @classmethod
+    def admit(cls) -> None:
+        """
+        Raises AdmissionRejectedError, otherwise the caller must call release() when the request is done.
+        """
+        if not ProjectConfigurations.ADMISSION_CONTROL_ENABLED.value:
+            cls._in_flight += 1
+            return
+
+        rejection = cls._rejection()
+        if rejection is not None:
+            cls._counters[f"rejected_{rejection.reason}"] += 1
+            info_logger.info(f"AdmissionController.admit | request shed | reason = {rejection.reason}, signals = {cls.signals()}")
+            raise rejection
+
+        cls._in_flight += 1
+        cls._counters["admitted"] += 1
+
+    @classmethod
+    def release(cls) -> None:
+        cls._in_flight = max(0, cls._in_flight - 1)
+
+    @classmethod
+    def stats(cls) -> dict:
+        return {
+            **cls._counters,
+            "enabled": ProjectConfigurations.ADMISSION_CONTROL_ENABLED.value,
+            "signals": cls.signals(),
+            "thresholds": {
+                "in_flight": int(ProjectConfigurations.ADMISSION_MAX_IN_FLIGHT.value),
+                "upstream_queue": int(ProjectConfigurations.ADMISSION_MAX_UPSTREAM_QUEUE.value),
+                "db_pool_wait_ms": float(ProjectConfigurations.ADMISSION_MAX_DB_POOL_WAIT_MS.value),
+                "event_loop_lag_ms": float(ProjectConfigurations.ADMISSION_MAX_EVENT_LOOP_LAG_MS.value),
+            },
+            "db_pool": DBPoolMonitor.stats(pool=engine.pool, async_pool=async_engine.pool),
+        }
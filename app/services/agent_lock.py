@@ -0,0 +1,267 @@
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+
+# import asynchronous i/o
+import asyncio
+
+# db orm related imports
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError, TimeoutError as PoolTimeoutError
+
+# dedicated connection pool for the advisory locks
+from app.database.db_session import advisory_lock_engine
+
+# load project configurations
+from app.configs.config import ProjectConfigurations
+
+# import logging utility
+from app.utils.logger import LoggerFactory
+
+# initialize logging utility
+info_logger = LoggerFactory.get_info_logger()
+error_logger = LoggerFactory.get_error_logger()
+debug_logger = LoggerFactory.get_debug_logger()
+
+# first key of the two-key advisory lock, keeps our locks apart from any other advisory lock user in the database
+AGENT_LOCK_NAMESPACE = 7301
+
+class AgentLockTimeoutError(Exception):
+    def __init__(self, agent_id: str, waited_seconds: float, retry_after_seconds: float):
+        super().__init__(f"timed out waiting for the lock of agent {agent_id}")
+        self.agent_id = agent_id
+        self.waited_seconds = waited_seconds
+        self.retry_after_seconds = retry_after_seconds
+
+class AgentLockCapacityError(Exception):
+    """
+    Every connection of the lock pool is held by a prompt in flight, the worker is at capacity (not this agent).
+    """
+    def __init__(self, agent_id: str, retry_after_seconds: float):
+        super().__init__(f"no agent lock connection available for agent {agent_id}")
+        self.agent_id = agent_id
+        self.retry_after_seconds = retry_after_seconds
+
+class AgentLockHandle:
+    def __init__(self, waited_seconds: float, contended: bool):
+        self.waited_seconds = waited_seconds
+        # True when another prompt of the same agent ran first, its turn is now part of the history
+        self.contended = contended
+
+class AgentLock:
+    """
+    One prompt at a time per agent, across every uvicorn worker
+
+    - inside a process, prompts for the same agent queue on an asyncio.Lock (FIFO, arrival order),
+      so only one of them per process waits in postgres
+    - across processes a session level pg_advisory_lock(namespace, hashtext(agent_id)) is taken on a dedicated
+      connection and held until the turn is stored (postgres grants waiting advisory locks in request order)
+    - the whole wait is bounded by AGENT_LOCK_WAIT_TIMEOUT_SECONDS (lock_timeout on the postgres side),
+      after that AgentLockTimeoutError is raised
+    - the lock pool has one connection per upstream slot (LLM_CONCURRENCY_MAX_LIMIT), a prompt that finds it empty
+      for LLM_CONCURRENCY_QUEUE_TIMEOUT_SECONDS gets AgentLockCapacityError, the worker is full, not the agent busy
+    Different agents never wait on each other's lock.
+    """
+
+    _wait_timeout_seconds = float(ProjectConfigurations.AGENT_LOCK_WAIT_TIMEOUT_SECONDS.value)
+
+    # blocking postgres calls run here, never on the event loop (and never in the default executor),
+    # one thread per lock connection, a thread is blocked for the whole wait (pool checkout + pg_advisory_lock)
+    _executor = ThreadPoolExecutor(
+        max_workers=int(ProjectConfigurations.LLM_CONCURRENCY_MAX_LIMIT.value),
+        thread_name_prefix="agent-lock"
+    )
+    # unlocks never queue behind lock waits (they are what frees the connections the waits are waiting for)
+    _unlock_executor = ThreadPoolExecutor(
+        max_workers=4,
+        thread_name_prefix="agent-unlock"
+    )
+
+    # agent_id -> [asyncio.Lock, number of holders + waiters]
+    _local_locks: dict[str, list] = {}
+
+    _waiting = 0
+    _held = 0
+    _wait_samples: "deque[float]" = deque(maxlen=1000)
+    _counters = {
+        "acquired": 0,
+        "contended": 0,
+        "timeouts": 0,
+        "pool_exhausted": 0,
+        "errors": 0,
+    }
+
+    @staticmethod
+    def _lock_params(agent_id: str) -> dict:
+        return {"namespace": AGENT_LOCK_NAMESPACE, "agent_id": agent_id}
+
+    @classmethod
+    def _lock_blocking(cls, agent_id: str, timeout_seconds: float):
+        """
+        Runs in the executor. Returns (connection, contended) with the advisory lock held.
+        """
+        conn = advisory_lock_engine.connect()
+        try:
+            got_it = conn.execute(
+                text("SELECT pg_try_advisory_lock(:namespace, hashtext(:agent_id))"),
+                cls._lock_params(agent_id)
+            ).scalar_one()
+            contended = not got_it
+            if not got_it:
+                conn.execute(
+                    text("SELECT set_config('lock_timeout', :lock_timeout, false)"),
+                    {"lock_timeout": f"{max(1, int(timeout_seconds * 1000))}ms"}
+                )
+                conn.execute(text("SELECT pg_advisory_lock(:namespace, hashtext(:agent_id))"), cls._lock_params(agent_id))
+            # the lock belongs to the session, do not sit idle in a transaction while the llm answers
+            conn.commit()
+            return conn, contended
+        except BaseException:
+            conn.invalidate()
+            conn.close()
+            raise
+
+    @classmethod
+    def _unlock_blocking(cls, conn, agent_id: str) -> None:
+        try:
+            conn.execute(text("SELECT pg_advisory_unlock(:namespace, hashtext(:agent_id))"), cls._lock_params(agent_id))
+            conn.commit()
+        except Exception as e:
+            # dropping the connection ends the session, postgres releases the lock with it
+            error_logger.error(f"AgentLock._unlock_blocking | unlock failed, discarding the connection | agent_id = {agent_id} | {e}")
+            conn.invalidate()
+        finally:
+            conn.close()
+
+    @staticmethod
+    def _is_lock_timeout(e: Exception) -> bool:
+        # 55P03 = lock_not_available (lock_timeout expired)
+        return isinstance(e, OperationalError) and getattr(e.orig, "sqlstate", None) == "55P03"
+
+    @classmethod
+    def _local_lock(cls, agent_id: str) -> tuple[asyncio.Lock, bool]:
+        """
+        Returns the agent's lock and whether another prompt of the agent already holds or waits for it.
+        """
+        entry = cls._local_locks.get(agent_id)
+        if entry is None:
+            entry = cls._local_locks[agent_id] = [asyncio.Lock(), 0]
+        entry[1] += 1
+        return entry[0], entry[1] > 1
+
+    @classmethod
+    def _forget_local_lock(cls, agent_id: str) -> None:
+        entry = cls._local_locks.get(agent_id)
+        if entry is None:
+            return
+        entry[1] -= 1
+        if entry[1] <= 0:
+            del cls._local_locks[agent_id]
+
+    @classmethod
+    def _timeout(cls, agent_id: str, started_at: float) -> AgentLockTimeoutError:
+        waited_seconds = time.monotonic() - started_at
+        cls._counters["timeouts"] += 1
+        info_logger.info(f"AgentLock.hold | gave up waiting for the agent lock | agent_id = {agent_id}, waited = {waited_seconds:.2f}s")
+        return AgentLockTimeoutError(agent_id=agent_id, waited_seconds=waited_seconds, retry_after_seconds=cls._wait_timeout_seconds)
+
+    @classmethod
+    @asynccontextmanager
+    async def hold(cls, agent_id: str, timeout_seconds: float | None = None):
+        """
+        async with AgentLock.hold(agent_id) as handle: ... read history, call the llm, store the turn
+        Yields an AgentLockHandle (handle is None when AGENT_SERIALIZATION_ENABLED is off).
+        timeout_seconds shortens the wait below AGENT_LOCK_WAIT_TIMEOUT_SECONDS (e.g. the rest of the request deadline).
+        """
+        if not ProjectConfigurations.AGENT_SERIALIZATION_ENABLED.value:
+            yield None
+            return
+
+        loop = asyncio.get_running_loop()
+        started_at = time.monotonic()
+        wait_timeout_seconds = cls._wait_timeout_seconds if timeout_seconds is None else min(cls._wait_timeout_seconds, timeout_seconds)
+        local_lock, contended = cls._local_lock(agent_id)
+        cls._waiting += 1
+        local_acquired = False
+        conn = None
+        try:
+            try:
+                await asyncio.wait_for(local_lock.acquire(), timeout=wait_timeout_seconds)
+                local_acquired = True
+            except asyncio.TimeoutError:
+                raise cls._timeout(agent_id=agent_id, started_at=started_at)
+
+            remaining_seconds = max(0.05, wait_timeout_seconds - (time.monotonic() - started_at))
+            lock_future = loop.run_in_executor(cls._executor, cls._lock_blocking, agent_id, remaining_seconds)
+            try:
+                conn, pg_contended = await asyncio.shield(lock_future)
+            except asyncio.CancelledError:
+                # the thread keeps waiting in postgres, give the lock back as soon as it gets it
+                def release_late(future):
+                    if not future.cancelled() and future.exception() is None:
+                        cls._unlock_executor.submit(cls._unlock_blocking, future.result()[0], agent_id)
+                lock_future.add_done_callback(release_late)
+                raise
+            except PoolTimeoutError:
+                cls._counters["pool_exhausted"] += 1
+                error_logger.warning(f"AgentLock.hold | every agent lock connection is in use | agent_id = {agent_id}, pool_size = {ProjectConfigurations.LLM_CONCURRENCY_MAX_LIMIT.value}")
+                raise AgentLockCapacityError(agent_id=agent_id, retry_after_seconds=float(ProjectConfigurations.LLM_CONCURRENCY_QUEUE_TIMEOUT_SECONDS.value))
+            except Exception as e:
+                if cls._is_lock_timeout(e):
+                    raise cls._timeout(agent_id=agent_id, started_at=started_at)
+                cls._counters["errors"] += 1
+                raise
+
+            waited_seconds = time.monotonic() - started_at
+            contended = contended or pg_contended
+        finally:
+            cls._waiting -= 1
+            if conn is None:
+                if local_acquired:
+                    local_lock.release()
+                cls._forget_local_lock(agent_id)
+
+        cls._held += 1
+        cls._counters["acquired"] += 1
+        if contended:
+            cls._counters["contended"] += 1
+        cls._wait_samples.append(waited_seconds)
+        debug_logger.debug(f"AgentLock.hold | agent lock acquired | agent_id = {agent_id}, waited = {waited_seconds * 1000:.1f}ms, contended = {contended}")
+        try:
+            yield AgentLockHandle(waited_seconds=waited_seconds, contended=contended)
+        finally:
+            cls._held -= 1
+            unlock_future = loop.run_in_executor(cls._unlock_executor, cls._unlock_blocking, conn, agent_id)
+
+            def hand_over(_future):
+                local_lock.release()
+                cls._forget_local_lock(agent_id)
+
+            # the next prompt of this worker goes on once postgres released the lock, even if this task is cancelled
+            # while waiting (a cancelled stream is cancelled again at every await)
+            unlock_future.add_done_callback(hand_over)
+            await asyncio.shield(unlock_future)
+
+    @classmethod
+    def stats(cls) -> dict:
+        samples = sorted(cls._wait_samples)
+
+        def percentile(p: float):
+            if not samples:
+                return None
+            return round(samples[min(len(samples) - 1, int(p / 100 * len(samples)))] * 1000, 2)
+
+        return {
+            **cls._counters,
+            "enabled": ProjectConfigurations.AGENT_SERIALIZATION_ENABLED.value,
+            "waiting": cls._waiting,
+            "held": cls._held,
+            "agents_with_local_waiters": len(cls._local_locks),
+            "lock_wait_ms": {
+                "p50": percentile(50),
+                "p95": percentile(95),
+                "p99": percentile(99),
+                "max": round(samples[-1] * 1000, 2) if samples else None,
+            },
+        }
@@ -0,0 +1,196 @@
+import math
+import time
+from collections import deque
+
+# load project configurations
+from app.configs.config import ProjectConfigurations
+
+# import logging utility
+from app.utils.logger import LoggerFactory
+
+# initialize logging utility
+info_logger = LoggerFactory.get_info_logger()
+error_logger = LoggerFactory.get_error_logger()
+debug_logger = LoggerFactory.get_debug_logger()
+
+class CircuitBreakerOpenError(Exception):
+    def __init__(self, breaker_name: str, retry_after_seconds: float):
+        super().__init__(f"circuit breaker {breaker_name} is open")
+        self.breaker_name = breaker_name
+        self.retry_after_seconds = retry_after_seconds
+
+class CircuitBreaker:
+    """
+    Failure-rate circuit breaker for one upstream (endpoint, model) pair
+
+    - CLOSED    : every call goes through, results are kept in a sliding time window
+    - OPEN      : the failure rate in the window crossed the threshold, calls fail fast until open_seconds passed
+    - HALF_OPEN : a few probe calls are let through, if they all succeed the breaker closes, one failure re-opens it
+
+    Only used from the event loop so it does not need a lock.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(
+        self,
+        name: str,
+        failure_rate_threshold: float,
+        minimum_calls: int,
+        window_seconds: float,
+        open_seconds: float,
+        half_open_max_calls: int
+    ):
+        self.name = name
+        self.failure_rate_threshold = failure_rate_threshold
+        self.minimum_calls = minimum_calls
+        self.window_seconds = window_seconds
+        self.open_seconds = open_seconds
+        self.half_open_max_calls = half_open_max_calls
+
+        self.state = self.CLOSED
+        self.opened_at = None
+        self._results = deque()  # (monotonic timestamp, succeeded)
+        self._half_open_in_flight = 0
+        self._half_open_successes = 0
+
+        self.times_opened = 0
+        self.short_circuited_calls = 0
+
+    def _trim_window(self, now: float) -> None:
+        while self._results and now - self._results[0][0] > self.window_seconds:
+            self._results.popleft()
+
+    def _transition(self, new_state: str) -> None:
+        if new_state == self.state:
+            return
+        info_logger.info(f"CircuitBreaker._transition | breaker = {self.name} | {self.state} -> {new_state}")
+        self.state = new_state
+        self._half_open_in_flight = 0
+        self._half_open_successes = 0
+        if new_state == self.OPEN:
+            self.opened_at = time.monotonic()
+            self.times_opened += 1
+        elif new_state == self.CLOSED:
+            self.opened_at = None
+            self._results.clear()
+
+    def retry_after_seconds(self) -> float:
+        if self.state != self.OPEN or self.opened_at is None:
+            return 0.0
+        return max(0.0, self.open_seconds - (time.monotonic() - self.opened_at))
+
+    def has_capacity(self) -> bool:
+        """
+        Whether allow_request() would let a call through right now, without counting anything
+        (an open breaker whose open time ran out will take probes, a half-open one only while it has free probe slots).
+        """
+        if self.state == self.OPEN:
+            return time.monotonic() - self.opened_at >= self.open_seconds and self.half_open_max_calls > 0
+        if self.state == self.HALF_OPEN:
+            return self._half_open_in_flight < self.half_open_max_calls
+        return True
+
+    def allow_request(self) -> bool:
+        if self.state == self.OPEN:
+            if time.monotonic() - self.opened_at >= self.open_seconds:
+                self._transition(self.HALF_OPEN)
+            else:
+                self.short_circuited_calls += 1
+                return False
+
+        if self.state == self.HALF_OPEN:
+            if self._half_open_in_flight >= self.half_open_max_calls:
+                self.short_circuited_calls += 1
+                return False
+            self._half_open_in_flight += 1
+        return True
+
+    def check(self) -> None:
+        """
+        Same as allow_request() but raises CircuitBreakerOpenError so callers can fail fast.
+        """
+        if not self.allow_request():
+            raise CircuitBreakerOpenError(
+                breaker_name=self.name,
+                retry_after_seconds=self.retry_after_seconds() or self.open_seconds
+            )
+
+    def record_success(self) -> None:
+        if self.state == self.HALF_OPEN:
+            self._half_open_in_flight = max(0, self._half_open_in_flight - 1)
+            self._half_open_successes += 1
+            if self._half_open_successes >= self.half_open_max_calls:
+                self._transition(self.CLOSED)
+            return
+        now = time.monotonic()
+        self._results.append((now, True))
+        self._trim_window(now)
+
+    def record_failure(self) -> None:
+        if self.state == self.HALF_OPEN:
+            self._transition(self.OPEN)
+            return
+        now = time.monotonic()
+        self._results.append((now, False))
+        self._trim_window(now)
+        if self.state == self.CLOSED and len(self._results) >= self.minimum_calls and self.failure_rate() >= self.failure_rate_threshold:
+            error_logger.error(f"CircuitBreaker.record_failure | breaker = {self.name} | failure rate {self.failure_rate():.2f} crossed {self.failure_rate_threshold} | opening for {self.open_seconds}s")
+            self._transition(self.OPEN)
+
+    def release(self) -> None:
+        """
+        The call was abandoned (client went away) before we learned anything about the upstream.
+        """
+        if self.state == self.HALF_OPEN:
+            self._half_open_in_flight = max(0, self._half_open_in_flight - 1)
+
+    def failure_rate(self) -> float:
+        if not self._results:
+            return 0.0
+        failures = sum(1 for _, succeeded in self._results if not succeeded)
+        return failures / len(self._results)
+
+    def snapshot(self) -> dict:
+        self._trim_window(time.monotonic())
+        return {
+            "name": self.name,
+            "state": self.state,
+            "failure_rate": round(self.failure_rate(), 4),
+            "calls_in_window": len(self._results),
+            "retry_after_seconds": math.ceil(self.retry_after_seconds()),
+            "times_opened": self.times_opened,
+            "short_circuited_calls": self.short_circuited_calls,
+        }
+
+class CircuitBreakerRegistry:
+    """
+    Process wide registry with one breaker per (endpoint, model)
+    """
+
+    _breakers: dict[tuple[str, str], CircuitBreaker] = {}
+
+    @classmethod
+    def get(cls, endpoint: str, model_name: str) -> CircuitBreaker:
+        key = (endpoint, model_name)
+        breaker = cls._breakers.get(key)
+        if breaker is None:
+            breaker = CircuitBreaker(
+                name=f"{model_name}@{endpoint}",
+                failure_rate_threshold=float(ProjectConfigurations.CIRCUIT_BREAKER_FAILURE_RATE_THRESHOLD.value),
+                minimum_calls=int(ProjectConfigurations.CIRCUIT_BREAKER_MINIMUM_CALLS.value),
+                window_seconds=float(ProjectConfigurations.CIRCUIT_BREAKER_WINDOW_SECONDS.value),
+                open_seconds=float(ProjectConfigurations.CIRCUIT_BREAKER_OPEN_SECONDS.value),
+                half_open_max_calls=int(ProjectConfigurations.CIRCUIT_BREAKER_HALF_OPEN_MAX_CALLS.value)
+            )
+            cls._breakers[key] = breaker
+        return breaker
+
+    @classmethod
+    def snapshot_all(cls) -> dict:
+        return {
+            "enabled": ProjectConfigurations.CIRCUIT_BREAKER_ENABLED.value,
+            "breakers": [breaker.snapshot() for breaker in cls._breakers.values()]
+        }
@@ -0,0 +1,164 @@
+import json
+import random
+import time
+
+# load project configurations
+from app.configs.config import ProjectConfigurations
+
+# import logging utility
+from app.utils.logger import LoggerFactory
+
+# initialize logging utility
+info_logger = LoggerFactory.get_info_logger()
+error_logger = LoggerFactory.get_error_logger()
+debug_logger = LoggerFactory.get_debug_logger()
+
+class _EndpointState:
+    def __init__(self, url: str):
+        self.url = url
+        self.outstanding = 0
+        self.ewma_latency = None
+        self.consecutive_failures = 0
+        self.consecutive_successes = 0
+        self.ejected_until = 0.0
+        self.times_ejected = 0
+        self.total_requests = 0
+        self.total_failures = 0
+
+    def is_ejected(self, now: float) -> bool:
+        return now < self.ejected_until
+
+class EndpointBalancer:
+    """
+    Spreads hugging face calls over several OpenAI compatible endpoints per model
+
+    - endpoints come from HF_MODEL_ENDPOINTS (per model), then HF_API_URLS (all models), then HF_API_URL
+    - selection is "power of two choices": two random healthy endpoints are compared and the one with the
+      lower EWMA latency x (outstanding requests + 1) wins, endpoints without samples are tried first
+    - passive health checks: LLM_ENDPOINT_EJECT_CONSECUTIVE_FAILURES failures in a row eject an endpoint,
+      the ejection time doubles every time (up to LLM_ENDPOINT_MAX_EJECTION_SECONDS) and the endpoint
+      is re-admitted automatically when it runs out, the ejection time only goes back to the base once the endpoint
+      answered LLM_ENDPOINT_HEALTHY_AFTER_SUCCESSES calls in a row (a flapping endpoint keeps backing off)
+    - the last healthy endpoint of a model is never ejected
+    Only used from the event loop.
+    """
+
+    _default_urls = [url.strip() for url in str(ProjectConfigurations.HF_API_URLS.value or "").split(",") if url.strip()]
+    _model_urls: dict[str, list[str]] = json.loads(ProjectConfigurations.HF_MODEL_ENDPOINTS.value or "{}")
+
+    _ewma_alpha = float(ProjectConfigurations.LLM_ENDPOINT_EWMA_ALPHA.value)
+    _eject_after = int(ProjectConfigurations.LLM_ENDPOINT_EJECT_CONSECUTIVE_FAILURES.value)
+    _base_ejection = float(ProjectConfigurations.LLM_ENDPOINT_BASE_EJECTION_SECONDS.value)
+    _max_ejection = float(ProjectConfigurations.LLM_ENDPOINT_MAX_EJECTION_SECONDS.value)
+    _healthy_after = int(ProjectConfigurations.LLM_ENDPOINT_HEALTHY_AFTER_SUCCESSES.value)
+
+    _states: dict[str, _EndpointState] = {}
+
+    @classmethod
+    def _state(cls, url: str) -> _EndpointState:
+        state = cls._states.get(url)
+        if state is None:
+            state = cls._states[url] = _EndpointState(url)
+        return state
+
+    @classmethod
+    def endpoints_for(cls, model_name: str, default_url: str) -> list[str]:
+        return cls._model_urls.get(model_name) or cls._default_urls or [default_url]
+
+    @classmethod
+    def _score(cls, state: _EndpointState) -> float:
+        return (state.ewma_latency or 0.0) * (state.outstanding + 1)
+
+    @classmethod
+    def pick(cls, model_name: str, default_url: str, exclude=(), is_available=None) -> str:
+        """
+        Choose the endpoint for the next call.
+        `exclude` (endpoints already tried by this request) and `is_available` (e.g. circuit breaker not open)
+        are preferences, if nothing is left we fall back to every endpoint that is not ejected.
+        """
+        urls = cls.endpoints_for(model_name, default_url)
+        if len(urls) == 1:
+            return urls[0]
+
+        now = time.monotonic()
+        states = [cls._state(url) for url in urls]
+        healthy = [state for state in states if not state.is_ejected(now)] or [min(states, key=lambda state: state.ejected_until)]
+        candidates = [
+            state for state in healthy
+            if state.url not in exclude and (is_available is None or is_available(state.url))
+        ] or healthy
+
+        if len(candidates) == 1:
+            return candidates[0].url
+        first, second = random.sample(candidates, 2)
+        return first.url if cls._score(first) <= cls._score(second) else second.url
+
+    @classmethod
+    def on_start(cls, url: str) -> None:
+        state = cls._state(url)
+        state.outstanding += 1
+        state.total_requests += 1
+
+    @classmethod
+    def on_success(cls, url: str, latency_seconds: float) -> None:
+        state = cls._state(url)
+        state.outstanding = max(0, state.outstanding - 1)
+        state.consecutive_failures = 0
+        state.consecutive_successes += 1
+        if state.consecutive_successes >= cls._healthy_after:
+            state.times_ejected = 0
+        if state.ewma_latency is None:
+            state.ewma_latency = latency_seconds
+        else:
+            state.ewma_latency = cls._ewma_alpha * latency_seconds + (1 - cls._ewma_alpha) * state.ewma_latency
+
+    @classmethod
+    def on_failure(cls, url: str, model_name: str, default_url: str) -> None:
+        state = cls._state(url)
+        state.outstanding = max(0, state.outstanding - 1)
+        state.consecutive_failures += 1
+        state.consecutive_successes = 0
+        state.total_failures += 1
+        if state.consecutive_failures < cls._eject_after:
+            return
+
+        now = time.monotonic()
+        others_healthy = any(
+            not cls._state(other).is_ejected(now)
+            for other in cls.endpoints_for(model_name, default_url) if other != url
+        )
+        if not others_healthy:
+            return
+        state.times_ejected += 1
+        ejection_seconds = min(cls._max_ejection, cls._base_ejection * (2 ** (state.times_ejected - 1)))
+        state.ejected_until = now + ejection_seconds
+        state.consecutive_failures = 0
+        error_logger.warning(f"EndpointBalancer.on_failure | endpoint ejected | url = {url}, ejection_seconds = {ejection_seconds}")
+
+    @classmethod
+    def on_cancel(cls, url: str) -> None:
+        state = cls._state(url)
+        state.outstanding = max(0, state.outstanding - 1)
+
+    @classmethod
+    def stats(cls) -> dict:
+        now = time.monotonic()
+        return {
+            "default_endpoints": cls._default_urls,
+            "model_endpoints": cls._model_urls,
+            "endpoints": [
+                {
+                    "url": state.url,
+                    "outstanding": state.outstanding,
+                    "ewma_latency_ms": round(state.ewma_latency * 1000, 2) if state.ewma_latency is not None else None,
+                    "consecutive_failures": state.consecutive_failures,
+                    "consecutive_successes": state.consecutive_successes,
+                    "ejected": state.is_ejected(now),
+                    "ejected_for_seconds": round(max(0.0, state.ejected_until - now), 2),
+                    "times_ejected": state.times_ejected,
+                    "total_requests": state.total_requests,
+                    "total_failures": state.total_failures,
+                }
+                for state in cls._states.values()
+            ],
+        }
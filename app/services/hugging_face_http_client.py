@@ -0,0 +1,182 @@
+# import time
+import time
+
+from contextlib import asynccontextmanager
+
+# import library required for making request to hugging face
+import httpx
+
+# load project configurations
+from app.configs.config import ProjectConfigurations
+
+# import logging utility
+from app.utils.logger import LoggerFactory
+
+# initialize logging utility
+info_logger = LoggerFactory.get_info_logger()
+error_logger = LoggerFactory.get_error_logger()
+debug_logger = LoggerFactory.get_debug_logger()
+
+class HuggingFaceHTTPClient:
+    """
+    One httpx.AsyncClient shared by the whole process.
+
+    - Created once in the FastAPI lifespan hook and closed on shutdown
+    - Keeps connections alive between prompts (no TLS handshake per request)
+    - Uses HTTP/2 multiplexing when the h2 package is installed
+    - Keeps simple counters so the connection pool can be sized from real data
+    """
+
+    def __init__(self, HF_API_URL: str):
+        self.HF_API_URL = HF_API_URL
+        self.client: httpx.AsyncClient | None = None
+        self.http2_enabled = False
+        self.limits = httpx.Limits(
+            max_connections=int(ProjectConfigurations.HF_MAX_CONNECTIONS.value),
+            max_keepalive_connections=int(ProjectConfigurations.HF_MAX_KEEPALIVE_CONNECTIONS.value),
+            keepalive_expiry=float(ProjectConfigurations.HF_KEEPALIVE_EXPIRY_SECONDS.value)
+        )
+        self.timeout = httpx.Timeout(
+            connect=float(ProjectConfigurations.HF_CONNECT_TIMEOUT_SECONDS.value),
+            read=float(ProjectConfigurations.HF_READ_TIMEOUT_SECONDS.value),
+            write=float(ProjectConfigurations.HF_WRITE_TIMEOUT_SECONDS.value),
+            pool=float(ProjectConfigurations.HF_POOL_TIMEOUT_SECONDS.value),
+        )
+
+        # counters used by the diagnostics api
+        self._in_flight = 0
+        self._peak_in_flight = 0
+        self._total_requests = 0
+        self._failed_requests = 0
+        self._started_at = None
+
+    def timeout_with_read(self, read_seconds: float) -> httpx.Timeout:
+        """
+        The client timeouts with another read timeout (used for the per model adaptive timeouts).
+        """
+        return httpx.Timeout(
+            connect=self.timeout.connect,
+            read=read_seconds,
+            write=self.timeout.write,
+            pool=self.timeout.pool,
+        )
+
+    def _http2_available(self) -> bool:
+        if not ProjectConfigurations.HF_HTTP2_ENABLED.value:
+            return False
+        try:
+            import h2  # noqa: F401
+            return True
+        except ImportError:
+            error_logger.warning(f"HuggingFaceHTTPClient._http2_available | h2 package is not installed | falling back to HTTP/1.1")
+            return False
+
+    async def start(self) -> None:
+        if self.client is not None:
+            return
+        self.http2_enabled = self._http2_available()
+        self.client = httpx.AsyncClient(
+            http2=self.http2_enabled,
+            timeout=self.timeout,
+            limits=self.limits
+        )
+        self._started_at = time.time()
+        info_logger.info(f"HuggingFaceHTTPClient.start | shared hugging face http client started | http2 = {self.http2_enabled}, limits = {self.limits}")
+
+        if ProjectConfigurations.HF_PRECONNECT_ON_STARTUP.value:
+            await self.preconnect()
+
+    async def preconnect(self) -> None:
+        """
+        Open (and keep alive) a connection to the hugging face router before the first prompt arrives.
+        The status code does not matter, only the TCP + TLS handshake does.
+        """
+        if not self.HF_API_URL:
+            error_logger.warning(f"HuggingFaceHTTPClient.preconnect | HF_API_URL is not configured | skipping pre-connect")
+            return
+        try:
+            start = time.perf_counter()
+            resp = await self.client.head(self.HF_API_URL)
+            duration_ms = (time.perf_counter() - start) * 1000
+            info_logger.info(f"HuggingFaceHTTPClient.preconnect | pre-connected to hugging face | status = {resp.status_code}, http_version = {resp.http_version}, time = {duration_ms:.2f}ms")
+        except httpx.HTTPError as e:
+            # a failed warm up must never stop the server from booting
+            error_logger.warning(f"HuggingFaceHTTPClient.preconnect | pre-connect failed | error = {type(e).__name__}: {e}")
+
+    async def close(self) -> None:
+        if self.client is None:
+            return
+        await self.client.aclose()
+        self.client = None
+        info_logger.info(f"HuggingFaceHTTPClient.close | shared hugging face http client closed | total_requests = {self._total_requests}")
+
+    async def post(self, url: str, **kwargs) -> httpx.Response:
+        if self.client is None:
+            raise RuntimeError("HuggingFaceHTTPClient is not started")
+        self._total_requests += 1
+        self._in_flight += 1
+        self._peak_in_flight = max(self._peak_in_flight, self._in_flight)
+        try:
+            return await self.client.post(url, **kwargs)
+        except httpx.HTTPError:
+            self._failed_requests += 1
+            raise
+        finally:
+            self._in_flight -= 1
+
+    @asynccontextmanager
+    async def stream(self, url: str, **kwargs):
+        """
+        Streaming POST (used for server sent events). The connection goes back to the pool when the block exits.
+        """
+        if self.client is None:
+            raise RuntimeError("HuggingFaceHTTPClient is not started")
+        self._total_requests += 1
+        self._in_flight += 1
+        self._peak_in_flight = max(self._peak_in_flight, self._in_flight)
+        try:
+            async with self.client.stream("POST", url, **kwargs) as resp:
+                yield resp
+        except httpx.HTTPError:
+            self._failed_requests += 1
+            raise
+        finally:
+            self._in_flight -= 1
+
+    def get_pool_stats(self) -> dict:
+        stats = {
+            "started": self.client is not None,
+            "http2_enabled": self.http2_enabled,
+            "limits": {
+                "max_connections": self.limits.max_connections,
+                "max_keepalive_connections": self.limits.max_keepalive_connections,
+                "keepalive_expiry": self.limits.keepalive_expiry,
+            },
+            "requests": {
+                "in_flight": self._in_flight,
+                "peak_in_flight": self._peak_in_flight,
+                "total": self._total_requests,
+                "failed": self._failed_requests,
+            },
+            "uptime_seconds": round(time.time() - self._started_at, 2) if self._started_at else 0,
+        }
+
+        # httpx does not expose its connection pool publicly so read it defensively
+        pool = getattr(getattr(self.client, "_transport", None), "_pool", None)
+        if pool is None:
+            return stats
+
+        connections = list(getattr(pool, "connections", []))
+        pending_requests = list(getattr(pool, "_requests", []))
+        stats["connections"] = {
+            "total": len(connections),
+            "idle": sum(1 for conn in connections if conn.is_idle()),
+            "active": sum(1 for conn in connections if not conn.is_idle() and not conn.is_closed()),
+            "available": sum(1 for conn in connections if conn.is_available()),
+            "http2": sum(1 for conn in connections if "HTTP/2" in conn.info()),
+        }
+        stats["requests"]["queued_for_connection"] = sum(
+            1 for pool_request in pending_requests if getattr(pool_request, "connection", None) is None
+        )
+        debug_logger.debug(f"HuggingFaceHTTPClient.get_pool_stats | stats = {stats}")
+        return stats
@@ -8,29 +8,56 @@ debug_logger = LoggerFactory.get_debug_logger()
 
 class ContextBuilderService:
     @staticmethod
-    def build(
+    async def build(
         model_name : str,
         system_prompt: str,
-        conversation_turns: list[dict],
+        history,
         new_user_prompt: str,
         token_counter,
         max_tokens : int, # 3000
-        reserved_for_response : int # 800
+        reserved_for_response : int, # 800
+        deadline = None,
+        missing_token_counts : list = None
     ):
+        """
+        history is an async iterator of HistoryTurn, newest first. It is only consumed until the budget is full,
+        so a long history is never read past the turns that fit.
+        The turns are budgeted from their stored token counts for model_name, only a message without one is tokenized,
+        (turn, role, tokens) of those is appended to missing_token_counts so the caller can store them.
+        deadline (RequestDeadline) stops the tokenization of a long history once the request budget is gone.
+        Returns (messages, prompt tokens, new prompt tokens): the tokens of every message sent (system prompt, history,
+        new prompt) and of the new prompt alone (stored with the turn, so it is not tokenized again).
+        """
         info_logger.info(f"ContextBuilderService.build | Building context for the hugging face LLM")
         history_budget = max_tokens - reserved_for_response
 
         messages = [{"role": "system", "content": system_prompt}]
         token_count = token_counter(text=system_prompt,model_name=model_name)
 
-        # iterate from most recent backwards
-        for turn in reversed(conversation_turns):
-            turn_tokens = token_counter(text=turn["content"],model_name=model_name)
-            if token_count + turn_tokens > history_budget:
+        # iterate from most recent backwards (the answer of a turn comes before its prompt)
+        async for turn in history:
+            budget_full = False
+            for message, stored_tokens in (
+                ({"role": "assistant", "content": turn.llm_response}, turn.llm_response_tokens),
+                ({"role": "user", "content": turn.user_prompt}, turn.user_prompt_tokens),
+            ):
+                message_tokens = stored_tokens.get(model_name)
+                if message_tokens is None:
+                    if deadline is not None:
+                        deadline.check("context_build")
+                    message_tokens = token_counter(text=message["content"],model_name=model_name)
+                    if missing_token_counts is not None:
+                        missing_token_counts.append((turn, message["role"], message_tokens))
+                if token_count + message_tokens > history_budget:
+                    budget_full = True
+                    break
+                messages.insert(1, message)
+                token_count += message_tokens
+            if budget_full:
                 break
-            messages.insert(1, turn)
-            token_count += turn_tokens
 
         messages.append({"role": "user", "content": new_user_prompt})
-        debug_logger.debug(f"ContextBuilderService.build | history_budget = {history_budget}, token_count = {token_count}, messages = {messages}")
-        return messages
+        new_user_prompt_tokens = token_counter(text=new_user_prompt,model_name=model_name)
+        prompt_tokens = token_count + new_user_prompt_tokens
+        debug_logger.debug(f"ContextBuilderService.build | history_budget = {history_budget}, token_count = {token_count}, prompt_tokens = {prompt_tokens}, messages = {messages}")
+        return messages, prompt_tokens, new_user_prompt_tokens
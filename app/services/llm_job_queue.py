@@ -0,0 +1,332 @@
+import math
+import os
+import random
+import socket
+import uuid
+
+# import asynchronous i/o
+import asyncio
+
+# import fast api libraries
+from fastapi import status
+
+# import repositories
+from app.repositories.llm_prompt_job_repository import LLMPromptJobRepository
+from app.repositories.system_prompt_repository import SystemPromptRepository
+
+# import models
+from app.models.class_return_model.services_class_response_models import RepositoryClassResponse
+from app.models.api_request_response_model.request_models import HuggingFacePromptRequest
+
+#import database transaction exception handler
+from app.database.db_transaction_exception_handler import TransactionAbort
+
+# database session factories (workers run outside of a request so they open their own sessions)
+from app.database.db_session import SessionLocal, AsyncSessionLocal
+
+# import messages
+from app.utils.success_messages import LLMPromptJobSuccessMessages
+from app.utils.error_messages import LLMPromptJobErrorMessages
+
+# import other services on which this service depends on
+from app.services.process_hugging_face_ai_prompt import ProcessHuggingFaceAIPromptService
+from app.services.hugging_face_http_client import HuggingFaceHTTPClient
+from app.services.retry_policy import RetryPolicy
+from app.services.adaptive_concurrency_limiter import AdaptiveConcurrencyLimiter
+from app.services.request_deadline import RequestDeadline
+
+# load project configurations
+from app.configs.config import ProjectConfigurations
+
+# import logging utility
+from app.utils.logger import LoggerFactory
+
+# initialize logging utility
+info_logger = LoggerFactory.get_info_logger()
+error_logger = LoggerFactory.get_error_logger()
+debug_logger = LoggerFactory.get_debug_logger()
+
+class LLMJobQueueService:
+    """
+    Submit / poll side of the async prompt jobs (request scoped, uses the request db session)
+    """
+
+    def __init__(self, db):
+        self.db = db
+        self.job_repo = LLMPromptJobRepository(db=db)
+        self.system_prompt_repo = SystemPromptRepository(db=db)
+
+    def submit(self, request) -> RepositoryClassResponse:
+        try:
+            if not ProjectConfigurations.LLM_JOB_QUEUE_ENABLED.value:
+                return RepositoryClassResponse(
+                    status=False,
+                    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                    message=LLMPromptJobErrorMessages.JOB_QUEUE_DISABLED.value
+                )
+
+            with self.db.begin():
+                # an agent without a system prompt would only fail later in the worker
+                system_prompt_get_result = self.system_prompt_repo.get_one(agent_id=request.agent_id)
+                if not system_prompt_get_result.status:
+                    raise TransactionAbort(system_prompt_get_result)
+
+                job_insert_result = self.job_repo.insert(
+                    job_id=str(uuid.uuid4()),
+                    agent_id=request.agent_id,
+                    user_prompt=request.user_prompt,
+                    max_attempts=int(ProjectConfigurations.LLM_JOB_MAX_ATTEMPTS.value)
+                )
+                if not job_insert_result.status:
+                    raise TransactionAbort(job_insert_result)
+
+            info_logger.info(f"LLMJobQueueService.submit | prompt job queued | job_id = {job_insert_result.data['job_id']}, agent_id = {request.agent_id}")
+            return RepositoryClassResponse(
+                status=True,
+                status_code=status.HTTP_202_ACCEPTED,
+                message=LLMPromptJobSuccessMessages.JOB_QUEUED.value,
+                data={
+                    "job_id": job_insert_result.data["job_id"],
+                    "status": job_insert_result.data["status"]
+                }
+            )
+        except TransactionAbort as e:
+            return RepositoryClassResponse(
+                status=False,
+                status_code=e.response.status_code,
+                message=e.response.message
+            )
+        except Exception as e:
+            error_logger.exception(f"LLMJobQueueService.submit | {e}")
+            return RepositoryClassResponse(
+                status=False,
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                message=str(e)
+            )
+
+    def get(self, job_id: str) -> RepositoryClassResponse:
+        try:
+            with self.db.begin():
+                job_get_result = self.job_repo.get_one(job_id=job_id)
+                if not job_get_result.status:
+                    raise TransactionAbort(job_get_result)
+            return job_get_result
+        except TransactionAbort as e:
+            return RepositoryClassResponse(
+                status=False,
+                status_code=e.response.status_code,
+                message=e.response.message
+            )
+        except Exception as e:
+            error_logger.exception(f"LLMJobQueueService.get | {e}")
+            return RepositoryClassResponse(
+                status=False,
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                message=str(e)
+            )
+
+class LLMJobWorkerPool:
+    """
+    LLM_JOB_WORKERS asyncio workers (started in the app lifespan) that process the prompt jobs
+
+    - a worker claims one job at a time (SKIP LOCKED, so workers of every process share the table without blocking)
+    - while the job runs the lease is renewed every third of LLM_JOB_VISIBILITY_TIMEOUT_SECONDS,
+      if the process dies the job becomes claimable again once the lease expires
+    - the prompt goes through ProcessHuggingFaceAIPromptService like a normal request (rate limits, breaker, retries ...),
+      in the agent's priority lane or else the lowest priority lane
+    - overload answers (LLM_RETRY_STATUS_CODES) are retried later with exponential back off or the Retry-After we got,
+      until LLM_JOB_MAX_ATTEMPTS, every other error fails the job
+    - on shutdown a running job is put back in the queue without using up an attempt
+    - the job table is used through the sync session in a worker thread, the prompt itself runs on an async session,
+      so the event loop never waits on postgres
+    A job is delivered at least once: a worker that dies after the turn was stored but before the job was marked
+    finished will run it again.
+    """
+
+    _counters = {
+        "claimed": 0,
+        "succeeded": 0,
+        "failed": 0,
+        "rescheduled": 0,
+        "released": 0,
+        "leases_lost": 0,
+        "worker_errors": 0,
+    }
+    _workers = 0
+    _busy_workers = 0
+
+    def __init__(self, http_client: HuggingFaceHTTPClient):
+        self.http_client = http_client
+        self.worker_count = int(ProjectConfigurations.LLM_JOB_WORKERS.value)
+        self.poll_interval = float(ProjectConfigurations.LLM_JOB_POLL_INTERVAL_SECONDS.value)
+        self.visibility_timeout = float(ProjectConfigurations.LLM_JOB_VISIBILITY_TIMEOUT_SECONDS.value)
+        self.retry_base_delay = float(ProjectConfigurations.LLM_JOB_RETRY_BASE_DELAY_SECONDS.value)
+        self._stopping = asyncio.Event()
+        self._tasks: list[asyncio.Task] = []
+
+    async def start(self) -> None:
+        if self._tasks:
+            return
+        worker_prefix = f"{socket.gethostname()}:{os.getpid()}"
+        for index in range(self.worker_count):
+            self._tasks.append(asyncio.create_task(self._worker(worker_id=f"{worker_prefix}:{index}")))
+        LLMJobWorkerPool._workers = len(self._tasks)
+        info_logger.info(f"LLMJobWorkerPool.start | prompt job workers started | workers = {self.worker_count}")
+
+    async def stop(self) -> None:
+        self._stopping.set()
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        LLMJobWorkerPool._workers = 0
+        info_logger.info(f"LLMJobWorkerPool.stop | prompt job workers stopped")
+
+    async def _worker(self, worker_id: str) -> None:
+        while not self._stopping.is_set():
+            try:
+                job = await self._claim(worker_id=worker_id)
+            except Exception as e:
+                LLMJobWorkerPool._counters["worker_errors"] += 1
+                error_logger.error(f"LLMJobWorkerPool._worker | claim failed | worker_id = {worker_id} | {e}")
+                job = None
+
+            if job is None:
+                # jitter so that idle workers do not poll the table in lock step
+                await self._sleep(self.poll_interval * random.uniform(0.5, 1.5))
+                continue
+
+            LLMJobWorkerPool._counters["claimed"] += 1
+            LLMJobWorkerPool._busy_workers += 1
+            try:
+                await self._run_job(job=job, worker_id=worker_id)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                LLMJobWorkerPool._counters["worker_errors"] += 1
+                error_logger.exception(f"LLMJobWorkerPool._worker | job crashed, it is retried once its lease expires | job_id = {job['job_id']} | {e}")
+            finally:
+                LLMJobWorkerPool._busy_workers -= 1
+
+    async def _sleep(self, seconds: float) -> None:
+        try:
+            await asyncio.wait_for(self._stopping.wait(), timeout=seconds)
+        except asyncio.TimeoutError:
+            pass
+
+    def _with_job_repo(self, fn) -> RepositoryClassResponse:
+        """
+        Run fn(job_repo) in its own short transaction.
+        """
+        db = SessionLocal()
+        try:
+            with db.begin():
+                result = fn(LLMPromptJobRepository(db=db))
+                if not result.status:
+                    raise TransactionAbort(result)
+            return result
+        except TransactionAbort as e:
+            return e.response
+        finally:
+            db.close()
+
+    async def _job_repo_call(self, fn) -> RepositoryClassResponse:
+        """
+        _with_job_repo in a worker thread.
+        """
+        return await asyncio.to_thread(self._with_job_repo, fn)
+
+    async def _claim(self, worker_id: str) -> dict | None:
+        def claim(job_repo):
+            expire_result = job_repo.expire_stale()
+            if not expire_result.status:
+                return expire_result
+            return job_repo.claim(worker_id=worker_id, visibility_timeout_seconds=self.visibility_timeout)
+
+        claim_result = await self._job_repo_call(claim)
+        if not claim_result.status:
+            raise RuntimeError(claim_result.message)
+        return claim_result.data
+
+    async def _heartbeat(self, job_id: str, worker_id: str) -> None:
+        while True:
+            await asyncio.sleep(self.visibility_timeout / 3)
+            extend_result = await self._job_repo_call(
+                lambda job_repo: job_repo.extend_lease(job_id=job_id, worker_id=worker_id, visibility_timeout_seconds=self.visibility_timeout)
+            )
+            if extend_result.status_code == status.HTTP_409_CONFLICT:
+                LLMJobWorkerPool._counters["leases_lost"] += 1
+                return
+            if not extend_result.status:
+                error_logger.error(f"LLMJobWorkerPool._heartbeat | could not extend the lease | job_id = {job_id} | {extend_result.message}")
+
+    async def _run_job(self, job: dict, worker_id: str) -> None:
+        job_id = job["job_id"]
+        info_logger.info(f"LLMJobWorkerPool._run_job | processing prompt job | job_id = {job_id}, worker_id = {worker_id}, attempt = {job['attempts']}")
+        heartbeat = asyncio.create_task(self._heartbeat(job_id=job_id, worker_id=worker_id))
+        try:
+            async with AsyncSessionLocal() as async_db:
+                process_prompt_service_obj = ProcessHuggingFaceAIPromptService(
+                    hugging_face_auth_token=ProjectConfigurations.HUGGING_FACE_AUTH_TOKEN.value,
+                    HF_API_URL=ProjectConfigurations.HF_API_URL.value,
+                    # only the prompt path is used, it runs on the async session
+                    db=None,
+                    http_client=self.http_client,
+                    async_db=async_db
+                )
+                result = await process_prompt_service_obj.process_user_prompt_llm(
+                    request=HuggingFacePromptRequest(agent_id=job["ai_agent_id"], user_prompt=job["user_prompt"]),
+                    # queued jobs are background work unless the agent says otherwise
+                    fallback_priority_lane=AdaptiveConcurrencyLimiter.lanes()[-1],
+                    # nobody waits on the http connection, only LLM_REQUEST_MAX_TIMEOUT_SECONDS applies
+                    deadline=RequestDeadline.start(timeout_seconds=math.inf)
+                )
+        except asyncio.CancelledError:
+            release_result = await self._job_repo_call(lambda job_repo: job_repo.release(job_id=job_id, worker_id=worker_id))
+            if release_result.status:
+                LLMJobWorkerPool._counters["released"] += 1
+            raise
+        finally:
+            heartbeat.cancel()
+
+        await self._record_result(job=job, worker_id=worker_id, result=result)
+
+    async def _record_result(self, job: dict, worker_id: str, result: RepositoryClassResponse) -> None:
+        job_id = job["job_id"]
+        if result.status:
+            finish_result = await self._job_repo_call(
+                lambda job_repo: job_repo.mark_succeeded(job_id=job_id, worker_id=worker_id, llm_prompt_response=result.data["content"])
+            )
+            counter = "succeeded"
+        elif RetryPolicy.is_retryable_status(result.status_code) and job["attempts"] < job["max_attempts"]:
+            retry_after_seconds = (result.data or {}).get("retry_after_seconds") if isinstance(result.data, dict) else None
+            delay = max(retry_after_seconds or 0.0, self.retry_base_delay * 2 ** (job["attempts"] - 1))
+            finish_result = await self._job_repo_call(
+                lambda job_repo: job_repo.reschedule(job_id=job_id, worker_id=worker_id, delay_seconds=delay, error_status_code=result.status_code, error_message=result.message)
+            )
+            counter = "rescheduled"
+            info_logger.info(f"LLMJobWorkerPool._record_result | prompt job rescheduled | job_id = {job_id}, status_code = {result.status_code}, delay = {delay:.1f}s")
+        else:
+            finish_result = await self._job_repo_call(
+                lambda job_repo: job_repo.mark_failed(job_id=job_id, worker_id=worker_id, error_status_code=result.status_code, error_message=result.message)
+            )
+            counter = "failed"
+            error_logger.error(f"LLMJobWorkerPool._record_result | prompt job failed | job_id = {job_id}, status_code = {result.status_code} | {result.message}")
+
+        if finish_result.status:
+            LLMJobWorkerPool._counters[counter] += 1
+        elif finish_result.status_code == status.HTTP_409_CONFLICT:
+            # another worker took the job over after our lease expired, its outcome wins
+            LLMJobWorkerPool._counters["leases_lost"] += 1
+        else:
+            LLMJobWorkerPool._counters["worker_errors"] += 1
+            error_logger.error(f"LLMJobWorkerPool._record_result | could not store the job outcome | job_id = {job_id} | {finish_result.message}")
+
+    @classmethod
+    def stats(cls) -> dict:
+        return {
+            **cls._counters,
+            "enabled": ProjectConfigurations.LLM_JOB_QUEUE_ENABLED.value,
+            "workers": cls._workers,
+            "busy_workers": cls._busy_workers,
+        }
@@ -0,0 +1,130 @@
+import hashlib
+import time
+from collections import OrderedDict
+from threading import Lock
+
+# the key is the hash of the payload sent upstream
+from app.services.request_body_encoder import RequestBodyEncoder
+
+# load project configurations
+from app.configs.config import ProjectConfigurations
+
+# import logging utility
+from app.utils.logger import LoggerFactory
+
+# initialize logging utility
+info_logger = LoggerFactory.get_info_logger()
+error_logger = LoggerFactory.get_error_logger()
+debug_logger = LoggerFactory.get_debug_logger()
+
+class LLMResponseCache:
+    """
+    Exact match cache for LLM responses (process wide, in memory)
+
+    - Key is the agent plus a sha256 of the fully built request body (model + messages + generation params),
+      agents with the same system prompt and history never share an entry
+    - Bounded by number of entries AND by total size of the cached text
+    - Least recently used entries are evicted first
+    - Every entry carries its own TTL (set per agent), and a lookup also rejects an entry older than the caller's TTL
+      (the agent may have lowered its TTL since the entry was stored)
+    - Thread-safe
+    """
+
+    _entries: "OrderedDict[str, dict]" = OrderedDict()
+    _lock = Lock()
+    _size_bytes = 0
+
+    _max_entries = int(ProjectConfigurations.LLM_RESPONSE_CACHE_MAX_ENTRIES.value)
+    _max_bytes = int(ProjectConfigurations.LLM_RESPONSE_CACHE_MAX_BYTES.value)
+
+    _counters = {
+        "hits": 0,
+        "misses": 0,
+        "bypassed": 0,
+        "stores": 0,
+        "evictions": 0,
+        "expirations": 0,
+    }
+
+    @staticmethod
+    def make_key(agent_id: str, body: dict) -> str:
+        # the bodies are always built in the same key order, so the payload sent upstream is a stable key
+        return f"{agent_id}:{hashlib.sha256(RequestBodyEncoder.encode(body)).hexdigest()}"
+
+    @classmethod
+    def _remove(cls, key: str) -> None:
+        entry = cls._entries.pop(key, None)
+        if entry is not None:
+            cls._size_bytes -= entry["size_bytes"]
+
+    @classmethod
+    def get(cls, key: str, ttl_seconds: int) -> str | None:
+        """
+        ttl_seconds is the caller's (agent's) current TTL, an older entry is a miss.
+        """
+        with cls._lock:
+            entry = cls._entries.get(key)
+            if entry is None:
+                cls._counters["misses"] += 1
+                return None
+            now = time.monotonic()
+            if entry["expires_at"] <= now or now - entry["created_at"] >= ttl_seconds:
+                cls._remove(key)
+                cls._counters["expirations"] += 1
+                cls._counters["misses"] += 1
+                return None
+            # mark as most recently used
+            cls._entries.move_to_end(key)
+            cls._counters["hits"] += 1
+            return entry["content"]
+
+    @classmethod
+    def set(cls, key: str, content: str, ttl_seconds: int) -> None:
+        if not ttl_seconds or ttl_seconds <= 0:
+            return
+        size_bytes = len(content.encode("utf-8"))
+        if size_bytes > cls._max_bytes:
+            debug_logger.debug(f"LLMResponseCache.set | response is larger than the whole cache | size_bytes = {size_bytes}")
+            return
+        now = time.monotonic()
+        with cls._lock:
+            cls._remove(key)
+            cls._entries[key] = {
+                "content": content,
+                "size_bytes": size_bytes,
+                "created_at": now,
+                "expires_at": now + ttl_seconds,
+            }
+            cls._size_bytes += size_bytes
+            cls._counters["stores"] += 1
+
+            # evict least recently used entries until we are back inside the bounds
+            while len(cls._entries) > cls._max_entries or cls._size_bytes > cls._max_bytes:
+                oldest_key = next(iter(cls._entries))
+                cls._remove(oldest_key)
+                cls._counters["evictions"] += 1
+
+    @classmethod
+    def record_bypass(cls) -> None:
+        with cls._lock:
+            cls._counters["bypassed"] += 1
+
+    @classmethod
+    def clear(cls) -> None:
+        with cls._lock:
+            cls._entries.clear()
+            cls._size_bytes = 0
+        info_logger.info(f"LLMResponseCache.clear | llm response cache cleared")
+
+    @classmethod
+    def stats(cls) -> dict:
+        with cls._lock:
+            lookups = cls._counters["hits"] + cls._counters["misses"]
+            return {
+                **cls._counters,
+                "hit_ratio": round(cls._counters["hits"] / lookups, 4) if lookups else 0.0,
+                "entries": len(cls._entries),
+                "max_entries": cls._max_entries,
+                "size_bytes": cls._size_bytes,
+                "max_bytes": cls._max_bytes,
+            }
@@ -0,0 +1,106 @@
+import asyncio
+import hashlib
+from typing import Any, Awaitable, Callable
+
+# import logging utility
+from app.utils.logger import LoggerFactory
+
+# initialize logging utility
+info_logger = LoggerFactory.get_info_logger()
+error_logger = LoggerFactory.get_error_logger()
+debug_logger = LoggerFactory.get_debug_logger()
+
+class _InFlightCall:
+    def __init__(self, task: asyncio.Task):
+        self.task = task
+        self.waiters = 0
+
+class LLMSingleFlight:
+    """
+    Coalesces identical prompts of an agent (double submits, client retries), process wide
+
+    - The first request for a key (the leader) runs the whole prompt (agent lock, llm call, stored turn) as its own asyncio task
+    - Every identical request that arrives while it is running, or up to reuse_seconds after it succeeded, gets the same result,
+      so a double submit makes one paid call and stores one turn
+    - Waiters are shielded from each other: if the leader's client disconnects the call keeps
+      running for the remaining waiters, and it is only cancelled once nobody is waiting anymore
+    The key is the agent, the priority lane and the user prompt (not the request body), it has to be known before the agent lock is taken:
+    the body of a second prompt of the same agent already contains the first turn.
+    """
+
+    _calls: dict[str, _InFlightCall] = {}
+
+    _counters = {
+        "leaders": 0,
+        "coalesced": 0,
+        "abandoned_waiters": 0,
+        "cancelled_upstream_calls": 0,
+    }
+
+    @staticmethod
+    def make_key(agent_id: str, user_prompt: str, priority_lane: str | None = None) -> str:
+        # the lane is part of the key so an interactive prompt never waits on a run queued in the batch lane
+        return f"{agent_id}:{priority_lane or ''}:{hashlib.sha256(user_prompt.encode()).hexdigest()}"
+
+    @classmethod
+    def _forget(cls, key: str, call: _InFlightCall) -> None:
+        # only remove our own entry, a newer call may already be registered under the same key
+        if cls._calls.get(key) is call:
+            cls._calls.pop(key, None)
+
+    @classmethod
+    def _on_done(cls, key: str, call: _InFlightCall, reuse_seconds: float, reusable) -> None:
+        task = call.task
+        if (
+            reuse_seconds > 0
+            and not task.cancelled()
+            and task.exception() is None
+            and (reusable is None or reusable(task.result()))
+        ):
+            # requests arriving shortly after the call finished still get its result
+            asyncio.get_running_loop().call_later(reuse_seconds, cls._forget, key, call)
+            return
+        cls._forget(key, call)
+
+    @classmethod
+    async def do(cls, key: str, fn: Callable[[], Awaitable[Any]], reuse_seconds: float = 0.0, reusable: Callable[[Any], bool] = None) -> tuple[Any, bool]:
+        """
+        Run fn() once for all callers with the same key that arrive while it runs or up to reuse_seconds after
+        it finished with a result reusable(result) accepts (every result when reusable is None).
+        Returns (result, shared) where shared is True if this caller joined someone else's call.
+        """
+        call = cls._calls.get(key)
+        shared = call is not None
+        if call is None:
+            call = _InFlightCall(asyncio.create_task(fn()))
+            cls._calls[key] = call
+            call.task.add_done_callback(lambda _task, key=key, call=call: cls._on_done(key, call, reuse_seconds, reusable))
+            cls._counters["leaders"] += 1
+        else:
+            cls._counters["coalesced"] += 1
+            debug_logger.debug(f"LLMSingleFlight.do | joined an in-flight llm call | key = {key}, waiters = {call.waiters + 1}")
+
+        call.waiters += 1
+        try:
+            return await asyncio.shield(call.task), shared
+        except asyncio.CancelledError:
+            if call.task.cancelled():
+                raise
+            cls._counters["abandoned_waiters"] += 1
+            if call.waiters == 1 and not call.task.done():
+                # last interested client went away, free the upstream slot
+                call.task.cancel()
+                cls._counters["cancelled_upstream_calls"] += 1
+                info_logger.info(f"LLMSingleFlight.do | every waiter disconnected, upstream llm call cancelled | key = {key}")
+            raise
+        finally:
+            call.waiters -= 1
+
+    @classmethod
+    def stats(cls) -> dict:
+        return {
+            **cls._counters,
+            "in_flight_keys": sum(1 for call in cls._calls.values() if not call.task.done()),
+            "reusable_keys": sum(1 for call in cls._calls.values() if call.task.done()),
+            "in_flight_waiters": sum(call.waiters for call in cls._calls.values()),
+        }
@@ -0,0 +1,187 @@
+import json
+import random
+import time
+from collections import deque
+
+# load project configurations
+from app.configs.config import ProjectConfigurations
+
+# import logging utility
+from app.utils.logger import LoggerFactory
+
+# initialize logging utility
+info_logger = LoggerFactory.get_info_logger()
+error_logger = LoggerFactory.get_error_logger()
+debug_logger = LoggerFactory.get_debug_logger()
+
+class _ModelHealth:
+    def __init__(self, model_name: str):
+        self.model_name = model_name
+        self._results = deque()  # (monotonic timestamp, latency_seconds or None, succeeded)
+        self.degraded = False
+        self.degraded_at = 0.0
+        self.degraded_reason = None
+        self.times_degraded = 0
+        self.probes = 0
+
+    def trim(self, now: float, window_seconds: float, min_samples: int) -> None:
+        if self.degraded:
+            # only a few probes arrive while degraded, the last min_samples of them count however old they are
+            while len(self._results) > min_samples:
+                self._results.popleft()
+            return
+        while self._results and now - self._results[0][0] > window_seconds:
+            self._results.popleft()
+
+    def record(self, now: float, latency_seconds: float | None, succeeded: bool) -> None:
+        self._results.append((now, latency_seconds, succeeded))
+
+    def clear(self) -> None:
+        self._results.clear()
+
+    def calls(self) -> int:
+        return len(self._results)
+
+    def error_rate(self) -> float:
+        if not self._results:
+            return 0.0
+        return sum(1 for _, _, succeeded in self._results if not succeeded) / len(self._results)
+
+    def p95_latency(self) -> float | None:
+        latencies = sorted(latency for _, latency, succeeded in self._results if succeeded and latency is not None)
+        if not latencies:
+            return None
+        return latencies[min(len(latencies) - 1, int(0.95 * len(latencies)))]
+
+class ModelFallback:
+    """
+    Switches an agent to the next model of its fallback chain while its model misses the latency / error SLO
+
+    - every upstream call reports its outcome per model (latency of successful calls, failures = 5xx, 429, timeouts, transport errors)
+    - a model is degraded once its window (LLM_MODEL_HEALTH_WINDOW_SECONDS, at least LLM_MODEL_HEALTH_MIN_SAMPLES calls)
+      has a p95 above LLM_MODEL_SLO_P95_SECONDS or an error rate above LLM_MODEL_SLO_ERROR_RATE
+    - requests then go to the first healthy model of the chain (the agent's fallback_models, else LLM_MODEL_FALLBACKS),
+      only LLM_MODEL_FALLBACK_PROBE_RATIO of them still go to the degraded model so it keeps getting fresh samples
+    - the window is cleared when a model is degraded, it recovers once its last LLM_MODEL_HEALTH_MIN_SAMPLES probes
+      meet the SLO again and it was degraded for at least LLM_MODEL_FALLBACK_MIN_SECONDS
+    If every model of the chain is degraded the agent's own model is used.
+    Only used from the event loop so it does not need a lock.
+    """
+
+    _default_chains: dict[str, list[str]] = json.loads(ProjectConfigurations.LLM_MODEL_FALLBACKS.value or "{}")
+
+    _health: dict[str, _ModelHealth] = {}
+    _counters = {
+        "fallback_requests": 0,
+        "probe_requests": 0,
+    }
+
+    @classmethod
+    def _get(cls, model_name: str) -> _ModelHealth:
+        health = cls._health.get(model_name)
+        if health is None:
+            health = cls._health[model_name] = _ModelHealth(model_name)
+        return health
+
+    @classmethod
+    def chain_for(cls, model_name: str, fallback_models: list[str] | None = None) -> list[str]:
+        """
+        The agent's model followed by its fallbacks (duplicates removed, order kept).
+        """
+        chain = [model_name]
+        for fallback in (fallback_models if fallback_models else cls._default_chains.get(model_name, [])):
+            if fallback and fallback not in chain:
+                chain.append(fallback)
+        return chain
+
+    @classmethod
+    def _breach(cls, health: _ModelHealth) -> str | None:
+        if health.calls() < int(ProjectConfigurations.LLM_MODEL_HEALTH_MIN_SAMPLES.value):
+            return None
+        error_rate = health.error_rate()
+        if error_rate > float(ProjectConfigurations.LLM_MODEL_SLO_ERROR_RATE.value):
+            return f"error_rate {error_rate:.2f}"
+        p95 = health.p95_latency()
+        if p95 is not None and p95 > float(ProjectConfigurations.LLM_MODEL_SLO_P95_SECONDS.value):
+            return f"p95 {p95:.2f}s"
+        return None
+
+    @classmethod
+    def record(cls, model_name: str, succeeded: bool, latency_seconds: float | None = None) -> None:
+        """
+        latency_seconds is only given for complete answers (a stream only reports whether it started).
+        """
+        now = time.monotonic()
+        health = cls._get(model_name)
+        health.record(now, latency_seconds, succeeded)
+        health.trim(now, float(ProjectConfigurations.LLM_MODEL_HEALTH_WINDOW_SECONDS.value), int(ProjectConfigurations.LLM_MODEL_HEALTH_MIN_SAMPLES.value))
+
+        breach = cls._breach(health)
+        if not health.degraded:
+            if breach is not None:
+                health.degraded = True
+                health.degraded_at = now
+                health.degraded_reason = breach
+                health.times_degraded += 1
+                # recovery is judged on the probes only
+                health.clear()
+                error_logger.warning(f"ModelFallback.record | model missed its slo, switching to the fallback chain | model = {model_name}, reason = {breach}")
+            return
+
+        recovered = (
+            breach is None
+            and health.calls() >= int(ProjectConfigurations.LLM_MODEL_HEALTH_MIN_SAMPLES.value)
+            and now - health.degraded_at >= float(ProjectConfigurations.LLM_MODEL_FALLBACK_MIN_SECONDS.value)
+        )
+        if recovered:
+            health.degraded = False
+            health.degraded_reason = None
+            info_logger.info(f"ModelFallback.record | model meets its slo again, switching back | model = {model_name}")
+
+    @classmethod
+    def choose(cls, model_name: str, fallback_models: list[str] | None = None) -> str:
+        """
+        Model for the next request of an agent whose own model is model_name.
+        """
+        if not ProjectConfigurations.LLM_MODEL_FALLBACK_ENABLED.value:
+            return model_name
+
+        for candidate in cls.chain_for(model_name, fallback_models):
+            health = cls._health.get(candidate)
+            if health is None or not health.degraded:
+                if candidate != model_name:
+                    cls._counters["fallback_requests"] += 1
+                    debug_logger.debug(f"ModelFallback.choose | using fallback model | model = {model_name}, fallback = {candidate}")
+                return candidate
+            if random.random() < float(ProjectConfigurations.LLM_MODEL_FALLBACK_PROBE_RATIO.value):
+                health.probes += 1
+                cls._counters["probe_requests"] += 1
+                return candidate
+        return model_name
+
+    @classmethod
+    def stats(cls) -> dict:
+        window_seconds = float(ProjectConfigurations.LLM_MODEL_HEALTH_WINDOW_SECONDS.value)
+        min_samples = int(ProjectConfigurations.LLM_MODEL_HEALTH_MIN_SAMPLES.value)
+        now = time.monotonic()
+        models = []
+        for health in cls._health.values():
+            health.trim(now, window_seconds, min_samples)
+            p95 = health.p95_latency()
+            models.append({
+                "model": health.model_name,
+                "degraded": health.degraded,
+                "degraded_reason": health.degraded_reason,
+                "degraded_for_seconds": round(now - health.degraded_at, 2) if health.degraded else None,
+                "times_degraded": health.times_degraded,
+                "probes": health.probes,
+                "calls_in_window": health.calls(),
+                "error_rate": round(health.error_rate(), 4),
+                "p95_latency_ms": round(p95 * 1000, 2) if p95 is not None else None,
+            })
+        return {
+            **cls._counters,
+            "enabled": ProjectConfigurations.LLM_MODEL_FALLBACK_ENABLED.value,
+            "default_chains": cls._default_chains,
+            "models": models,
+        }
@@ -1,5 +1,9 @@
 # import time
 import time
+from contextlib import aclosing, nullcontext
+
+# import json encoder used for server sent events
+import json
 
 # import fast api libraries
 from fastapi import HTTPException, status
@@ -11,10 +15,9 @@ import asyncio
 import httpx
 
 # import repositories
-from app.repositories.user_prompt_repository import UserPromptRepository
-from app.repositories.system_prompt_repository import SystemPromptRepository
-from app.repositories.llm_prompt_response_repository import LLmPromptResponseRepository
-from app.repositories.ai_agent_tool_repository import AIAgentToolsRepository
+from app.repositories.user_prompt_repository import UserPromptRepository, AsyncUserPromptRepository
+from app.repositories.llm_prompt_response_repository import LLmPromptResponseRepository, AsyncLLmPromptResponseRepository
+from app.repositories.agent_context_repository import AgentContextRepository
 
 # import models
 from app.models.class_return_model.services_class_response_models import RepositoryClassResponse
@@ -36,6 +39,23 @@ from app.utils.logger import LoggerFactory
 from app.services.llm_context_builder import ContextBuilderService
 from app.services.token_counter import TokenCounter
 from app.services.tool_prompt_builder import ToolPromptBuilder
+from app.services.llm_response_cache import LLMResponseCache
+from app.services.llm_single_flight import LLMSingleFlight
+from app.services.circuit_breaker import CircuitBreakerRegistry, CircuitBreakerOpenError
+from app.services.adaptive_concurrency_limiter import AdaptiveConcurrencyLimiter, ConcurrencyLimitExceededError, UpstreamPermit
+from app.services.rate_limiter import RateLimiterService, RateLimitExceededError
+from app.services.retry_policy import RetryPolicy
+from app.services.request_hedger import RequestHedger
+from app.services.endpoint_balancer import EndpointBalancer
+from app.services.agent_lock import AgentLock, AgentLockTimeoutError, AgentLockCapacityError
+from app.services.request_deadline import RequestDeadline, DeadlineExceededError
+from app.services.request_cancellation import RequestCancellation
+from app.services.model_fallback import ModelFallback
+from app.services.adaptive_timeout import AdaptiveTimeout
+from app.services.request_body_encoder import RequestBodyEncoder
+
+# load project configurations
+from app.configs.config import ProjectConfigurations
 
 # initialize logging utility
 info_logger = LoggerFactory.get_info_logger()
@@ -43,198 +63,646 @@ error_logger = LoggerFactory.get_error_logger()
 debug_logger = LoggerFactory.get_debug_logger()
 
 class ProcessHuggingFaceAIPromptService:
-    def __init__(self,hugging_face_auth_token,HF_API_URL,db):
+    def __init__(self,hugging_face_auth_token,HF_API_URL,db,http_client,async_db=None):
+        """
+        db (Session) is used by the sync endpoints (reset_agent), async_db (AsyncSession) by the prompt endpoints
+        so that their queries never block the event loop.
+        """
         self.hugging_face_auth_token = hugging_face_auth_token
         self.HF_API_URL = HF_API_URL
         self.db = db
+        self.async_db = async_db
         self.user_prompt_repo = UserPromptRepository(db=db)
-        self.system_prompt_repo = SystemPromptRepository(db=db)
         self.llm_response_repo = LLmPromptResponseRepository(db=db)
-        self.tools_repository = AIAgentToolsRepository(db=db)
+        self.async_user_prompt_repo = AsyncUserPromptRepository(db=async_db)
+        self.async_llm_response_repo = AsyncLLmPromptResponseRepository(db=async_db)
+        self.agent_context_repo = AgentContextRepository(db=async_db)
         self.process_response_service = ProcessPromptResponseService()
         self.tool_prompt_builder_service = ToolPromptBuilder()
+        self.rate_limiter_service = RateLimiterService(db=async_db)
 
-        # initialze the httpx here before making any call to hugging face
-        self.client = httpx.AsyncClient(
-            timeout=httpx.Timeout(
-                connect=5.0,
-                read=120.0,
-                write=5.0,
-                pool=5.0,
-            ),
-            limits=httpx.Limits(
-                max_connections=50,
-                max_keepalive_connections=20
-            )
-        )
+        # llm context window budget (tokens), per model overrides in LLM_MODEL_CONTEXT_TOKENS
+        self.context_max_tokens = 3000
+        # turns per history chunk (the first one is loaded with the agent context)
+        self.history_chunk_turns = max(1, int(ProjectConfigurations.LLM_CONTEXT_HISTORY_CHUNK_TURNS.value))
+        # answer budget of agents without max_output_tokens
+        self.reserved_for_response_tokens = int(ProjectConfigurations.LLM_DEFAULT_MAX_OUTPUT_TOKENS.value)
+        self.model_context_max_tokens = json.loads(ProjectConfigurations.LLM_MODEL_CONTEXT_TOKENS.value or "{}")
+
+        # process wide httpx client created in the app lifespan (see app/main.py)
+        self.http_client = http_client
 
-    async def _call_huggingface_with_retry(self, body: dict, headers: dict):
-        max_attempts = 3
-        base_delay = 0.5  # seconds
+    async def _call_huggingface_with_retry(self, body: dict, headers: dict, priority_lane: str = None, deadline: RequestDeadline = None):
+        """
+        Call hugging face, retrying according to the RetryPolicy (retryable status codes, Retry-After,
+        decorrelated jitter and the process wide retry budget).
+        priority_lane is the lane of the concurrency limiter queue the call waits in.
+        Each attempt (queue wait included) only gets what is left of the deadline, and no retry is
+        scheduled that could not start before it.
+        """
+        RetryPolicy.record_request()
+        previous_delay = None
+        attempt = 0
+        # endpoints this request already used, retries and hedges prefer the other ones
+        tried_endpoints = []
 
-        for attempt in range(1, max_attempts + 1):
+        while True:
+            attempt += 1
+            retry_after = None
             try:
                 start = time.perf_counter()
 
-                resp = await self.client.post(
-                    self.HF_API_URL,
-                    json=body,
-                    headers=headers
-                )
+                async with (deadline.bounded("upstream") if deadline is not None else nullcontext()):
+                    if ProjectConfigurations.LLM_HEDGING_ENABLED.value:
+                        resp = await self._send_upstream_hedged(body=body, headers=headers, tried_endpoints=tried_endpoints, priority_lane=priority_lane)
+                    else:
+                        resp = await self._send_upstream(body=body, headers=headers, tried_endpoints=tried_endpoints, priority_lane=priority_lane)
 
                 duration_ms = (time.perf_counter() - start) * 1000
                 debug_logger.debug(
-                    f"ProcessHuggingFaceAIPromptService._call_huggingface_with_retry | HuggingFace call attempt={attempt} | status={resp.status_code} , time={duration_ms:.2f}ms"
+                    f"ProcessHuggingFaceAIPromptService._call_huggingface_with_retry | HuggingFace call attempt={attempt} | url={resp.request.url} , status={resp.status_code} , time={duration_ms:.2f}ms"
                 )
 
-                # If the status returned by the hugging face api is of status 500 series then retry
-                if resp.status_code >= 500:
-                    raise httpx.HTTPStatusError(
-                        "5xx from Hugging Face",
-                        request=resp.request,
-                        response=resp
-                    )
-
-                # if the return status from the hugging face api is of status 400 series then do not retry
-                resp.raise_for_status()
-                return resp.json()
+                if resp.status_code < 400:
+                    return RequestBodyEncoder.decode(resp.content)
 
-            except (httpx.TimeoutException, httpx.TransportError, httpx.HTTPStatusError) as e:
-                if attempt == max_attempts:
-                    error_logger.error(
-                        f"ProcessHuggingFaceAIPromptService._call_huggingface_with_retry | HuggingFace failed after {attempt} attempts | {e}"
-                    )
-                    raise
+                # status codes that are not in LLM_RETRY_STATUS_CODES (most 4xx) are raised right away
+                if not RetryPolicy.is_retryable_status(resp.status_code):
+                    resp.raise_for_status()
 
-                delay = base_delay * (2 ** (attempt - 1))
-                warning_msg = (
-                    f"ProcessHuggingFaceAIPromptService._call_huggingface_with_retry | HuggingFace call failed (attempt {attempt}/{max_attempts}) | retrying in {delay:.2f}s | error={type(e).__name__}"
+                error = httpx.HTTPStatusError(
+                    f"{resp.status_code} from Hugging Face",
+                    request=resp.request,
+                    response=resp
                 )
-                error_logger.warning(warning_msg)
+                reason = str(resp.status_code)
+                retry_after = RetryPolicy.parse_retry_after(resp.headers.get("Retry-After"))
 
-                await asyncio.sleep(delay)
+            except (httpx.TimeoutException, httpx.TransportError) as e:
+                if not RetryPolicy.is_retryable_exception(e):
+                    raise
+                error = e
+                reason = type(e).__name__
 
-    async def process_user_prompt_llm(self,request) -> RepositoryClassResponse:
-        try:                        
-            # get system_prompt from the database using agen_id
-            with self.db.begin():
-                system_prompt_get_result = self.system_prompt_repo.get_one(agent_id = request.agent_id)
-                if not system_prompt_get_result.status:
-                    raise TransactionAbort(system_prompt_get_result)
-                    
-            info_logger.info(f"ProcessHuggingFaceAIPromptService.process_user_prompt_llm | This class hit was a success! ")
-            debug_logger.debug(f"ProcessHuggingFaceAIPromptService.process_user_prompt_llm | get auth token from the env file | HUGGING_FACE_AUTH_TOKEN = {self.hugging_face_auth_token}")
-            
-            headers = {"Authorization": f"Bearer {self.hugging_face_auth_token}"}
-            
-            # Below is the explaination on how the body should be constructed before sending it to the hugging face LLM
-            # body = {
-            #     "model": request.ai_model,
-            #     "messages": [
-            #         """
-            #             Here you will tell the model how to behave
-            #         """
-            #         # {"role": "system", "content": "You are a helpful assistant."},
-            #         """
-            #             Here the end user will write the prompt for it to gain answers from the LLM
-            #         """
-            #         {"role": "user", "content": request.user_prompt}
-            #     ]
-            # }
-
-            # [OLD WAY OF SENDING BODY TO THE HF LLM VIA HF API]
-            # body = {
-            #     "model": system_prompt_get_result.data.get("ai_model"),
-            #     "messages": [
-            #         {"role": "system", "content": system_prompt_get_result.data.get("llm_system_prompt")},
-            #         {"role": "user", "content": request.user_prompt}
-            #     ]
-            # }
-
-            # [NEW WAY OF SENDING BODY TO HF LLM MAINTAINING LLM CONTEXT]
-            # BUILD LLM CONTEXT HERE
-            # 1. Fetch conversation history
-            with self.db.begin():
-                conversation_result = self.llm_response_repo.get_conversation_turns(
-                    agent_id=request.agent_id
+            try:
+                delay = RetryPolicy.next_delay(attempt=attempt, previous_delay=previous_delay, reason=reason, retry_after=retry_after, deadline=deadline)
+            except DeadlineExceededError:
+                error_logger.warning(
+                    f"ProcessHuggingFaceAIPromptService._call_huggingface_with_retry | HuggingFace failed (attempt {attempt}), the next attempt could not finish before the deadline | error={reason}, remaining={deadline.remaining():.2f}s"
                 )
-                if not conversation_result.status:
-                    raise TransactionAbort(conversation_result)
-                
-            # 2. attach the tool prompt after the system prompt
-            with self.db.begin():
-                tools_result = self.tools_repository.get_all_attached_tools(agent_id=request.agent_id)
-                if not tools_result.status:
-                    raise TransactionAbort(tools_result)
-                
-            tool_prompt = self.tool_prompt_builder_service.build(tools_result.data.get("items"))
+                raise
+            if delay is None:
+                error_logger.error(
+                    f"ProcessHuggingFaceAIPromptService._call_huggingface_with_retry | HuggingFace failed after {attempt} attempts, not retrying | {error}"
+                )
+                raise error
 
-            final_system_prompt = (
-                system_prompt_get_result.data["llm_system_prompt"]
-                + tool_prompt
+            warning_msg = (
+                f"ProcessHuggingFaceAIPromptService._call_huggingface_with_retry | HuggingFace call failed (attempt {attempt}) | retrying in {delay:.2f}s | error={reason}, retry_after={retry_after}"
             )
+            error_logger.warning(warning_msg)
+
+            await asyncio.sleep(delay)
+            previous_delay = delay
+
+    async def _send_upstream(self, body: dict, headers: dict, tried_endpoints: list, priority_lane: str = None) -> httpx.Response:
+        """
+        One upstream attempt:
+        - picks the endpoint (EndpointBalancer) and fails fast if its circuit breaker is open
+        - waits for a slot in the adaptive concurrency limiter (in the queue of its priority lane)
+        - reports the outcome to the limiter, the circuit breaker and the balancer
+        """
+        model_name = body["model"]
+        endpoint = self._pick_endpoint(model_name=model_name, exclude=tried_endpoints)
+        tried_endpoints.append(endpoint)
+        breaker = self._get_circuit_breaker(endpoint=endpoint, model_name=model_name)
+
+        # fail fast (CircuitBreakerOpenError) instead of waiting on an upstream that is known to be down
+        if breaker is not None:
+            breaker.check()
+
+        sent = False
+        read_timeout = AdaptiveTimeout.read_timeout(model_name, AdaptiveTimeout.BLOCKING)
+        try:
+            async with AdaptiveConcurrencyLimiter.slot(lane=priority_lane) as permit:
+                EndpointBalancer.on_start(endpoint)
+                sent = True
+                start = time.perf_counter()
+                resp = await self._post_with_generation_cap(endpoint=endpoint, body=body, headers=headers, read_timeout=read_timeout)
+                permit.record_status(resp.status_code, model_name=model_name, kind=UpstreamPermit.BLOCKING)
+        except (httpx.TimeoutException, httpx.TransportError) as e:
+            if isinstance(e, httpx.ReadTimeout):
+                # the call took at least this long, the timeout learns from it
+                AdaptiveTimeout.record_timeout(model_name, AdaptiveTimeout.BLOCKING, waited_seconds=time.perf_counter() - start)
+            if breaker is not None:
+                breaker.record_failure()
+            EndpointBalancer.on_failure(url=endpoint, model_name=model_name, default_url=self.HF_API_URL)
+            ModelFallback.record(model_name, succeeded=False)
+            raise
+        except BaseException as e:
+            # cancelled / no limiter slot: the upstream never answered, free the half-open probe slot
+            if breaker is not None:
+                breaker.release()
+            if sent:
+                EndpointBalancer.on_cancel(endpoint)
+                if isinstance(e, asyncio.CancelledError) and RequestCancellation.client_disconnected():
+                    RequestCancellation.record_upstream_cancelled()
+            raise
+
+        latency_seconds = time.perf_counter() - start
+        if breaker is not None:
+            self._record_circuit_breaker_result(breaker, resp.status_code)
+        self._record_endpoint_result(endpoint=endpoint, model_name=model_name, status_code=resp.status_code, latency_seconds=latency_seconds)
+        ModelFallback.record(model_name, succeeded=not self._is_upstream_failure(resp.status_code), latency_seconds=latency_seconds)
+        if not self._is_upstream_failure(resp.status_code):
+            AdaptiveTimeout.record(model_name, AdaptiveTimeout.BLOCKING, latency_seconds=latency_seconds)
+        return resp
+
+    async def _post_with_generation_cap(self, endpoint: str, body: dict, headers: dict, read_timeout: float) -> httpx.Response:
+        """
+        A blocking call returns nothing before the whole answer is generated, so one that runs past
+        LLM_MAX_GENERATION_SECONDS is aborted like a read timeout.
+        read_timeout is the adaptive read timeout of the model (AdaptiveTimeout).
+        """
+        timeout = self.http_client.timeout_with_read(read_timeout)
+        payload = RequestBodyEncoder.encode(body)
+        cap_seconds = float(ProjectConfigurations.LLM_MAX_GENERATION_SECONDS.value)
+        if cap_seconds <= 0:
+            return await self.http_client.post(endpoint, content=payload, headers=headers, timeout=timeout)
+        try:
+            async with asyncio.timeout(cap_seconds):
+                return await self.http_client.post(endpoint, content=payload, headers=headers, timeout=timeout)
+        except TimeoutError:
+            error_logger.warning(f"ProcessHuggingFaceAIPromptService._post_with_generation_cap | generation time cap reached | url = {endpoint}, cap = {cap_seconds}s")
+            raise httpx.ReadTimeout(f"generation took longer than {cap_seconds}s", request=httpx.Request("POST", endpoint))
+
+    async def _send_upstream_hedged(self, body: dict, headers: dict, tried_endpoints: list, priority_lane: str = None) -> httpx.Response:
+        """
+        Same as _send_upstream but a slow first call is raced against a second one (see RequestHedger).
+        The hedge goes to another endpoint when the model has more than one, and is only sent while
+        that endpoint's circuit breaker is closed (a hedge is extra load on an upstream that may be struggling).
+        """
+        return await RequestHedger.run(
+            key=body["model"],
+            fn=lambda: self._send_upstream(body=body, headers=headers, tried_endpoints=tried_endpoints, priority_lane=priority_lane),
+            is_acceptable=lambda resp: not self._is_upstream_failure(resp.status_code),
+            can_hedge=lambda: self._can_hedge(model_name=body["model"], tried_endpoints=tried_endpoints)
+        )
+
+    def _can_hedge(self, model_name: str, tried_endpoints: list) -> bool:
+        # the endpoints the hedge can go to: the ones this request did not try yet, else all of them
+        endpoints = EndpointBalancer.endpoints_for(model_name, self.HF_API_URL)
+        untried = [url for url in endpoints if url not in tried_endpoints] or endpoints
+        return any(self._is_circuit_closed(endpoint=url, model_name=model_name) for url in untried)
+
+    def _pick_endpoint(self, model_name: str, exclude=()) -> str:
+        return EndpointBalancer.pick(
+            model_name=model_name,
+            default_url=self.HF_API_URL,
+            exclude=exclude,
+            # skip endpoints whose circuit is open (or half-open without a free probe slot) while there are others
+            is_available=lambda url: self._is_circuit_closed_or_probing(endpoint=url, model_name=model_name)
+        )
+
+    def _get_circuit_breaker(self, endpoint: str, model_name: str):
+        if not ProjectConfigurations.CIRCUIT_BREAKER_ENABLED.value:
+            return None
+        return CircuitBreakerRegistry.get(endpoint, model_name)
+
+    def _is_circuit_closed(self, endpoint: str, model_name: str) -> bool:
+        breaker = self._get_circuit_breaker(endpoint=endpoint, model_name=model_name)
+        return breaker is None or breaker.state == breaker.CLOSED
+
+    def _is_circuit_closed_or_probing(self, endpoint: str, model_name: str) -> bool:
+        # a half-open breaker whose probe slots are all taken would reject the call in breaker.check()
+        breaker = self._get_circuit_breaker(endpoint=endpoint, model_name=model_name)
+        return breaker is None or breaker.has_capacity()
 
-            # 3. Build context window
-            messages = ContextBuilderService.build(
-                model_name=system_prompt_get_result.data["ai_model"],
+    @staticmethod
+    def _is_upstream_failure(status_code: int) -> bool:
+        # 5xx and 429 mean the upstream is unhealthy / saturated, other 4xx are our own fault and do not count
+        return status_code >= 500 or status_code == status.HTTP_429_TOO_MANY_REQUESTS
+
+    def _record_circuit_breaker_result(self, breaker, status_code: int) -> None:
+        if self._is_upstream_failure(status_code):
+            breaker.record_failure()
+        else:
+            breaker.record_success()
+
+    def _record_endpoint_result(self, endpoint: str, model_name: str, status_code: int, latency_seconds: float) -> None:
+        if self._is_upstream_failure(status_code):
+            EndpointBalancer.on_failure(url=endpoint, model_name=model_name, default_url=self.HF_API_URL)
+        else:
+            EndpointBalancer.on_success(url=endpoint, latency_seconds=latency_seconds)
+
+    def _circuit_open_response(self, e: CircuitBreakerOpenError) -> RepositoryClassResponse:
+        error_logger.warning(f"ProcessHuggingFaceAIPromptService._circuit_open_response | circuit open, failing fast | breaker = {e.breaker_name}, retry_after_seconds = {e.retry_after_seconds:.2f}")
+        return RepositoryClassResponse(
+            status=False,
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            message=HuggingFaceAIModelAPIErrorMessage.HUGGING_FACE_CIRCUIT_OPEN.value,
+            data={"retry_after_seconds": e.retry_after_seconds}
+        )
+
+    def _concurrency_limit_response(self, e: ConcurrencyLimitExceededError) -> RepositoryClassResponse:
+        error_logger.warning(f"ProcessHuggingFaceAIPromptService._concurrency_limit_response | no upstream slot available | reason = {e.reason}")
+        return RepositoryClassResponse(
+            status=False,
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            message=HuggingFaceAIModelAPIErrorMessage.HUGGING_FACE_CONCURRENCY_LIMIT_EXCEEDED.value,
+            data={"retry_after_seconds": e.retry_after_seconds}
+        )
+
+    def _rate_limit_response(self, e: RateLimitExceededError) -> RepositoryClassResponse:
+        info_logger.info(f"ProcessHuggingFaceAIPromptService._rate_limit_response | request rate limited | dimension = {e.dimension}, retry_after_seconds = {e.retry_after_seconds:.2f}")
+        return RepositoryClassResponse(
+            status=False,
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            message=HuggingFaceAIModelAPIErrorMessage.LLM_RATE_LIMIT_EXCEEDED.value.format(e.dimension),
+            data={"retry_after_seconds": e.retry_after_seconds}
+        )
+
+    def _agent_busy_response(self, e: AgentLockTimeoutError) -> RepositoryClassResponse:
+        info_logger.info(f"ProcessHuggingFaceAIPromptService._agent_busy_response | previous prompt of the agent still running | agent_id = {e.agent_id}, waited = {e.waited_seconds:.2f}s")
+        return RepositoryClassResponse(
+            status=False,
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            message=HuggingFaceAIModelAPIErrorMessage.LLM_AGENT_BUSY.value,
+            data={"retry_after_seconds": e.retry_after_seconds}
+        )
+
+    def _agent_lock_capacity_response(self, e: AgentLockCapacityError) -> RepositoryClassResponse:
+        error_logger.warning(f"ProcessHuggingFaceAIPromptService._agent_lock_capacity_response | no agent lock connection available | agent_id = {e.agent_id}")
+        return RepositoryClassResponse(
+            status=False,
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            message=HuggingFaceAIModelAPIErrorMessage.LLM_AGENT_LOCK_CAPACITY_EXCEEDED.value,
+            data={"retry_after_seconds": e.retry_after_seconds}
+        )
+
+    def _deadline_exceeded_response(self, e: DeadlineExceededError) -> RepositoryClassResponse:
+        return RepositoryClassResponse(
+            status=False,
+            status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+            message=HuggingFaceAIModelAPIErrorMessage.LLM_REQUEST_DEADLINE_EXCEEDED.value
+        )
+
+    def _validate_priority_lane(self, priority_lane: str = None) -> RepositoryClassResponse | None:
+        """
+        A lane asked for by the client must exist, otherwise the call is answered with 400.
+        """
+        if not priority_lane or AdaptiveConcurrencyLimiter.is_lane(priority_lane):
+            return None
+        error_logger.error(f"ProcessHuggingFaceAIPromptService._validate_priority_lane | unknown priority lane | priority_lane = {priority_lane}")
+        return RepositoryClassResponse(
+            status=False,
+            status_code=status.HTTP_400_BAD_REQUEST,
+            message=HuggingFaceAIModelAPIErrorMessage.LLM_PRIORITY_LANE_INVALID.value.format(priority_lane, ", ".join(AdaptiveConcurrencyLimiter.lanes()))
+        )
+
+    async def _check_rate_limits(self, agent_id: str, body: dict, prompt_tokens: int) -> None:
+        """
+        Meter the request against the agent / model buckets before it goes upstream.
+        The token cost is the prompt (prompt_tokens, totalled by the context window build) plus the tokens reserved for the answer.
+        Raises RateLimitExceededError.
+        """
+        estimated_tokens = prompt_tokens + body.get("max_tokens", self.reserved_for_response_tokens)
+        await self.rate_limiter_service.check(
+            agent_id=agent_id,
+            model_name=body["model"],
+            estimated_tokens=estimated_tokens
+        )
+
+    def _generation_params(self, system_prompt: dict) -> dict:
+        """
+        Generation settings of the agent for the request body, max_tokens is always sent and never above LLM_MAX_OUTPUT_TOKENS.
+        """
+        max_tokens = min(
+            system_prompt.get("max_output_tokens") or self.reserved_for_response_tokens,
+            int(ProjectConfigurations.LLM_MAX_OUTPUT_TOKENS.value)
+        )
+        params = {"max_tokens": max_tokens}
+        if system_prompt.get("temperature") is not None:
+            params["temperature"] = system_prompt["temperature"]
+        if system_prompt.get("stop_sequences"):
+            params["stop"] = system_prompt["stop_sequences"]
+        return params
+
+    def _context_max_tokens(self, model_name: str) -> int:
+        return int(self.model_context_max_tokens.get(model_name, self.context_max_tokens))
+
+    async def _history_newest_first(self, agent_id: str, history_chunk: list, deadline: RequestDeadline = None):
+        """
+        Conversation turns of the agent newest first, starting with the chunk loaded with the agent context.
+        The next (older) chunk is only read once the previous one is used up, so a prompt reads as many chunks as
+        its context window needs however long the history is.
+        Raises TransactionAbort if a chunk can not be read, DeadlineExceededError once the deadline is gone.
+        """
+        chunk = history_chunk
+        while True:
+            for turn in chunk:
+                yield turn
+            if len(chunk) < self.history_chunk_turns:
+                return
+            async with self.async_db.begin():
+                async with (deadline.bounded("db_history_chunk") if deadline is not None else nullcontext()):
+                    chunk_result = await self.agent_context_repo.get_turns_before(agent_id=agent_id, before=chunk[-1], limit=self.history_chunk_turns)
+                if not chunk_result.status:
+                    raise TransactionAbort(chunk_result)
+            chunk = chunk_result.data
+
+    async def _build_request_body(self, request, deadline: RequestDeadline = None, model_name: str = None) -> tuple[dict, dict, int, int]:
+        """
+        Build the body for the hugging face chat completion api (system prompt + tools + sliding window history + new prompt).
+        The model is the agent's ai_model or, while that one misses its slo, the next model of its fallback chain (ModelFallback),
+        model_name forces one (e.g. to keep the model of a stream whose body is rebuilt).
+        Returns (body, agent settings, prompt tokens, user prompt tokens) so callers can read the per agent settings
+        (AgentContext.settings), meter the prompt and store the new turn's token count without tokenizing it again.
+        Raises TransactionAbort if the agent context can not be loaded, DeadlineExceededError once the deadline is gone.
+        """
+        # system prompt, settings, tools and the tail of the history in one round trip
+        async with self.async_db.begin():
+            async with (deadline.bounded("db_agent_context") if deadline is not None else nullcontext()):
+                context_result = await self.agent_context_repo.load(agent_id=request.agent_id, history_limit=self.history_chunk_turns)
+            if not context_result.status:
+                raise TransactionAbort(context_result)
+        context = context_result.data
+        if deadline is not None:
+            deadline.apply_agent_default(context.settings.get("request_timeout_seconds"))
+        model_name = model_name or ModelFallback.choose(
+            model_name=context.ai_model,
+            fallback_models=context.settings.get("fallback_models")
+        )
+
+        # Below is the explaination on how the body should be constructed before sending it to the hugging face LLM
+        # body = {
+        #     "model": request.ai_model,
+        #     "messages": [
+        #         """
+        #             Here you will tell the model how to behave
+        #         """
+        #         # {"role": "system", "content": "You are a helpful assistant."},
+        #         """
+        #             Here the end user will write the prompt for it to gain answers from the LLM
+        #         """
+        #         {"role": "user", "content": request.user_prompt}
+        #     ]
+        # }
+
+        # [OLD WAY OF SENDING BODY TO THE HF LLM VIA HF API]
+        # body = {
+        #     "model": system_prompt_get_result.data.get("ai_model"),
+        #     "messages": [
+        #         {"role": "system", "content": system_prompt_get_result.data.get("llm_system_prompt")},
+        #         {"role": "user", "content": request.user_prompt}
+        #     ]
+        # }
+
+        # [NEW WAY OF SENDING BODY TO HF LLM MAINTAINING LLM CONTEXT]
+        # BUILD LLM CONTEXT HERE
+        # 1. conversation history and tools come with the agent context loaded above
+        # 2. attach the tool prompt after the system prompt
+        tool_prompt = self.tool_prompt_builder_service.build(context.tools)
+
+        final_system_prompt = (
+            context.llm_system_prompt
+            + tool_prompt
+        )
+
+        # 3. Build context window (tokenizer and budget of the model the request goes to),
+        # the room left for the answer is what max_tokens allows it to use,
+        # older history chunks are only read while the window still has room
+        generation_params = self._generation_params(context.settings)
+        missing_token_counts = []
+        async with aclosing(self._history_newest_first(request.agent_id, context.history_chunk, deadline)) as history:
+            messages, prompt_tokens, user_prompt_tokens = await ContextBuilderService.build(
+                model_name=model_name,
                 system_prompt=final_system_prompt,
-                conversation_turns=conversation_result.data,
+                history=history,
                 new_user_prompt=request.user_prompt,
                 token_counter=TokenCounter.count, 
-                max_tokens=3000,
-                reserved_for_response=800
+                max_tokens=self._context_max_tokens(model_name),
+                reserved_for_response=generation_params["max_tokens"],
+                deadline=deadline,
+                missing_token_counts=missing_token_counts
             )
-                
-            # 4. Create the new body for HF LLM api
-            body = {
-                "model": system_prompt_get_result.data["ai_model"],
-                "messages": messages
-            }
+        if missing_token_counts:
+            await self._save_token_counts(model_name, missing_token_counts)
+            
+        # 4. Create the new body for HF LLM api
+        body = {
+            "model": model_name,
+            "messages": messages,
+            **generation_params
+        }
+        return body, context.settings, prompt_tokens, user_prompt_tokens
 
-            debug_logger.debug(f"ProcessHuggingFaceAIPromptService.process_user_prompt_llm | make request to hugging face | HEADERS = {headers} , BODY = {body}")
+    async def _save_token_counts(self, model_name: str, missing_token_counts: list) -> None:
+        """
+        Store the token counts the context window build had to compute (turns of before the counts were stored or
+        of another model), so the next prompts of the agent budget them without tokenizing.
+        Best effort, a failure only costs tokenizing them again.
+        """
+        user_prompt_tokens = []
+        llm_response_tokens = []
+        for turn, role, tokens in missing_token_counts:
+            (user_prompt_tokens if role == "user" else llm_response_tokens).append({"turn_id": turn.id, "token_counts": {model_name: tokens}})
+        try:
+            async with self.async_db.begin():
+                result = await self.agent_context_repo.save_token_counts(
+                    user_prompt_tokens=user_prompt_tokens,
+                    llm_response_tokens=llm_response_tokens
+                )
+                if not result.status:
+                    raise TransactionAbort(result)
+        except TransactionAbort as e:
+            error_logger.error(f"ProcessHuggingFaceAIPromptService._save_token_counts | token counts not saved | model = {model_name}, error = {e.response.message}")
+        except Exception as e:
+            error_logger.error(f"ProcessHuggingFaceAIPromptService._save_token_counts | token counts not saved | model = {model_name}, error = {str(e)}")
+
+    def _token_counts(self, text: str, model_name: str = None) -> dict | None:
+        """
+        {model_name: tokens} stored with a new prompt / response, None if it can not be counted.
+        """
+        if not model_name:
+            return None
+        try:
+            return {model_name: TokenCounter.count(text=text, model_name=model_name)}
+        except Exception as e:
+            error_logger.error(f"ProcessHuggingFaceAIPromptService._token_counts | {str(e)} | model = {model_name}")
+            return None
 
-            # making hugging face api call 
-            data = await self._call_huggingface_with_retry(body, headers)
+    async def _persist_conversation_turn(self, agent_id: str, user_prompt: str, content: str, ai_model: str = None, truncated: bool = False, user_prompt_tokens: int = None) -> None:
+        """
+        Store the user prompt and the llm response in ONE transaction (all or nothing).
+        ai_model is the model that generated the response, truncated flags an answer cut off by a generation cap.
+        Both are stored with their token count for ai_model so the history is tokenized once,
+        user_prompt_tokens is the prompt's count for ai_model when the context window build already has it.
+        Raises TransactionAbort if any of the inserts fail.
+        """
+        user_prompt_token_counts = (
+            {ai_model: user_prompt_tokens} if ai_model and user_prompt_tokens is not None
+            else self._token_counts(user_prompt, ai_model)
+        )
+        llm_response_tokens = self._token_counts(content, ai_model)
+        async with self.async_db.begin():
+            # the agent was checked when its context was loaded
+            user_prompt_insert_result = await self.async_user_prompt_repo.insert(
+                agent_id=agent_id,
+                user_prompt=user_prompt,
+                verify_agent=False,
+                token_counts=user_prompt_token_counts
+            )
+            if not user_prompt_insert_result.status:
+                raise TransactionAbort(user_prompt_insert_result)
 
-            # process response from hugging face ai_model
-            result_process_response_service = self.process_response_service.extract_content(data)
-            if not result_process_response_service:
-                return RepositoryClassResponse(
-                    status=False,
-                    status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                    message=result_process_response_service.message
-                )
-            
-            content = result_process_response_service.data.get("content")
-            if not isinstance(content, str) or not content.strip():
-                return RepositoryClassResponse(
-                    status=False,
-                    status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                    message=HuggingFaceAIModelAPIErrorMessage.LLM_PROMPT_HUGGING_FACE_ERROR.value
+            llm_response_repo = await self.async_llm_response_repo.insert(
+                agent_id=agent_id,
+                llm_user_prompt_id=user_prompt_insert_result.data["id"],
+                llm_prompt_response=content,
+                ai_model=ai_model,
+                truncated=truncated,
+                verify_user_prompt=False,
+                token_counts=llm_response_tokens
+            )
+            if not llm_response_repo.status:
+                raise TransactionAbort(llm_response_repo)
+
+    async def process_user_prompt_llm(self,request, bypass_cache : bool = False, priority_lane : str = None, fallback_priority_lane : str = None, deadline : RequestDeadline = None) -> RepositoryClassResponse:
+        """
+        priority_lane (X-LLM-Priority header) wins over the agent's priority_lane setting,
+        fallback_priority_lane is used when neither is set (before LLM_PRIORITY_DEFAULT_LANE).
+        Prompts of the same agent run one at a time (AgentLock), from reading the history to storing the turn.
+        deadline (RequestDeadline) bounds the whole request, a default one is started when it is not given.
+        Identical prompts of the agent (double submit, client retry) share one run (LLMSingleFlight), before the agent lock.
+        A cache bypass (X-LLM-Cache-Bypass) asks for a fresh answer, it never joins another run.
+        """
+        deadline = deadline or RequestDeadline.start()
+        if bypass_cache or not request.agent_id or not request.user_prompt or not ProjectConfigurations.LLM_SINGLE_FLIGHT_ENABLED.value:
+            return await self._run_user_prompt_llm(request, bypass_cache, priority_lane, fallback_priority_lane, deadline)
+        try:
+            # a caller that joined someone else's run still stops waiting at its own deadline
+            async with deadline.bounded("single_flight"):
+                result, shared = await LLMSingleFlight.do(
+                    LLMSingleFlight.make_key(request.agent_id, request.user_prompt, priority_lane or fallback_priority_lane),
+                    lambda: self._run_user_prompt_llm(request, bypass_cache, priority_lane, fallback_priority_lane, deadline),
+                    reuse_seconds=float(ProjectConfigurations.LLM_SINGLE_FLIGHT_REUSE_SECONDS.value),
+                    # only answered prompts are handed out after the run, a failure is tried again
+                    reusable=lambda result: result.status
                 )
+        except DeadlineExceededError as e:
+            return self._deadline_exceeded_response(e)
+        debug_logger.debug(f"ProcessHuggingFaceAIPromptService.process_user_prompt_llm | single flight | agent_id = {request.agent_id}, shared = {shared}")
+        return result
+
+    async def _run_user_prompt_llm(self, request, bypass_cache : bool = False, priority_lane : str = None, fallback_priority_lane : str = None, deadline : RequestDeadline = None) -> RepositoryClassResponse:
+        """
+        One prompt under the agent lock, every failure is turned into a RepositoryClassResponse.
+        """
+        try:
+            if not request.agent_id:
+                return await self._process_user_prompt_llm(request, bypass_cache, priority_lane, fallback_priority_lane, deadline)
+            async with AgentLock.hold(request.agent_id, timeout_seconds=deadline.remaining()):
+                return await self._process_user_prompt_llm(request, bypass_cache, priority_lane, fallback_priority_lane, deadline)
+        except AgentLockTimeoutError as e:
+            if deadline.expired():
+                return self._deadline_exceeded_response(deadline.exceeded("agent_lock"))
+            return self._agent_busy_response(e)
+        except AgentLockCapacityError as e:
+            return self._agent_lock_capacity_response(e)
+        except Exception as e:
+            error_logger.exception(
+                f"ProcessHuggingFaceAIPromptService.process_user_prompt_llm | {e}"
+            )
+            return RepositoryClassResponse(
+                status=False,
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                message=str(e)
+            )
+
+    async def _process_user_prompt_llm(self, request, bypass_cache : bool = False, priority_lane : str = None, fallback_priority_lane : str = None, deadline : RequestDeadline = None) -> RepositoryClassResponse:
+        try:                        
+            invalid_lane_result = self._validate_priority_lane(priority_lane)
+            if invalid_lane_result is not None:
+                return invalid_lane_result
+
+            body, system_prompt, prompt_tokens, user_prompt_tokens = await self._build_request_body(request, deadline=deadline)
+            priority_lane = AdaptiveConcurrencyLimiter.resolve_lane(priority_lane, system_prompt.get("priority_lane"), fallback_priority_lane)
+
+            info_logger.info(f"ProcessHuggingFaceAIPromptService.process_user_prompt_llm | This class hit was a success! ")
+            debug_logger.debug(f"ProcessHuggingFaceAIPromptService.process_user_prompt_llm | get auth token from the env file | HUGGING_FACE_AUTH_TOKEN = {self.hugging_face_auth_token}")
             
-            with self.db.begin():
-                user_prompt_insert_result = self.user_prompt_repo.insert(
-                    agent_id=request.agent_id,
-                    user_prompt=request.user_prompt
-                )
-                if not user_prompt_insert_result.status:
-                    raise TransactionAbort(user_prompt_insert_result)
+            # the body is sent pre-encoded (RequestBodyEncoder)
+            headers = {"Authorization": f"Bearer {self.hugging_face_auth_token}", "Content-Type": "application/json"}
 
-                llm_response_repo = self.llm_response_repo.insert(
-                    agent_id=request.agent_id,
-                    llm_user_prompt_id=user_prompt_insert_result.data["id"],
-                    llm_prompt_response=content
-                )
-                if not llm_response_repo.status:
-                    raise TransactionAbort(llm_response_repo)
+            debug_logger.debug(f"ProcessHuggingFaceAIPromptService.process_user_prompt_llm | make request to hugging face | HEADERS = {headers} , BODY = {body}")
+
+            # opt-in exact match cache (the key covers the agent, the model, the whole context window and generation params)
+            cache_ttl_seconds = system_prompt.get("response_cache_ttl_seconds") or 0
+            cache_enabled = ProjectConfigurations.LLM_RESPONSE_CACHE_ENABLED.value and cache_ttl_seconds > 0
+            cache_key = None
+            content = None
+            if cache_enabled:
+                cache_key = LLMResponseCache.make_key(request.agent_id, body)
+                if bypass_cache:
+                    # skip the lookup but still refresh the entry with the new answer
+                    LLMResponseCache.record_bypass()
+                else:
+                    content = LLMResponseCache.get(cache_key, ttl_seconds=cache_ttl_seconds)
+                debug_logger.debug(f"ProcessHuggingFaceAIPromptService.process_user_prompt_llm | llm response cache lookup | agent_id = {request.agent_id}, hit = {content is not None}")
+
+            cache_hit = content is not None
+            truncated = False
+            if not cache_hit:
+                # cache hits never reach the upstream so they are not metered
+                await self._check_rate_limits(agent_id=request.agent_id, body=body, prompt_tokens=prompt_tokens)
+
+                # making hugging face api call 
+                data = await self._call_huggingface_with_retry(body, headers, priority_lane=priority_lane, deadline=deadline)
+
+                # process response from hugging face ai_model
+                result_process_response_service = self.process_response_service.extract_content(data)
+                if not result_process_response_service:
+                    return RepositoryClassResponse(
+                        status=False,
+                        status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                        message=result_process_response_service.message
+                    )
+                
+                content = result_process_response_service.data.get("content")
+                truncated = result_process_response_service.data.get("finish_reason") == "length"
+                if truncated:
+                    info_logger.info(f"ProcessHuggingFaceAIPromptService.process_user_prompt_llm | answer truncated at max_tokens | agent_id = {request.agent_id}, max_tokens = {body['max_tokens']}")
+                if not isinstance(content, str) or not content.strip():
+                    return RepositoryClassResponse(
+                        status=False,
+                        status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                        message=HuggingFaceAIModelAPIErrorMessage.LLM_PROMPT_HUGGING_FACE_ERROR.value
+                    )
+
+            # cache hits are stored as a normal turn too so the conversation history stays consistent
+            await self._persist_conversation_turn(
+                agent_id=request.agent_id,
+                user_prompt=request.user_prompt,
+                content=content,
+                ai_model=body["model"],
+                truncated=truncated,
+                user_prompt_tokens=user_prompt_tokens
+            )
+
+            # a cut off answer is not cached, the next identical prompt gets a new chance
+            if cache_key is not None and not cache_hit and not truncated:
+                LLMResponseCache.set(cache_key, content, ttl_seconds=cache_ttl_seconds)
             
             return RepositoryClassResponse(
                     status = True,
                     status_code = status.HTTP_200_OK,
                     message = HuggingFaceAIModelAPISuccessMessage.LLM_USER_PROMPT_SUCCESS.value,
                     data = {
-                        "content":content
+                        "content":content,
+                        "cached":cache_hit,
+                        "model":body["model"],
+                        "truncated":truncated
                     }
                 )
         except TransactionAbort as e:
@@ -243,6 +711,14 @@ class ProcessHuggingFaceAIPromptService:
                 status_code=e.response.status_code,
                 message=e.response.message
             )
+        except DeadlineExceededError as e:
+            return self._deadline_exceeded_response(e)
+        except CircuitBreakerOpenError as e:
+            return self._circuit_open_response(e)
+        except ConcurrencyLimitExceededError as e:
+            return self._concurrency_limit_response(e)
+        except RateLimitExceededError as e:
+            return self._rate_limit_response(e)
         except httpx.ReadTimeout:
             return RepositoryClassResponse(
                 status=False,
@@ -259,6 +735,272 @@ class ProcessHuggingFaceAIPromptService:
                 message=str(e)
             )
     
+    @staticmethod
+    def _format_sse_event(event: str, payload: dict) -> str:
+        return f"event: {event}\ndata: {json.dumps(payload)}\n\n"
+
+    async def prepare_user_prompt_llm_stream(self, request, priority_lane : str = None, deadline : RequestDeadline = None) -> RepositoryClassResponse:
+        """
+        Build the request body up front so that a missing agent / system prompt is still returned as a normal http error.
+        On success data["events"] is an async generator of server sent events for the StreamingResponse.
+        The deadline bounds everything until the upstream stream starts (the tokens are delivered as they come).
+        """
+        deadline = deadline or RequestDeadline.start()
+        try:
+            invalid_lane_result = self._validate_priority_lane(priority_lane)
+            if invalid_lane_result is not None:
+                return invalid_lane_result
+
+            body, system_prompt, prompt_tokens, user_prompt_tokens = await self._build_request_body(request, deadline=deadline)
+            priority_lane = AdaptiveConcurrencyLimiter.resolve_lane(priority_lane, system_prompt.get("priority_lane"))
+            await self._check_rate_limits(agent_id=request.agent_id, body=body, prompt_tokens=prompt_tokens)
+            body["stream"] = True
+            # the body is sent pre-encoded (RequestBodyEncoder)
+            headers = {"Authorization": f"Bearer {self.hugging_face_auth_token}", "Content-Type": "application/json"}
+
+            # an open circuit is answered with a plain 503 before the event stream is even started
+            endpoint = self._pick_endpoint(model_name=body["model"])
+            breaker = self._get_circuit_breaker(endpoint=endpoint, model_name=body["model"])
+            if breaker is not None and breaker.retry_after_seconds() > 0:
+                raise CircuitBreakerOpenError(breaker_name=breaker.name, retry_after_seconds=breaker.retry_after_seconds())
+            debug_logger.debug(f"ProcessHuggingFaceAIPromptService.prepare_user_prompt_llm_stream | make streaming request to hugging face | BODY = {body}")
+            return RepositoryClassResponse(
+                status = True,
+                status_code = status.HTTP_200_OK,
+                message = HuggingFaceAIModelAPISuccessMessage.LLM_USER_PROMPT_STREAM_STARTED.value,
+                data = {
+                    "events": self._stream_user_prompt_llm_serialized(request=request, body=body, headers=headers, endpoint=endpoint, breaker=breaker, priority_lane=priority_lane, deadline=deadline, user_prompt_tokens=user_prompt_tokens)
+                }
+            )
+        except TransactionAbort as e:
+            return RepositoryClassResponse(
+                status=False,
+                status_code=e.response.status_code,
+                message=e.response.message
+            )
+        except DeadlineExceededError as e:
+            return self._deadline_exceeded_response(e)
+        except CircuitBreakerOpenError as e:
+            return self._circuit_open_response(e)
+        except RateLimitExceededError as e:
+            return self._rate_limit_response(e)
+        except Exception as e:
+            error_logger.exception(
+                f"ProcessHuggingFaceAIPromptService.prepare_user_prompt_llm_stream | {e}"
+            )
+            return RepositoryClassResponse(
+                status=False,
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                message=str(e)
+            )
+
+    async def _stream_user_prompt_llm_serialized(self, request, body: dict, headers: dict, endpoint: str, breaker=None, priority_lane: str = None, deadline: RequestDeadline = None, user_prompt_tokens: int = None):
+        """
+        Hold the agent lock (AgentLock) for the whole stream so the turn is stored before the next prompt of the agent reads the history.
+        If another prompt of the agent ran first, the body is rebuilt so the context includes its turn.
+        """
+        if not request.agent_id:
+            async with aclosing(self._stream_user_prompt_llm(request=request, body=body, headers=headers, endpoint=endpoint, breaker=breaker, priority_lane=priority_lane, deadline=deadline, user_prompt_tokens=user_prompt_tokens)) as events:
+                async for event in events:
+                    yield event
+            return
+        try:
+            async with AgentLock.hold(request.agent_id, timeout_seconds=deadline.remaining() if deadline is not None else None) as lock:
+                if lock is not None and lock.contended:
+                    # same model, the endpoint and circuit breaker were picked for it
+                    body, _, _, user_prompt_tokens = await self._build_request_body(request, deadline=deadline, model_name=body["model"])
+                    body["stream"] = True
+                async with aclosing(self._stream_user_prompt_llm(request=request, body=body, headers=headers, endpoint=endpoint, breaker=breaker, priority_lane=priority_lane, deadline=deadline, user_prompt_tokens=user_prompt_tokens)) as events:
+                    async for event in events:
+                        yield event
+        except asyncio.CancelledError:
+            # starlette cancels the stream when the client disconnects
+            RequestCancellation.record_stream_cancelled()
+            raise
+        except AgentLockTimeoutError as e:
+            if deadline is not None and deadline.expired():
+                yield self._format_sse_event("error", {
+                    "status": status.HTTP_504_GATEWAY_TIMEOUT,
+                    "error": self._deadline_exceeded_response(deadline.exceeded("agent_lock")).message
+                })
+                return
+            yield self._format_sse_event("error", {
+                "status": status.HTTP_429_TOO_MANY_REQUESTS,
+                "error": self._agent_busy_response(e).message
+            })
+        except AgentLockCapacityError as e:
+            yield self._format_sse_event("error", {
+                "status": status.HTTP_503_SERVICE_UNAVAILABLE,
+                "error": self._agent_lock_capacity_response(e).message
+            })
+        except DeadlineExceededError as e:
+            yield self._format_sse_event("error", {
+                "status": status.HTTP_504_GATEWAY_TIMEOUT,
+                "error": self._deadline_exceeded_response(e).message
+            })
+        except TransactionAbort as e:
+            yield self._format_sse_event("error", {"status": e.response.status_code, "error": e.response.message})
+
+    async def _stream_user_prompt_llm(self, request, body: dict, headers: dict, endpoint: str, breaker=None, priority_lane: str = None, deadline: RequestDeadline = None, user_prompt_tokens: int = None):
+        """
+        Relay the hugging face token stream as server sent events:
+        - event: token -> {"content": "<delta>"} for every chunk
+        - event: done  -> {"status": 200, "message": ..., "data": {"content": "<full text>", "model": ..., "truncated": bool}} after the turn is stored
+        - event: error -> {"status": <code>, "error": <message>} (nothing is stored)
+        The user prompt and the response are only persisted once the stream finished successfully.
+        The stream is cut off (truncated) after max_tokens chunks or LLM_MAX_GENERATION_SECONDS, whichever comes first,
+        in case the upstream does not stop at max_tokens itself.
+        """
+        content_parts = []
+        finish_reason = None
+        # longest wait for the next read (headers, first token, gaps between tokens), what the read timeout applies to
+        last_read_at = None
+        longest_read_wait = 0.0
+        generation_cap_seconds = float(ProjectConfigurations.LLM_MAX_GENERATION_SECONDS.value)
+        breaker_outcome_recorded = breaker is None
+        endpoint_started = False
+        endpoint_outcome_recorded = False
+        try:
+            if breaker is not None:
+                breaker.check()
+            start = time.perf_counter()
+            first_token_ms = None
+            # the deadline only bounds the wait for the stream to start (limiter queue + response headers)
+            async with (deadline.bounded("upstream") if deadline is not None else nullcontext()) as deadline_timeout:
+                # the limiter slot is held for the whole stream, that is how long the upstream is busy with it
+                async with AdaptiveConcurrencyLimiter.slot(lane=priority_lane) as permit:
+                    EndpointBalancer.on_start(endpoint)
+                    endpoint_started = True
+                    read_timeout = AdaptiveTimeout.read_timeout(body["model"], AdaptiveTimeout.STREAM)
+                    headers_start = last_read_at = time.perf_counter()
+                    async with self.http_client.stream(endpoint, content=RequestBodyEncoder.encode(body), headers=headers, timeout=self.http_client.timeout_with_read(read_timeout)) as resp:
+                        last_read_at = time.perf_counter()
+                        longest_read_wait = last_read_at - headers_start
+                        permit.record_status(resp.status_code, model_name=body["model"], kind=UpstreamPermit.STREAM)
+                        if deadline_timeout is not None:
+                            deadline_timeout.reschedule(None)
+                        # time to response headers is the latency sample for the balancer
+                        self._record_endpoint_result(endpoint=endpoint, model_name=body["model"], status_code=resp.status_code, latency_seconds=time.perf_counter() - headers_start)
+                        ModelFallback.record(body["model"], succeeded=not self._is_upstream_failure(resp.status_code))
+                        endpoint_outcome_recorded = True
+                        if breaker is not None:
+                            self._record_circuit_breaker_result(breaker, resp.status_code)
+                            breaker_outcome_recorded = True
+                        if resp.status_code >= 400:
+                            error_body = (await resp.aread()).decode(errors="replace")
+                            error_logger.error(f"ProcessHuggingFaceAIPromptService._stream_user_prompt_llm | HuggingFace stream failed | status={resp.status_code} | body={error_body}")
+                            yield self._format_sse_event("error", {"status": resp.status_code, "error": error_body})
+                            return
+
+                        async for line in resp.aiter_lines():
+                            now = time.perf_counter()
+                            longest_read_wait, last_read_at = max(longest_read_wait, now - last_read_at), now
+                            # checked per line, a stalled upstream is ended by the read timeout of the http client
+                            if generation_cap_seconds > 0 and now - headers_start > generation_cap_seconds:
+                                finish_reason = "time_limit"
+                                break
+                            if not line.startswith("data:"):
+                                continue
+                            payload = line[len("data:"):].strip()
+                            if payload == "[DONE]":
+                                break
+                            chunk = RequestBodyEncoder.decode(payload)
+                            finish_reason = self.process_response_service.extract_stream_finish_reason(chunk) or finish_reason
+                            delta = self.process_response_service.extract_stream_delta(chunk)
+                            if not delta:
+                                continue
+                            if first_token_ms is None:
+                                first_token_ms = (time.perf_counter() - start) * 1000
+                            content_parts.append(delta)
+                            yield self._format_sse_event("token", {"content": delta})
+                            # the time the client took to take the token is not a read wait
+                            last_read_at = time.perf_counter()
+                            # one chunk is one token
+                            if len(content_parts) >= body["max_tokens"]:
+                                finish_reason = finish_reason or "length"
+                                break
+
+            AdaptiveTimeout.record(body["model"], AdaptiveTimeout.STREAM, latency_seconds=longest_read_wait)
+            duration_ms = (time.perf_counter() - start) * 1000
+            debug_logger.debug(f"ProcessHuggingFaceAIPromptService._stream_user_prompt_llm | HuggingFace stream finished | time_to_first_token={first_token_ms}ms , time={duration_ms:.2f}ms")
+
+            content = "".join(content_parts)
+            truncated = finish_reason in ("length", "time_limit")
+            if truncated:
+                info_logger.info(f"ProcessHuggingFaceAIPromptService._stream_user_prompt_llm | stream truncated | agent_id = {request.agent_id}, reason = {finish_reason}, chunks = {len(content_parts)}")
+            if not content.strip():
+                yield self._format_sse_event("error", {
+                    "status": status.HTTP_500_INTERNAL_SERVER_ERROR,
+                    "error": HuggingFaceAIModelAPIErrorMessage.LLM_PROMPT_HUGGING_FACE_ERROR.value
+                })
+                return
+
+            await self._persist_conversation_turn(
+                agent_id=request.agent_id,
+                user_prompt=request.user_prompt,
+                content=content,
+                ai_model=body["model"],
+                truncated=truncated,
+                user_prompt_tokens=user_prompt_tokens
+            )
+            yield self._format_sse_event("done", {
+                "status": status.HTTP_200_OK,
+                "message": HuggingFaceAIModelAPISuccessMessage.LLM_USER_PROMPT_SUCCESS.value,
+                "data": {"content": content, "model": body["model"], "truncated": truncated}
+            })
+        except TransactionAbort as e:
+            yield self._format_sse_event("error", {"status": e.response.status_code, "error": e.response.message})
+        except DeadlineExceededError as e:
+            yield self._format_sse_event("error", {
+                "status": status.HTTP_504_GATEWAY_TIMEOUT,
+                "error": self._deadline_exceeded_response(e).message
+            })
+        except CircuitBreakerOpenError as e:
+            # the breaker was already checked in prepare_user_prompt_llm_stream (nothing was sent upstream here)
+            breaker_outcome_recorded = True
+            yield self._format_sse_event("error", {
+                "status": status.HTTP_503_SERVICE_UNAVAILABLE,
+                "error": self._circuit_open_response(e).message
+            })
+        except ConcurrencyLimitExceededError as e:
+            yield self._format_sse_event("error", {
+                "status": status.HTTP_503_SERVICE_UNAVAILABLE,
+                "error": self._concurrency_limit_response(e).message
+            })
+        except (httpx.TimeoutException, httpx.TransportError) as e:
+            if not breaker_outcome_recorded:
+                breaker.record_failure()
+                breaker_outcome_recorded = True
+            if endpoint_started and not endpoint_outcome_recorded:
+                EndpointBalancer.on_failure(url=endpoint, model_name=body["model"], default_url=self.HF_API_URL)
+                ModelFallback.record(body["model"], succeeded=False)
+                endpoint_outcome_recorded = True
+            if isinstance(e, httpx.ReadTimeout) and last_read_at is not None:
+                # headers or the next token did not come within the read timeout
+                AdaptiveTimeout.record_timeout(body["model"], AdaptiveTimeout.STREAM, waited_seconds=time.perf_counter() - last_read_at)
+            if isinstance(e, httpx.ReadTimeout):
+                yield self._format_sse_event("error", {
+                    "status": status.HTTP_504_GATEWAY_TIMEOUT,
+                    "error": HuggingFaceAIModelAPIErrorMessage.HUGGING_FACE_LLM_API_TIMEOUT.value
+                })
+            else:
+                error_logger.exception(
+                    f"ProcessHuggingFaceAIPromptService._stream_user_prompt_llm | {e}"
+                )
+                yield self._format_sse_event("error", {"status": status.HTTP_500_INTERNAL_SERVER_ERROR, "error": str(e)})
+        except Exception as e:
+            error_logger.exception(
+                f"ProcessHuggingFaceAIPromptService._stream_user_prompt_llm | {e}"
+            )
+            yield self._format_sse_event("error", {"status": status.HTTP_500_INTERNAL_SERVER_ERROR, "error": str(e)})
+        finally:
+            # client disconnected before the upstream answered, free the half-open probe slot
+            if not breaker_outcome_recorded:
+                breaker.release()
+            if endpoint_started and not endpoint_outcome_recorded:
+                EndpointBalancer.on_cancel(endpoint)
+                RequestCancellation.record_upstream_cancelled()
+
     """
     This service is used to reset the agent 
     - Deletes all the user_prompts from the database
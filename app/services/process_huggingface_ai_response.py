@@ -19,12 +19,15 @@ class ProcessPromptResponseService:
         info_logger.info(f"ProcessPromptResponseService.extract_content | Extract assistant message content from Hugging Face chat completion response.")
         try:
             prompt_output = hf_response["choices"][0]["message"]["content"]
-            debug_logger.debug(f"ProcessPromptResponseService.extract_content | prompt_output = {prompt_output}")
+            # "length" means the answer hit max_tokens
+            finish_reason = hf_response["choices"][0].get("finish_reason")
+            debug_logger.debug(f"ProcessPromptResponseService.extract_content | prompt_output = {prompt_output}, finish_reason = {finish_reason}")
             return ServiceClassResponse(
                 status = True,
                 message = PromptApiSuccessMessages.AI_RESPONSE_PROCESSING_EXTRACT_CONTENT.value,
                 data = {
-                    "content":prompt_output
+                    "content":prompt_output,
+                    "finish_reason":finish_reason
                 }
             )
         except Exception as e:
@@ -34,6 +37,35 @@ class ProcessPromptResponseService:
                 message = str(e)
             )
 
+    @staticmethod
+    def extract_stream_delta(hf_stream_chunk: dict) -> str:
+        """
+        Extract the text delta from one streamed chat completion chunk.
+        This runs once per token so it returns a plain string ("" when the chunk carries no text).
+        """
+        try:
+            choices = hf_stream_chunk.get("choices") or []
+            if not choices:
+                return ""
+            return (choices[0].get("delta") or {}).get("content") or ""
+        except (AttributeError, TypeError) as e:
+            error_logger.error(f"ProcessPromptResponseService.extract_stream_delta | error = {str(e)}")
+            return ""
+
+    @staticmethod
+    def extract_stream_finish_reason(hf_stream_chunk: dict) -> str | None:
+        """
+        finish_reason of a streamed chunk, only the last chunk carries one.
+        """
+        try:
+            choices = hf_stream_chunk.get("choices") or []
+            if not choices:
+                return None
+            return choices[0].get("finish_reason")
+        except (AttributeError, TypeError) as e:
+            error_logger.error(f"ProcessPromptResponseService.extract_stream_finish_reason | error = {str(e)}")
+            return None
+
     @staticmethod
     def extract_usage(hf_response: dict) -> ServiceClassResponse:
         try:
@@ -0,0 +1,228 @@
+import time
+from threading import Lock
+from typing import NamedTuple
+
+# load project configurations
+from app.configs.config import ProjectConfigurations
+
+# import repositories
+from app.repositories.rate_limit_bucket_repository import RateLimitBucketRepository
+
+#import database transaction exception handler
+from app.database.db_transaction_exception_handler import TransactionAbort
+
+# import logging utility
+from app.utils.logger import LoggerFactory
+
+# initialize logging utility
+info_logger = LoggerFactory.get_info_logger()
+error_logger = LoggerFactory.get_error_logger()
+debug_logger = LoggerFactory.get_debug_logger()
+
+class RateLimitExceededError(Exception):
+    def __init__(self, dimension: str, retry_after_seconds: float):
+        super().__init__(f"rate limit exceeded for {dimension}")
+        self.dimension = dimension
+        self.retry_after_seconds = retry_after_seconds
+
+class TokenBucketSpec(NamedTuple):
+    dimension: str  # human readable name, used in the 429 message and in the stats
+    bucket_key: str
+    capacity: float
+    refill_per_second: float
+    cost: float
+
+class InMemoryRateLimitStore:
+    """
+    Token buckets kept in this process (single node deployments). Thread-safe.
+    try_consume / count_active are coroutines only to share the interface of PostgresRateLimitStore, they never wait.
+    """
+
+    _buckets: dict[str, list[float]] = {}  # bucket_key -> [tokens, updated_at (monotonic)]
+    _lock = Lock()
+
+    @classmethod
+    async def try_consume(cls, specs: list[TokenBucketSpec]) -> TokenBucketSpec | None:
+        """
+        Take the cost from every bucket, or from none of them.
+        Returns None on success, otherwise the first bucket that does not have enough tokens.
+        """
+        now = time.monotonic()
+        with cls._lock:
+            for spec in specs:
+                bucket = cls._buckets.setdefault(spec.bucket_key, [spec.capacity, now])
+                bucket[0] = min(spec.capacity, bucket[0] + (now - bucket[1]) * spec.refill_per_second)
+                bucket[1] = now
+            for spec in specs:
+                if cls._buckets[spec.bucket_key][0] < spec.cost:
+                    return spec
+            for spec in specs:
+                cls._buckets[spec.bucket_key][0] -= spec.cost
+        return None
+
+    @classmethod
+    def tokens(cls, bucket_key: str) -> float:
+        with cls._lock:
+            return cls._buckets[bucket_key][0]
+
+    @classmethod
+    async def count_active(cls, key_prefix: str, window_seconds: float, exclude_key: str = None) -> int:
+        now = time.monotonic()
+        with cls._lock:
+            return sum(
+                1 for key, (_, updated_at) in cls._buckets.items()
+                if key.startswith(key_prefix) and key != exclude_key and now - updated_at <= window_seconds
+            )
+
+    @classmethod
+    def size(cls) -> int:
+        with cls._lock:
+            return len(cls._buckets)
+
+class PostgresRateLimitStore:
+    """
+    Token buckets shared by all workers through the rate_limit_bucket_table (async session, the event loop never waits on postgres)
+    """
+
+    def __init__(self, db):
+        self.db = db
+        self.repository = RateLimitBucketRepository(db=db)
+        self._last_tokens: dict[str, float] = {}
+
+    async def try_consume(self, specs: list[TokenBucketSpec]) -> TokenBucketSpec | None:
+        # always lock the rows in the same order so two workers can not deadlock each other
+        specs = sorted(specs, key=lambda spec: spec.bucket_key)
+        async with self.db.begin():
+            for spec in specs:
+                refill_result = await self.repository.refill(
+                    bucket_key=spec.bucket_key,
+                    capacity=spec.capacity,
+                    refill_per_second=spec.refill_per_second
+                )
+                if not refill_result.status:
+                    raise TransactionAbort(refill_result)
+                self._last_tokens[spec.bucket_key] = refill_result.data["tokens"]
+
+            for spec in specs:
+                if self._last_tokens[spec.bucket_key] < spec.cost:
+                    return spec
+
+            for spec in specs:
+                consume_result = await self.repository.consume(bucket_key=spec.bucket_key, cost=spec.cost)
+                if not consume_result.status:
+                    raise TransactionAbort(consume_result)
+        return None
+
+    def tokens(self, bucket_key: str) -> float:
+        return self._last_tokens[bucket_key]
+
+    async def count_active(self, key_prefix: str, window_seconds: float, exclude_key: str = None) -> int:
+        async with self.db.begin():
+            count_result = await self.repository.count_active(
+                key_prefix=key_prefix,
+                window_seconds=window_seconds,
+                exclude_key=exclude_key
+            )
+            if not count_result.status:
+                raise TransactionAbort(count_result)
+        return count_result.data["count"]
+
+class RateLimiterService:
+    """
+    Request-rate and token-rate limits per agent and per model (token buckets, refilled every second)
+
+    - agent buckets : stop one agent from flooding the upstream
+    - model buckets : total capacity we want to use on one hugging face model
+    - fair share    : the model capacity is split evenly between the agents that used the model
+                      during the last RATE_LIMIT_FAIR_SHARE_WINDOW_SECONDS, so when several agents
+                      contend none of them can take more than 1/N of it
+
+    A limit of 0 disables that bucket. Rejections carry the time until the bucket has enough tokens again.
+    """
+
+    _counters = {
+        "allowed": 0,
+        "rejected": 0,
+    }
+    _rejected_by_dimension: dict[str, int] = {}
+
+    def __init__(self, db):
+        """
+        db is the AsyncSession of the request, only used by the postgres store.
+        """
+        if ProjectConfigurations.RATE_LIMIT_STORE.value == "postgres":
+            self.store = PostgresRateLimitStore(db=db)
+        else:
+            self.store = InMemoryRateLimitStore
+
+    @staticmethod
+    def _per_minute_spec(dimension: str, bucket_key: str, per_minute: float, cost: float) -> TokenBucketSpec | None:
+        if per_minute <= 0:
+            return None
+        # a request bigger than the whole bucket would never fit, let it through once the bucket is full
+        return TokenBucketSpec(
+            dimension=dimension,
+            bucket_key=bucket_key,
+            capacity=per_minute,
+            refill_per_second=per_minute / 60.0,
+            cost=min(cost, per_minute)
+        )
+
+    async def _build_specs(self, agent_id: str, model_name: str, estimated_tokens: int) -> list[TokenBucketSpec]:
+        agent_requests = float(ProjectConfigurations.RATE_LIMIT_AGENT_REQUESTS_PER_MINUTE.value)
+        agent_tokens = float(ProjectConfigurations.RATE_LIMIT_AGENT_TOKENS_PER_MINUTE.value)
+        model_requests = float(ProjectConfigurations.RATE_LIMIT_MODEL_REQUESTS_PER_MINUTE.value)
+        model_tokens = float(ProjectConfigurations.RATE_LIMIT_MODEL_TOKENS_PER_MINUTE.value)
+
+        specs = [
+            self._per_minute_spec("agent requests", f"agent:{agent_id}:requests", agent_requests, 1),
+            self._per_minute_spec("agent tokens", f"agent:{agent_id}:tokens", agent_tokens, estimated_tokens),
+            self._per_minute_spec("model requests", f"model:{model_name}:requests", model_requests, 1),
+            self._per_minute_spec("model tokens", f"model:{model_name}:tokens", model_tokens, estimated_tokens),
+        ]
+
+        if ProjectConfigurations.RATE_LIMIT_FAIR_SHARE_ENABLED.value and (model_requests > 0 or model_tokens > 0):
+            # count the other agents through whichever fair share bucket exists for this model
+            count_dimension = "tokens" if model_tokens > 0 else "requests"
+            other_agents = await self.store.count_active(
+                key_prefix=f"fair:{model_name}:{count_dimension}:",
+                window_seconds=float(ProjectConfigurations.RATE_LIMIT_FAIR_SHARE_WINDOW_SECONDS.value),
+                exclude_key=f"fair:{model_name}:{count_dimension}:{agent_id}"
+            )
+            active_agents = 1 + other_agents
+            specs.append(self._per_minute_spec("fair share of model requests", f"fair:{model_name}:requests:{agent_id}", model_requests / active_agents, 1))
+            specs.append(self._per_minute_spec("fair share of model tokens", f"fair:{model_name}:tokens:{agent_id}", model_tokens / active_agents, estimated_tokens))
+
+        return [spec for spec in specs if spec is not None]
+
+    async def check(self, agent_id: str, model_name: str, estimated_tokens: int) -> None:
+        """
+        Raises RateLimitExceededError (nothing is consumed) if any bucket is empty.
+        """
+        if not ProjectConfigurations.RATE_LIMIT_ENABLED.value:
+            return
+        specs = await self._build_specs(agent_id=agent_id, model_name=model_name, estimated_tokens=estimated_tokens)
+        if not specs:
+            return
+
+        denied = await self.store.try_consume(specs)
+        if denied is None:
+            RateLimiterService._counters["allowed"] += 1
+            return
+
+        missing_tokens = denied.cost - self.store.tokens(denied.bucket_key)
+        retry_after_seconds = max(0.0, missing_tokens / denied.refill_per_second)
+        RateLimiterService._counters["rejected"] += 1
+        RateLimiterService._rejected_by_dimension[denied.dimension] = RateLimiterService._rejected_by_dimension.get(denied.dimension, 0) + 1
+        debug_logger.debug(f"RateLimiterService.check | rate limited | agent_id = {agent_id}, model = {model_name}, bucket = {denied.bucket_key}, retry_after_seconds = {retry_after_seconds:.2f}")
+        raise RateLimitExceededError(dimension=denied.dimension, retry_after_seconds=retry_after_seconds)
+
+    @classmethod
+    def stats(cls) -> dict:
+        return {
+            **cls._counters,
+            "rejected_by_dimension": dict(cls._rejected_by_dimension),
+            "enabled": ProjectConfigurations.RATE_LIMIT_ENABLED.value,
+            "store": ProjectConfigurations.RATE_LIMIT_STORE.value,
+            "in_memory_buckets": InMemoryRateLimitStore.size(),
+        }
@@ -0,0 +1,94 @@
+from collections import OrderedDict
+from threading import Lock
+
+# fast json codec for the upstream payloads
+import orjson
+
+# load project configurations
+from app.configs.config import ProjectConfigurations
+
+# import logging utility
+from app.utils.logger import LoggerFactory
+
+# initialize logging utility
+info_logger = LoggerFactory.get_info_logger()
+error_logger = LoggerFactory.get_error_logger()
+debug_logger = LoggerFactory.get_debug_logger()
+
+class RequestBodyEncoder:
+    """
+    Encodes the chat completion body for hugging face from pre-encoded message fragments
+
+    - every message ({"role", "content"}) is encoded once with orjson and kept in an LRU cache,
+      the system prompt and the history turns of an agent are the same on every prompt so they are only encoded once
+    - the payload is assembled by joining the cached fragments, only the model / generation params and
+      the messages that are new are encoded per request
+    - bounded by the total size of the cached fragments (LLM_BODY_FRAGMENT_CACHE_MAX_BYTES)
+    - Thread-safe
+    The result is the same JSON as orjson.dumps(body) (keys other than messages first).
+    """
+
+    _fragments: "OrderedDict[tuple[str, str], bytes]" = OrderedDict()
+    _lock = Lock()
+    _size_bytes = 0
+
+    _max_bytes = int(ProjectConfigurations.LLM_BODY_FRAGMENT_CACHE_MAX_BYTES.value)
+
+    _counters = {
+        "bodies_encoded": 0,
+        "fragment_hits": 0,
+        "fragment_misses": 0,
+        "fragment_evictions": 0,
+    }
+
+    @classmethod
+    def _fragment(cls, message: dict) -> bytes:
+        key = (message["role"], message["content"])
+        with cls._lock:
+            fragment = cls._fragments.get(key)
+            if fragment is not None:
+                cls._fragments.move_to_end(key)
+                cls._counters["fragment_hits"] += 1
+                return fragment
+            cls._counters["fragment_misses"] += 1
+
+        fragment = orjson.dumps({"role": message["role"], "content": message["content"]})
+        # a message bigger than the whole cache is encoded every time
+        if cls._max_bytes <= 0 or len(fragment) > cls._max_bytes:
+            return fragment
+
+        with cls._lock:
+            if key not in cls._fragments:
+                cls._fragments[key] = fragment
+                cls._size_bytes += len(fragment)
+                while cls._size_bytes > cls._max_bytes:
+                    _, evicted = cls._fragments.popitem(last=False)
+                    cls._size_bytes -= len(evicted)
+                    cls._counters["fragment_evictions"] += 1
+        return fragment
+
+    @classmethod
+    def encode(cls, body: dict) -> bytes:
+        """
+        JSON payload of body, body["messages"] is a list of {"role", "content"} dicts.
+        """
+        cls._counters["bodies_encoded"] += 1
+        head = orjson.dumps({key: value for key, value in body.items() if key != "messages"})
+        messages = b"[" + b",".join(cls._fragment(message) for message in body["messages"]) + b"]"
+        if head == b"{}":
+            return b'{"messages":' + messages + b"}"
+        return head[:-1] + b',"messages":' + messages + b"}"
+
+    @staticmethod
+    def decode(payload: bytes | str):
+        return orjson.loads(payload)
+
+    @classmethod
+    def stats(cls) -> dict:
+        with cls._lock:
+            return {
+                **cls._counters,
+                "fragments": len(cls._fragments),
+                "size_bytes": cls._size_bytes,
+                "max_bytes": cls._max_bytes,
+            }
@@ -0,0 +1,109 @@
+from contextvars import ContextVar
+
+# import asynchronous i/o
+import asyncio
+
+# import fast api libraries
+from fastapi import Request
+
+# load project configurations
+from app.configs.config import ProjectConfigurations
+
+# import logging utility
+from app.utils.logger import LoggerFactory
+
+# initialize logging utility
+info_logger = LoggerFactory.get_info_logger()
+error_logger = LoggerFactory.get_error_logger()
+debug_logger = LoggerFactory.get_debug_logger()
+
+# nginx's status for "client closed request", nobody receives it but it shows up in the access logs
+CLIENT_CLOSED_REQUEST = 499
+
+# shared with every task started for the request (single flight leader, hedges), set once the client is gone
+_client_state: ContextVar[dict | None] = ContextVar("client_state", default=None)
+
+class ClientDisconnectedError(Exception):
+    def __init__(self, endpoint: str):
+        super().__init__(f"client disconnected from {endpoint}")
+        self.endpoint = endpoint
+
+class RequestCancellation:
+    """
+    Stops the work of a request whose client went away
+
+    - run() processes a request in its own task and watches the connection for http.disconnect meanwhile,
+      on a disconnect the task is cancelled: the in-flight httpx request is aborted, pending retries never run,
+      the limiter slot and the agent lock are released and nothing is stored
+    - streams are cancelled by starlette itself when the client disconnects, they only report here
+    Only used from the event loop.
+    """
+
+    _counters = {
+        "prompt_requests_cancelled": 0,
+        "stream_requests_cancelled": 0,
+        "upstream_calls_cancelled": 0,
+    }
+
+    @staticmethod
+    async def _wait_for_disconnect(http_request: Request) -> None:
+        # the body was already read by fast api, the next message is the disconnect
+        while True:
+            message = await http_request.receive()
+            if message["type"] == "http.disconnect":
+                return
+
+    @classmethod
+    async def run(cls, http_request: Request | None, coro, endpoint: str):
+        """
+        Await coro unless the client disconnects first, then cancel it and raise ClientDisconnectedError.
+        """
+        if http_request is None or not ProjectConfigurations.CANCEL_ON_CLIENT_DISCONNECT.value:
+            return await coro
+
+        client_state = {"disconnected": False}
+        token = _client_state.set(client_state)
+        try:
+            task = asyncio.ensure_future(coro)
+        finally:
+            _client_state.reset(token)
+        watcher = asyncio.create_task(cls._wait_for_disconnect(http_request))
+        try:
+            done, _ = await asyncio.wait({task, watcher}, return_when=asyncio.FIRST_COMPLETED)
+            if task in done:
+                return task.result()
+
+            client_state["disconnected"] = True
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+            cls._counters["prompt_requests_cancelled"] += 1
+            info_logger.info(f"RequestCancellation.run | client disconnected, request cancelled | endpoint = {endpoint}")
+            raise ClientDisconnectedError(endpoint=endpoint)
+        finally:
+            watcher.cancel()
+            if not task.done():
+                task.cancel()
+
+    @staticmethod
+    def client_disconnected() -> bool:
+        client_state = _client_state.get()
+        return client_state is not None and client_state["disconnected"]
+
+    @classmethod
+    def record_upstream_cancelled(cls) -> None:
+        cls._counters["upstream_calls_cancelled"] += 1
+
+    @classmethod
+    def record_stream_cancelled(cls) -> None:
+        cls._counters["stream_requests_cancelled"] += 1
+        info_logger.info(f"RequestCancellation.record_stream_cancelled | client disconnected, stream cancelled")
+
+    @classmethod
+    def stats(cls) -> dict:
+        return {
+            **cls._counters,
+            "enabled": ProjectConfigurations.CANCEL_ON_CLIENT_DISCONNECT.value,
+        }
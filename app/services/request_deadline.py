@@ -0,0 +1,123 @@
+import math
+import time
+from contextlib import asynccontextmanager
+
+# import asynchronous i/o
+import asyncio
+
+# load project configurations
+from app.configs.config import ProjectConfigurations
+
+# import logging utility
+from app.utils.logger import LoggerFactory
+
+# initialize logging utility
+info_logger = LoggerFactory.get_info_logger()
+error_logger = LoggerFactory.get_error_logger()
+debug_logger = LoggerFactory.get_debug_logger()
+
+class DeadlineExceededError(Exception):
+    def __init__(self, stage: str, budget_seconds: float):
+        super().__init__(f"request deadline of {budget_seconds:.2f}s exceeded during {stage}")
+        self.stage = stage
+        self.budget_seconds = budget_seconds
+
+class RequestDeadline:
+    """
+    Time budget of one prompt request, started when the request arrives
+
+    The budget comes from the X-Request-Timeout header, else the agent's request_timeout_seconds,
+    else LLM_REQUEST_TIMEOUT_SECONDS (0 = no deadline), and is capped at LLM_REQUEST_MAX_TIMEOUT_SECONDS.
+    Every stage (agent lock wait, db reads, context build, each upstream attempt, retry backoff) only gets
+    what is left of it, and work stops with DeadlineExceededError once it is gone.
+    """
+
+    HEADER = "header"
+    AGENT = "agent"
+    DEFAULT = "default"
+
+    _counters = {
+        "started": 0,
+        "exceeded": 0,
+    }
+    _exceeded_by_stage: dict[str, int] = {}
+
+    def __init__(self, budget_seconds: float | None, source: str):
+        self.started_at = time.monotonic()
+        self.source = source
+        self._set_budget(budget_seconds)
+
+    def _set_budget(self, budget_seconds: float | None) -> None:
+        max_seconds = float(ProjectConfigurations.LLM_REQUEST_MAX_TIMEOUT_SECONDS.value)
+        if budget_seconds is None or budget_seconds <= 0 or math.isinf(budget_seconds):
+            budget_seconds = max_seconds if max_seconds > 0 else None
+        elif max_seconds > 0:
+            budget_seconds = min(budget_seconds, max_seconds)
+        self.budget_seconds = budget_seconds
+        self.expires_at = self.started_at + budget_seconds if budget_seconds is not None else None
+
+    @classmethod
+    def start(cls, timeout_seconds: float | None = None) -> "RequestDeadline":
+        """
+        timeout_seconds is the caller's own budget (X-Request-Timeout), None falls back to the defaults.
+        """
+        cls._counters["started"] += 1
+        if timeout_seconds is not None and timeout_seconds > 0:
+            return cls(budget_seconds=timeout_seconds, source=cls.HEADER)
+        return cls(budget_seconds=float(ProjectConfigurations.LLM_REQUEST_TIMEOUT_SECONDS.value), source=cls.DEFAULT)
+
+    def apply_agent_default(self, timeout_seconds: float | None) -> None:
+        """
+        The agent setting is only known after the system prompt was read, it still counts from the arrival of the request.
+        A budget sent by the caller always wins.
+        """
+        if self.source == self.HEADER or not timeout_seconds:
+            return
+        self.source = self.AGENT
+        self._set_budget(float(timeout_seconds))
+
+    def remaining(self) -> float:
+        if self.expires_at is None:
+            return math.inf
+        return max(0.0, self.expires_at - time.monotonic())
+
+    def expired(self) -> bool:
+        return self.remaining() <= 0
+
+    def exceeded(self, stage: str) -> DeadlineExceededError:
+        cls = type(self)
+        cls._counters["exceeded"] += 1
+        cls._exceeded_by_stage[stage] = cls._exceeded_by_stage.get(stage, 0) + 1
+        info_logger.info(f"RequestDeadline.exceeded | giving up, nobody is waiting for the answer anymore | stage = {stage}, budget = {self.budget_seconds}s, source = {self.source}")
+        return DeadlineExceededError(stage=stage, budget_seconds=self.budget_seconds or 0.0)
+
+    def check(self, stage: str) -> None:
+        if self.expired():
+            raise self.exceeded(stage)
+
+    @asynccontextmanager
+    async def bounded(self, stage: str):
+        """
+        async with deadline.bounded("upstream") as timeout: ...
+        Cancels the block when the budget runs out and raises DeadlineExceededError instead of TimeoutError.
+        timeout.reschedule(None) lifts the bound for the rest of the block (e.g. once a stream has started).
+        """
+        self.check(stage)
+        remaining = self.remaining()
+        timeout = asyncio.timeout(None if math.isinf(remaining) else remaining)
+        try:
+            async with timeout:
+                yield timeout
+        except TimeoutError:
+            if not timeout.expired():
+                raise
+            raise self.exceeded(stage)
+
+    @classmethod
+    def stats(cls) -> dict:
+        return {
+            **cls._counters,
+            "exceeded_by_stage": dict(cls._exceeded_by_stage),
+            "default_timeout_seconds": float(ProjectConfigurations.LLM_REQUEST_TIMEOUT_SECONDS.value),
+            "max_timeout_seconds": float(ProjectConfigurations.LLM_REQUEST_MAX_TIMEOUT_SECONDS.value),
+        }
@@ -0,0 +1,172 @@
+import asyncio
+import math
+import time
+from collections import deque
+from threading import Lock
+from typing import Any, Awaitable, Callable
+
+# load project configurations
+from app.configs.config import ProjectConfigurations
+
+# import logging utility
+from app.utils.logger import LoggerFactory
+
+# initialize logging utility
+info_logger = LoggerFactory.get_info_logger()
+error_logger = LoggerFactory.get_error_logger()
+debug_logger = LoggerFactory.get_debug_logger()
+
+class HedgeBudget:
+    """
+    Process wide token bucket that keeps hedges below LLM_HEDGE_BUDGET_RATIO of the traffic.
+    Every request deposits `ratio` tokens, every hedge withdraws one. Thread-safe.
+    """
+
+    _ratio = float(ProjectConfigurations.LLM_HEDGE_BUDGET_RATIO.value)
+    _max_tokens = float(ProjectConfigurations.LLM_HEDGE_BUDGET_MAX_TOKENS.value)
+
+    _tokens = 0.0
+    _lock = Lock()
+
+    @classmethod
+    def deposit(cls) -> None:
+        with cls._lock:
+            cls._tokens = min(cls._max_tokens, cls._tokens + cls._ratio)
+
+    @classmethod
+    def try_withdraw(cls) -> bool:
+        with cls._lock:
+            if cls._tokens < 1:
+                return False
+            cls._tokens -= 1
+            return True
+
+    @classmethod
+    def tokens(cls) -> float:
+        with cls._lock:
+            return cls._tokens
+
+class RequestHedger:
+    """
+    Hedged upstream calls to cut tail latency
+
+    - keeps the latest LLM_HEDGE_LATENCY_WINDOW latencies per model
+    - if the first call has not answered after the LLM_HEDGE_PERCENTILE latency of that model,
+      a second identical call is started (when the HedgeBudget allows it and can_hedge() says the upstream can take it,
+      e.g. the circuit breaker of the endpoint the hedge would go to is closed)
+    - the first acceptable answer wins and the other call is cancelled
+    No hedging happens until a model has LLM_HEDGE_MIN_SAMPLES samples.
+    Only used from the event loop.
+    """
+
+    _percentile = float(ProjectConfigurations.LLM_HEDGE_PERCENTILE.value)
+    _min_samples = int(ProjectConfigurations.LLM_HEDGE_MIN_SAMPLES.value)
+    _window = int(ProjectConfigurations.LLM_HEDGE_LATENCY_WINDOW.value)
+    _min_delay = float(ProjectConfigurations.LLM_HEDGE_MIN_DELAY_SECONDS.value)
+
+    _latencies: dict[str, deque] = {}
+
+    _counters = {
+        "requests": 0,
+        "hedges_sent": 0,
+        "hedges_won": 0,
+        "hedges_denied_budget": 0,
+        "hedges_denied_breaker": 0,
+        "losers_cancelled": 0,
+    }
+
+    @classmethod
+    def record_latency(cls, key: str, seconds: float) -> None:
+        samples = cls._latencies.get(key)
+        if samples is None:
+            samples = cls._latencies[key] = deque(maxlen=cls._window)
+        samples.append(seconds)
+
+    @classmethod
+    def hedge_delay(cls, key: str) -> float | None:
+        samples = cls._latencies.get(key)
+        if not samples or len(samples) < cls._min_samples:
+            return None
+        ordered = sorted(samples)
+        index = min(len(ordered) - 1, math.ceil(cls._percentile / 100 * len(ordered)) - 1)
+        return max(cls._min_delay, ordered[index])
+
+    @classmethod
+    async def run(
+        cls,
+        key: str,
+        fn: Callable[[], Awaitable[Any]],
+        is_acceptable: Callable[[Any], bool] = lambda result: True,
+        can_hedge: Callable[[], bool] = lambda: True
+    ) -> Any:
+        """
+        Run fn() and hedge it with a second fn() if it is slower than the usual latency for `key`.
+        Results that are not acceptable (e.g. a 5xx response) do not win while the other call is still running.
+        can_hedge() is asked right before the hedge is sent, no hedge is sent when it says no.
+        """
+        cls._counters["requests"] += 1
+        HedgeBudget.deposit()
+
+        async def timed_call():
+            start = time.perf_counter()
+            result = await fn()
+            if is_acceptable(result):
+                cls.record_latency(key, time.perf_counter() - start)
+            return result
+
+        primary = asyncio.create_task(timed_call())
+        hedge = None
+        delay = cls.hedge_delay(key)
+        try:
+            if delay is None:
+                return await asyncio.shield(primary)
+
+            done, _ = await asyncio.wait({primary}, timeout=delay)
+            if done:
+                return primary.result()
+
+            if not can_hedge():
+                cls._counters["hedges_denied_breaker"] += 1
+                return await asyncio.shield(primary)
+            if not HedgeBudget.try_withdraw():
+                cls._counters["hedges_denied_budget"] += 1
+                return await asyncio.shield(primary)
+
+            hedge = asyncio.create_task(timed_call())
+            cls._counters["hedges_sent"] += 1
+            debug_logger.debug(f"RequestHedger.run | first call slower than {delay:.2f}s, hedge sent | key = {key}")
+
+            pending = {primary, hedge}
+            fallback = None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is not None:
+                        continue
+                    if is_acceptable(task.result()):
+                        if task is hedge:
+                            cls._counters["hedges_won"] += 1
+                        return task.result()
+                    fallback = task
+            # neither call produced an acceptable answer
+            if fallback is not None:
+                return fallback.result()
+            raise primary.exception()
+        finally:
+            for task in (primary, hedge):
+                if task is not None and not task.done():
+                    task.cancel()
+                    cls._counters["losers_cancelled"] += 1
+
+    @classmethod
+    def stats(cls) -> dict:
+        return {
+            **cls._counters,
+            "enabled": ProjectConfigurations.LLM_HEDGING_ENABLED.value,
+            "hedge_budget_tokens": round(HedgeBudget.tokens(), 2),
+            "hedge_delay_seconds": {
+                key: (round(delay, 4) if delay is not None else None)
+                for key, delay in ((key, cls.hedge_delay(key)) for key in cls._latencies)
+            },
+            "samples": {key: len(samples) for key, samples in cls._latencies.items()},
+        }
@@ -0,0 +1,183 @@
+import random
+import time
+from email.utils import parsedate_to_datetime
+from threading import Lock
+
+# import library required for making request to hugging face
+import httpx
+
+# load project configurations
+from app.configs.config import ProjectConfigurations
+
+# import logging utility
+from app.utils.logger import LoggerFactory
+
+# initialize logging utility
+info_logger = LoggerFactory.get_info_logger()
+error_logger = LoggerFactory.get_error_logger()
+debug_logger = LoggerFactory.get_debug_logger()
+
+class RetryBudget:
+    """
+    Process wide token bucket that caps retries to a fraction of the base traffic
+
+    - every original request deposits LLM_RETRY_BUDGET_RATIO tokens
+    - a small time based refill (LLM_RETRY_BUDGET_MIN_PER_SECOND) keeps retries possible at very low traffic
+    - every retry withdraws one token, no token means no retry
+    During an upstream outage this keeps the extra load at ~ratio x instead of max_attempts x.
+    Thread-safe.
+    """
+
+    _ratio = float(ProjectConfigurations.LLM_RETRY_BUDGET_RATIO.value)
+    _min_per_second = float(ProjectConfigurations.LLM_RETRY_BUDGET_MIN_PER_SECOND.value)
+    _max_tokens = float(ProjectConfigurations.LLM_RETRY_BUDGET_MAX_TOKENS.value)
+
+    _tokens = _max_tokens
+    _updated_at = time.monotonic()
+    _lock = Lock()
+
+    @classmethod
+    def _refill(cls) -> None:
+        now = time.monotonic()
+        cls._tokens = min(cls._max_tokens, cls._tokens + (now - cls._updated_at) * cls._min_per_second)
+        cls._updated_at = now
+
+    @classmethod
+    def deposit(cls) -> None:
+        with cls._lock:
+            cls._refill()
+            cls._tokens = min(cls._max_tokens, cls._tokens + cls._ratio)
+
+    @classmethod
+    def try_withdraw(cls) -> bool:
+        with cls._lock:
+            cls._refill()
+            if cls._tokens < 1:
+                return False
+            cls._tokens -= 1
+            return True
+
+    @classmethod
+    def tokens(cls) -> float:
+        with cls._lock:
+            cls._refill()
+            return cls._tokens
+
+class RetryPolicy:
+    """
+    Decides if and when a failed hugging face call is retried
+
+    - only the configured status codes (LLM_RETRY_STATUS_CODES) and connection errors / timeouts are retried
+    - a Retry-After header from the upstream is honored, if it asks for more than
+      LLM_RETRY_MAX_RETRY_AFTER_SECONDS we give up instead of holding the request
+    - otherwise the delay uses decorrelated jitter: random(base, previous_delay * 3) capped at max_delay,
+      so clients that failed together do not retry together
+    - a retry whose delay does not fit in what is left of the request deadline is not scheduled
+    - every retry needs a token from the RetryBudget (only withdrawn once the retry is really going to happen)
+    """
+
+    _max_attempts = int(ProjectConfigurations.LLM_RETRY_MAX_ATTEMPTS.value)
+    _base_delay = float(ProjectConfigurations.LLM_RETRY_BASE_DELAY_SECONDS.value)
+    _max_delay = float(ProjectConfigurations.LLM_RETRY_MAX_DELAY_SECONDS.value)
+    _max_retry_after = float(ProjectConfigurations.LLM_RETRY_MAX_RETRY_AFTER_SECONDS.value)
+    _retry_on_read_timeout = bool(ProjectConfigurations.LLM_RETRY_ON_READ_TIMEOUT.value)
+    _retryable_status_codes = frozenset(
+        int(code) for code in str(ProjectConfigurations.LLM_RETRY_STATUS_CODES.value).split(",") if code.strip()
+    )
+
+    _counters = {
+        "requests": 0,
+        "retries_spent": 0,
+        "retries_denied_budget": 0,
+        "retries_denied_retry_after": 0,
+        "retries_denied_deadline": 0,
+        "retries_exhausted": 0,
+        "retry_after_honored": 0,
+    }
+    _retries_by_reason: dict[str, int] = {}
+    _lock = Lock()
+
+    @classmethod
+    def _count(cls, counter: str) -> None:
+        with cls._lock:
+            cls._counters[counter] += 1
+
+    @classmethod
+    def record_request(cls) -> None:
+        cls._count("requests")
+        RetryBudget.deposit()
+
+    @classmethod
+    def is_retryable_status(cls, status_code: int) -> bool:
+        return status_code in cls._retryable_status_codes
+
+    @classmethod
+    def is_retryable_exception(cls, e: Exception) -> bool:
+        # a read timeout already cost us the full read timeout, retrying it can be switched off
+        if isinstance(e, httpx.ReadTimeout):
+            return cls._retry_on_read_timeout
+        return True
+
+    @staticmethod
+    def parse_retry_after(value: str | None) -> float | None:
+        """
+        Retry-After is either a number of seconds or an http date.
+        """
+        if not value:
+            return None
+        value = value.strip()
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            pass
+        try:
+            return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+        except (TypeError, ValueError):
+            return None
+
+    @classmethod
+    def next_delay(cls, attempt: int, previous_delay: float | None, reason: str, retry_after: float | None = None, deadline=None) -> float | None:
+        """
+        Returns how long to sleep before the next attempt, or None if the call should not be retried.
+        `attempt` is the number of the attempt that just failed.
+        Raises DeadlineExceededError (deadline is a RequestDeadline) when the next attempt could not start before
+        the deadline, before a budget token is spent on it.
+        """
+        if attempt >= cls._max_attempts:
+            cls._count("retries_exhausted")
+            return None
+
+        if retry_after is not None:
+            if retry_after > cls._max_retry_after:
+                cls._count("retries_denied_retry_after")
+                return None
+            delay = retry_after
+        else:
+            upper = max(cls._base_delay, (previous_delay or cls._base_delay) * 3)
+            delay = min(cls._max_delay, random.uniform(cls._base_delay, upper))
+
+        if deadline is not None and delay >= deadline.remaining():
+            cls._count("retries_denied_deadline")
+            raise deadline.exceeded("retry_backoff")
+
+        if not RetryBudget.try_withdraw():
+            cls._count("retries_denied_budget")
+            return None
+
+        with cls._lock:
+            cls._counters["retries_spent"] += 1
+            if retry_after is not None:
+                cls._counters["retry_after_honored"] += 1
+            cls._retries_by_reason[reason] = cls._retries_by_reason.get(reason, 0) + 1
+        return delay
+
+    @classmethod
+    def stats(cls) -> dict:
+        with cls._lock:
+            counters = {**cls._counters, "retries_by_reason": dict(cls._retries_by_reason)}
+        return {
+            **counters,
+            "max_attempts": cls._max_attempts,
+            "retryable_status_codes": sorted(cls._retryable_status_codes),
+            "retry_budget_tokens": round(RetryBudget.tokens(), 2),
+        }
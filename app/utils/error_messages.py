@@ -53,6 +53,22 @@ class HuggingFaceAIModelAPIErrorMessage(Enum):
     LLM_PROMPT_HUGGING_FACE_ERROR = "Invalid LLM response: content missing or not a string"
     HUGGING_FACE_LLM_API_TIMEOUT = "LLM response timed out. Model is slow or overloaded."
     LLM_CONTEXT_LIMIT_EMPTY = "Limit for the llm context cannot be less than or equal to zero or None"
+    HUGGING_FACE_CIRCUIT_OPEN = "LLM model is temporarily unavailable (too many upstream failures). Please retry later."
+    HUGGING_FACE_CONCURRENCY_LIMIT_EXCEEDED = "Too many LLM requests are in flight right now. Please retry later."
+    LLM_RATE_LIMIT_EXCEEDED = "Rate limit exceeded ({}). Please retry later."
+    LLM_PRIORITY_LANE_INVALID = "Unknown priority lane ({}). Valid lanes are: {}"
+    LLM_AGENT_BUSY = "Another prompt for this agent is still being processed. Please retry later."
+    LLM_AGENT_LOCK_CAPACITY_EXCEEDED = "Too many prompts are being processed right now. Please retry later."
+    LLM_SERVICE_OVERLOADED = "The service is overloaded right now. Please retry later."
+    LLM_REQUEST_DEADLINE_EXCEEDED = "The request deadline was exceeded before the answer was ready."
+    LLM_CLIENT_DISCONNECTED = "The client disconnected before the answer was ready, the request was cancelled."
+
+class LLMPromptJobErrorMessages(Enum):
+    JOB_ID_EMPTY = "Job id cannot be empty!"
+    JOB_NOT_FOUND = "Prompt job with the job_id ({}) is not found in the database"
+    JOB_LEASE_LOST = "Prompt job is no longer leased by this worker"
+    JOB_LEASE_EXPIRED = "Prompt job worker stopped responding and no attempts are left"
+    JOB_QUEUE_DISABLED = "Async prompt jobs are disabled on this server"
 
 class AIAgentToolApiErrorMessage(Enum):
     AGENT_TOOL_NAME_EMPTY = "Agent tool name cannot be empty!"
@@ -12,6 +12,13 @@ class PromptRequestFieldDescriptions(Enum):
 class SystemPromptRequestFieldDescription(Enum):
     SYSTEM_PROMPT_MESSAGE = "System prompt text (can be very long) this will be used to configure LLM"
     AGENT_ID_MESSAGE = "Enter the agent_id for whome you are trying to set the system prompt here!"
+    RESPONSE_CACHE_TTL_SECONDS = "Opt-in: cache identical LLM responses for this agent for this many seconds (0 disables the cache)"
+    PRIORITY_LANE = "Priority lane of this agent's LLM calls (one of LLM_PRIORITY_LANES, e.g. interactive or batch)"
+    REQUEST_TIMEOUT_SECONDS = "Time budget of this agent's prompts in seconds when the caller sends no X-Request-Timeout header"
+    MAX_OUTPUT_TOKENS = "Maximum number of tokens the LLM may generate per answer (capped at LLM_MAX_OUTPUT_TOKENS)"
+    TEMPERATURE = "Sampling temperature sent to the LLM (0 - 2), empty means the model default"
+    STOP_SEQUENCES = "Up to 4 sequences where the LLM stops generating, an empty list clears them"
+    FALLBACK_MODELS = "Models to switch to (in this order) while ai_model misses its latency / error slo, an empty list clears them"
 
 class AgentRequestFieldDescription(Enum):
     AI_AGENT_NAME = "Enter the ai agent name here!"
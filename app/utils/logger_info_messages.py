@@ -24,7 +24,10 @@ class SystemPromptApiUrls(Enum):
 class HuggingFaceAPIUrls(Enum):
     HUGGING_FACE_GET_AI_MODELS = "/process/hugging_face/get_models"
     HUGGING_FACE_PROCESS_PROMPT = "process/hugging_face/user_prompt"
+    HUGGING_FACE_PROCESS_PROMPT_STREAM = "/process/hugging_face/user_prompt/stream"
     HUGGINGFACE_AI_MODEL_RESET_CONTEXT = "/process/hugging_face/reset_ai_agent_context"
+    HUGGING_FACE_SUBMIT_PROMPT_JOB = "/process/hugging_face/jobs"
+    HUGGING_FACE_GET_PROMPT_JOB = "/process/hugging_face/jobs/{job_id}"
 
 class AgentApiUrls(Enum):
     CREATE_AGENT_API_URL = "/process/agent/create"
@@ -38,3 +41,21 @@ class AiAgentToolUrls(Enum):
     DETACH_AGENT_TOOL = "/process/detach_agent_tool"
     DETACH_ALL_AGENT_TOOLs = "/process/reset_agent_tools"
 
+class DiagnosticsApiUrls(Enum):
+    HF_HTTP_POOL_STATS = "/process/diagnostics/hf_http_pool"
+    LLM_RESPONSE_CACHE_STATS = "/process/diagnostics/llm_response_cache"
+    LLM_SINGLE_FLIGHT_STATS = "/process/diagnostics/llm_single_flight"
+    CIRCUIT_BREAKER_STATES = "/process/diagnostics/circuit_breakers"
+    LLM_CONCURRENCY_LIMITER_STATS = "/process/diagnostics/llm_concurrency_limiter"
+    RATE_LIMITER_STATS = "/process/diagnostics/rate_limiter"
+    LLM_RETRY_STATS = "/process/diagnostics/llm_retries"
+    LLM_HEDGING_STATS = "/process/diagnostics/llm_hedging"
+    LLM_ENDPOINT_STATS = "/process/diagnostics/llm_endpoints"
+    LLM_JOB_QUEUE_STATS = "/process/diagnostics/llm_job_queue"
+    AGENT_LOCK_STATS = "/process/diagnostics/agent_locks"
+    ADMISSION_CONTROL_STATS = "/process/diagnostics/admission_control"
+    REQUEST_DEADLINE_STATS = "/process/diagnostics/request_deadlines"
+    REQUEST_CANCELLATION_STATS = "/process/diagnostics/request_cancellations"
+    MODEL_FALLBACK_STATS = "/process/diagnostics/model_fallback"
+    ADAPTIVE_TIMEOUT_STATS = "/process/diagnostics/adaptive_timeouts"
+    REQUEST_BODY_ENCODER_STATS = "/process/diagnostics/request_body_encoder"
@@ -27,11 +27,13 @@ class HuggingFaceAIModelAPISuccessMessage(Enum):
     # llm process user prompt messages
     LLM_RESPONSE_INSERT = "LLM response inserted successfully1"
     LLM_USER_PROMPT_SUCCESS = "LLm processed the user_prompt successfully!"
+    LLM_USER_PROMPT_STREAM_STARTED = "LLM response stream started!"
     LLM_RESPONSE_DELETE = "All LLMs responses deleted successfully!"
     LLM_CONTEXT_RESET_SUCCESS = "LLM context window reset successfull"
 
     # llm context management messages
     LLM_CONTEXT_FETCHED = "LLM context fetched successfully!"
+    LLM_TOKEN_COUNTS_SAVED = "LLM history token counts saved successfully!"
 
 class AiAgentApiSuccessMessage(Enum):
     AGENT_NAME_INSERTED = "AI Agent name inserted successfully!"
@@ -46,4 +48,38 @@ class AIAgentToolApiSuccessMessage(Enum):
     TOOL_ATTACHED = "Tool attached to agent."
 
     TOOL_DETACHED_FROM_THE_AGENT_SUCCESS = "Tool detached from the agent successfully!"
-    TOOLS_ATTCHED_TO_AGENT_LIST_FETCH = "Tools attached to the agent is fetched successfully!"
\ No newline at end of file
+    TOOLS_ATTCHED_TO_AGENT_LIST_FETCH = "Tools attached to the agent is fetched successfully!"
+
+class RateLimitBucketSuccessMessages(Enum):
+    BUCKET_REFILLED = "Rate limit bucket refilled successfully!"
+    BUCKET_CONSUMED = "Rate limit bucket consumed successfully!"
+    ACTIVE_BUCKETS_COUNTED = "Active rate limit buckets counted successfully!"
+
+class DiagnosticsApiSuccessMessage(Enum):
+    HF_HTTP_POOL_STATS_FETCHED = "Hugging face http connection pool stats fetched successfully!"
+    LLM_RESPONSE_CACHE_STATS_FETCHED = "LLM response cache stats fetched successfully!"
+    LLM_SINGLE_FLIGHT_STATS_FETCHED = "LLM request coalescing stats fetched successfully!"
+    CIRCUIT_BREAKER_STATES_FETCHED = "Circuit breaker states fetched successfully!"
+    LLM_CONCURRENCY_LIMITER_STATS_FETCHED = "LLM concurrency limiter stats fetched successfully!"
+    RATE_LIMITER_STATS_FETCHED = "Rate limiter stats fetched successfully!"
+    LLM_RETRY_STATS_FETCHED = "LLM retry stats fetched successfully!"
+    LLM_HEDGING_STATS_FETCHED = "LLM request hedging stats fetched successfully!"
+    LLM_ENDPOINT_STATS_FETCHED = "LLM endpoint load balancing stats fetched successfully!"
+    LLM_JOB_QUEUE_STATS_FETCHED = "Prompt job queue worker stats fetched successfully!"
+    AGENT_LOCK_STATS_FETCHED = "Per agent lock stats fetched successfully!"
+    ADMISSION_CONTROL_STATS_FETCHED = "Admission control stats fetched successfully!"
+    REQUEST_DEADLINE_STATS_FETCHED = "Request deadline stats fetched successfully!"
+    REQUEST_CANCELLATION_STATS_FETCHED = "Request cancellation stats fetched successfully!"
+    MODEL_FALLBACK_STATS_FETCHED = "Model fallback stats fetched successfully!"
+    ADAPTIVE_TIMEOUT_STATS_FETCHED = "Adaptive timeout stats fetched successfully!"
+    REQUEST_BODY_ENCODER_STATS_FETCHED = "Request body encoder stats fetched successfully!"
+
+class LLMPromptJobSuccessMessages(Enum):
+    JOB_QUEUED = "Prompt job queued successfully!"
+    JOB_FETCHED = "Prompt job fetched successfully!"
+    JOB_CLAIMED = "Prompt job claimed successfully!"
+    NO_JOB_TO_CLAIM = "No prompt job is waiting to be processed"
+    JOB_FINISHED = "Prompt job finished successfully!"
+    JOB_RESCHEDULED = "Prompt job rescheduled successfully!"
+    JOB_LEASE_EXTENDED = "Prompt job lease extended successfully!"
+    JOB_RELEASED = "Prompt job released back to the queue successfully!"
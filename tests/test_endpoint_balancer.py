@@ -0,0 +1,240 @@
+"""
+Stand-in hugging face endpoints (httpx.MockTransport) behind the real upstream call path
+(ProcessHuggingFaceAIPromptService._send_upstream -> EndpointBalancer / circuit breaker / concurrency limiter).
+"""
+import asyncio
+
+import httpx
+import pytest
+
+from app.services.adaptive_concurrency_limiter import AdaptiveConcurrencyLimiter
+from app.services.circuit_breaker import CircuitBreakerRegistry
+from app.services.endpoint_balancer import EndpointBalancer
+from app.services.hugging_face_http_client import HuggingFaceHTTPClient
+from app.services.request_hedger import HedgeBudget, RequestHedger
+from app.services.process_hugging_face_ai_prompt import ProcessHuggingFaceAIPromptService
+
+MODEL = "stand-in/model"
+FAST = "http://fast.stand-in/v1/chat/completions"
+SLOW = "http://slow.stand-in/v1/chat/completions"
+DOWN = "http://down.stand-in/v1/chat/completions"
+
+
+class StandInUpstream:
+    """
+    Answers every endpoint after its latency, endpoints in `down` answer 503.
+    """
+    def __init__(self, latencies: dict[str, float], down=()):
+        self.latencies = latencies
+        self.down = set(down)
+        self.hits = {url: 0 for url in latencies}
+
+    async def handler(self, request: httpx.Request) -> httpx.Response:
+        url = str(request.url)
+        self.hits[url] += 1
+        await asyncio.sleep(self.latencies[url])
+        if url in self.down:
+            return httpx.Response(503, json={"error": "stand-in endpoint is down"})
+        return httpx.Response(200, json={"choices": [{"message": {"role": "assistant", "content": "ok"}}]})
+
+
+@pytest.fixture(autouse=True)
+def fresh_upstream_state(monkeypatch):
+    monkeypatch.setattr(EndpointBalancer, "_states", {})
+    monkeypatch.setattr(CircuitBreakerRegistry, "_breakers", {})
+    monkeypatch.setattr(AdaptiveConcurrencyLimiter, "_limit", float(AdaptiveConcurrencyLimiter._max_limit))
+    monkeypatch.setattr(AdaptiveConcurrencyLimiter, "_in_flight", 0)
+    monkeypatch.setattr(AdaptiveConcurrencyLimiter, "_gradients", {})
+    monkeypatch.setattr(AdaptiveConcurrencyLimiter, "_last_decrease_at", 0.0)
+
+
+def run_against(upstream: StandInUpstream, scenario):
+    """
+    Runs scenario(send) with send(hedged=False) doing one upstream attempt and returning the status code.
+    """
+    async def main():
+        http_client = HuggingFaceHTTPClient(HF_API_URL=FAST)
+        http_client.client = httpx.AsyncClient(transport=httpx.MockTransport(upstream.handler))
+        service = ProcessHuggingFaceAIPromptService(hugging_face_auth_token="stand-in", HF_API_URL=FAST, db=None, http_client=http_client)
+
+        async def send(hedged: bool = False) -> int:
+            body = {"model": MODEL, "messages": [{"role": "user", "content": "hello"}]}
+            send_upstream = service._send_upstream_hedged if hedged else service._send_upstream
+            resp = await send_upstream(body=body, headers={}, tried_endpoints=[])
+            return resp.status_code
+
+        try:
+            # a scenario waiting for something that never happens fails instead of hanging
+            async with asyncio.timeout(30):
+                return await scenario(send)
+        finally:
+            await http_client.close()
+
+    return asyncio.run(main())
+
+
+def endpoint_stats(url: str) -> dict:
+    # an endpoint shows up in the stats once it was picked
+    return next((endpoint for endpoint in EndpointBalancer.stats()["endpoints"] if endpoint["url"] == url), {})
+
+
+def test_failing_endpoint_is_ejected(monkeypatch):
+    monkeypatch.setattr(EndpointBalancer, "_model_urls", {MODEL: [FAST, SLOW, DOWN]})
+    upstream = StandInUpstream({FAST: 0.002, SLOW: 0.02, DOWN: 0.002}, down=[DOWN])
+
+    async def scenario(send):
+        return [await send() for _ in range(40)]
+
+    statuses = run_against(upstream, scenario)
+
+    # endpoints without samples are tried first, so the failing one is hit until it is ejected and never after
+    assert upstream.hits[DOWN] == EndpointBalancer._eject_after
+    assert statuses.count(503) == EndpointBalancer._eject_after
+    assert endpoint_stats(DOWN)["ejected"]
+    assert endpoint_stats(DOWN)["times_ejected"] == 1
+
+
+def test_ejected_endpoint_is_readmitted(monkeypatch):
+    monkeypatch.setattr(EndpointBalancer, "_model_urls", {MODEL: [FAST, SLOW, DOWN]})
+    monkeypatch.setattr(EndpointBalancer, "_base_ejection", 0.2)
+    upstream = StandInUpstream({FAST: 0.002, SLOW: 0.02, DOWN: 0.002}, down=[DOWN])
+
+    async def scenario(send):
+        while not endpoint_stats(DOWN).get("ejected"):
+            await send()
+        upstream.down.clear()
+        hits_when_ejected = upstream.hits[DOWN]
+
+        # the endpoint recovered but stays out until its ejection runs out
+        for _ in range(10):
+            await send()
+        hits_while_ejected = upstream.hits[DOWN] - hits_when_ejected
+
+        await asyncio.sleep(0.25)
+        statuses = [await send() for _ in range(10)]
+        return hits_while_ejected, upstream.hits[DOWN] - hits_when_ejected, statuses
+
+    hits_while_ejected, hits_after_readmission, statuses = run_against(upstream, scenario)
+
+    assert hits_while_ejected == 0
+    assert hits_after_readmission > 0
+    assert statuses == [200] * 10
+    down = endpoint_stats(DOWN)
+    assert not down["ejected"]
+    assert down["consecutive_failures"] == 0
+    # a few successes do not make it healthy yet, its next ejection would be longer
+    assert down["times_ejected"] == 1
+
+
+def test_flapping_endpoint_is_ejected_longer_every_time(monkeypatch):
+    monkeypatch.setattr(EndpointBalancer, "_model_urls", {MODEL: [FAST, SLOW, DOWN]})
+    monkeypatch.setattr(EndpointBalancer, "_base_ejection", 0.1)
+    monkeypatch.setattr(EndpointBalancer, "_healthy_after", 5)
+    upstream = StandInUpstream({FAST: 0.002, SLOW: 0.02, DOWN: 0.002}, down=[DOWN])
+    # the ejections are under test here, DOWN's circuit breaker must not open on the same failures
+    CircuitBreakerRegistry.get(DOWN, MODEL).minimum_calls = 1000
+
+    async def eject_down(send) -> float:
+        while not endpoint_stats(DOWN).get("ejected"):
+            await send()
+        return endpoint_stats(DOWN)["ejected_for_seconds"]
+
+    async def answer_once_then_fail(send) -> None:
+        # re-admitted, one probe call succeeds and the endpoint breaks again
+        hits = upstream.hits[DOWN]
+        upstream.down.clear()
+        while upstream.hits[DOWN] == hits:
+            await send()
+        upstream.down.add(DOWN)
+
+    async def scenario(send):
+        ejections = [await eject_down(send)]
+        for _ in range(2):
+            await asyncio.sleep(ejections[-1] + 0.05)
+            await answer_once_then_fail(send)
+            ejections.append(await eject_down(send))
+        times_ejected = endpoint_stats(DOWN)["times_ejected"]
+
+        # once it stays healthy for _healthy_after calls the next ejection starts from the base time again
+        await asyncio.sleep(ejections[-1] + 0.05)
+        upstream.down.clear()
+        while endpoint_stats(DOWN)["consecutive_successes"] < EndpointBalancer._healthy_after:
+            await send()
+        return ejections, times_ejected, endpoint_stats(DOWN)["times_ejected"]
+
+    ejections, times_ejected, times_ejected_when_healthy = run_against(upstream, scenario)
+
+    assert times_ejected == 3
+    assert ejections[0] == pytest.approx(0.1, abs=0.03)
+    assert ejections[1] == pytest.approx(0.2, abs=0.03)
+    assert ejections[2] == pytest.approx(0.4, abs=0.03)
+    assert times_ejected_when_healthy == 0
+
+
+def test_fast_endpoint_takes_most_of_the_traffic(monkeypatch):
+    monkeypatch.setattr(EndpointBalancer, "_model_urls", {MODEL: [FAST, SLOW]})
+    upstream = StandInUpstream({FAST: 0.005, SLOW: 0.05})
+
+    async def scenario(send):
+        statuses = []
+        # waves of concurrent calls so the outstanding requests count as well as the latency
+        for _ in range(20):
+            statuses += await asyncio.gather(*(send() for _ in range(10)))
+        return statuses
+
+    statuses = run_against(upstream, scenario)
+
+    assert statuses == [200] * 200
+    assert upstream.hits[FAST] >= 3 * upstream.hits[SLOW]
+    assert endpoint_stats(FAST)["ewma_latency_ms"] < endpoint_stats(SLOW)["ewma_latency_ms"]
+
+
+def test_half_open_endpoint_without_probe_slots_is_skipped(monkeypatch):
+    monkeypatch.setattr(EndpointBalancer, "_model_urls", {MODEL: [FAST, DOWN]})
+    upstream = StandInUpstream({FAST: 0.002, DOWN: 0.002})
+    breaker = CircuitBreakerRegistry.get(DOWN, MODEL)
+    breaker._transition(breaker.HALF_OPEN)
+    while breaker.allow_request():
+        pass
+
+    async def scenario(send):
+        return [await send() for _ in range(10)]
+
+    # DOWN never has a latency sample so it would win every pick, its breaker would then reject the call
+    assert run_against(upstream, scenario) == [200] * 10
+    assert upstream.hits[DOWN] == 0
+
+
+@pytest.mark.parametrize("breakers_open", [False, True])
+def test_no_hedge_while_every_breaker_is_open(monkeypatch, breakers_open):
+    monkeypatch.setattr(EndpointBalancer, "_model_urls", {MODEL: [FAST, SLOW]})
+    monkeypatch.setattr(RequestHedger, "_latencies", {})
+    monkeypatch.setattr(RequestHedger, "_counters", dict.fromkeys(RequestHedger._counters, 0))
+    monkeypatch.setattr(RequestHedger, "_min_delay", 0.01)
+    monkeypatch.setattr(HedgeBudget, "_tokens", HedgeBudget._max_tokens)
+    for _ in range(RequestHedger._min_samples):
+        RequestHedger.record_latency(MODEL, 0.01)
+    upstream = StandInUpstream({FAST: 0.1, SLOW: 0.1})
+    answer = upstream.handler
+
+    async def open_breakers_then_answer(request: httpx.Request) -> httpx.Response:
+        # both breakers open while the first call is in flight
+        if breakers_open:
+            for url in (FAST, SLOW):
+                breaker = CircuitBreakerRegistry.get(url, MODEL)
+                breaker._transition(breaker.OPEN)
+        return await answer(request)
+
+    monkeypatch.setattr(upstream, "handler", open_breakers_then_answer)
+
+    async def scenario(send):
+        return await send(hedged=True)
+
+    assert run_against(upstream, scenario) == 200
+    if breakers_open:
+        assert sum(upstream.hits.values()) == 1
+        assert RequestHedger._counters["hedges_sent"] == 0
+    else:
+        # the same slow call is hedged while the breakers are closed
+        assert sum(upstream.hits.values()) == 2
+        assert RequestHedger._counters["hedges_sent"] == 1
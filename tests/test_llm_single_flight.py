@@ -0,0 +1,79 @@
+"""
+Coalescing of identical prompts (LLMSingleFlight) in front of the prompt run of ProcessHuggingFaceAIPromptService.
+The run itself (agent lock, context, upstream call, stored turn) is replaced by a counter.
+"""
+import asyncio
+
+import pytest
+
+from app.models.api_request_response_model.request_models import UserPromptRequest
+from app.models.class_return_model.services_class_response_models import RepositoryClassResponse
+from app.services.llm_single_flight import LLMSingleFlight
+from app.services.process_hugging_face_ai_prompt import ProcessHuggingFaceAIPromptService
+
+RUN_SECONDS = 0.05
+
+
+@pytest.fixture
+def service(monkeypatch):
+    monkeypatch.setattr(LLMSingleFlight, "_calls", {})
+    service = ProcessHuggingFaceAIPromptService(hugging_face_auth_token="stand-in", HF_API_URL="http://hf.stand-in", db=None, http_client=None)
+    service.runs = []
+
+    async def run_user_prompt_llm(request, bypass_cache, priority_lane, fallback_priority_lane, deadline):
+        service.runs.append((request.user_prompt, bypass_cache, priority_lane))
+        await asyncio.sleep(RUN_SECONDS)
+        return RepositoryClassResponse(status=True, status_code=200, message="stored", data={"run": len(service.runs)})
+
+    monkeypatch.setattr(service, "_run_user_prompt_llm", run_user_prompt_llm)
+    return service
+
+
+def prompt(user_prompt: str = "hello") -> UserPromptRequest:
+    return UserPromptRequest(agent_id="agent-1", user_prompt=user_prompt)
+
+
+def test_identical_prompts_in_flight_share_one_run(service):
+    async def main():
+        return await asyncio.gather(*(service.process_user_prompt_llm(prompt()) for _ in range(5)))
+
+    results = asyncio.run(main())
+
+    assert len(service.runs) == 1
+    assert {result.data["run"] for result in results} == {1}
+
+
+def test_cache_bypass_never_joins_another_run(service):
+    async def main():
+        return await asyncio.gather(
+            service.process_user_prompt_llm(prompt()),
+            service.process_user_prompt_llm(prompt(), bypass_cache=True),
+        )
+
+    asyncio.run(main())
+
+    assert sorted(bypass_cache for _, bypass_cache, _ in service.runs) == [False, True]
+
+
+def test_prompts_of_another_lane_are_not_coalesced(service):
+    async def main():
+        return await asyncio.gather(
+            service.process_user_prompt_llm(prompt(), priority_lane="interactive"),
+            service.process_user_prompt_llm(prompt(), priority_lane="batch"),
+        )
+
+    asyncio.run(main())
+
+    assert len(service.runs) == 2
+
+
+def test_answered_prompt_is_not_reused_by_default(service):
+    async def main():
+        await service.process_user_prompt_llm(prompt())
+        await asyncio.sleep(0.01)
+        await service.process_user_prompt_llm(prompt())
+
+    asyncio.run(main())
+
+    # a deliberate repeat of the prompt is a new turn unless LLM_SINGLE_FLIGHT_REUSE_SECONDS opts in
+    assert len(service.runs) == 2
@@ -0,0 +1,63 @@
+"""
+Priority lanes of the AdaptiveConcurrencyLimiter queue: 4 upstream slots, a backlog of 150 batch calls
+and 40 interactive calls arriving while it drains.
+"""
+import asyncio
+import statistics
+import time
+from collections import deque
+
+import pytest
+
+from app.services.adaptive_concurrency_limiter import AdaptiveConcurrencyLimiter, UpstreamPermit
+
+SLOTS = 4
+SERVICE_SECONDS = 0.05
+BATCH_CALLS = 150
+INTERACTIVE_CALLS = 40
+INTERACTIVE = AdaptiveConcurrencyLimiter.lanes()[0]
+BATCH = AdaptiveConcurrencyLimiter.lanes()[-1]
+
+
+@pytest.fixture(params=["weighted", "strict"])
+def limiter(request, monkeypatch):
+    lanes = AdaptiveConcurrencyLimiter.lanes()
+    monkeypatch.setattr(AdaptiveConcurrencyLimiter, "_limit", float(SLOTS))
+    monkeypatch.setattr(AdaptiveConcurrencyLimiter, "_min_limit", SLOTS)
+    monkeypatch.setattr(AdaptiveConcurrencyLimiter, "_max_limit", SLOTS)
+    monkeypatch.setattr(AdaptiveConcurrencyLimiter, "_in_flight", 0)
+    monkeypatch.setattr(AdaptiveConcurrencyLimiter, "_waiters", {lane: deque() for lane in lanes})
+    monkeypatch.setattr(AdaptiveConcurrencyLimiter, "_current_weights", {lane: 0 for lane in lanes})
+    monkeypatch.setattr(AdaptiveConcurrencyLimiter, "_gradients", {})
+    monkeypatch.setattr(AdaptiveConcurrencyLimiter, "_strict_priority", request.param == "strict")
+    monkeypatch.setattr(AdaptiveConcurrencyLimiter, "_queue_timeout_seconds", 30.0)
+    return AdaptiveConcurrencyLimiter
+
+
+async def call(limiter, lane: str, waits: list) -> None:
+    enqueued_at = time.monotonic()
+    async with limiter.slot(lane=lane) as permit:
+        waits.append(time.monotonic() - enqueued_at)
+        await asyncio.sleep(SERVICE_SECONDS)
+        permit.record_status(200, model_name="stand-in/model", kind=UpstreamPermit.BLOCKING)
+
+
+def test_interactive_calls_skip_the_batch_backlog(limiter):
+    batch_waits, interactive_waits = [], []
+
+    async def main():
+        batch = [asyncio.create_task(call(limiter, BATCH, batch_waits)) for _ in range(BATCH_CALLS)]
+        interactive = []
+        for _ in range(INTERACTIVE_CALLS):
+            await asyncio.sleep(SERVICE_SECONDS / 2)
+            interactive.append(asyncio.create_task(call(limiter, INTERACTIVE, interactive_waits)))
+        await asyncio.gather(*batch, *interactive)
+
+    asyncio.run(main())
+
+    assert len(batch_waits) == BATCH_CALLS
+    assert len(interactive_waits) == INTERACTIVE_CALLS
+    # an interactive call waits for the next free slot (about one service time at worst), not for the backlog
+    interactive_p95 = statistics.quantiles(interactive_waits, n=20)[-1]
+    assert interactive_p95 <= 1.5 * SERVICE_SECONDS
+    assert max(batch_waits) > 10 * SERVICE_SECONDS
@@ -0,0 +1,37 @@
+"""
+RetryPolicy bookkeeping: a retry that can not happen must not spend the process wide RetryBudget.
+"""
+import pytest
+
+from app.services.request_deadline import DeadlineExceededError, RequestDeadline
+from app.services.retry_policy import RetryBudget, RetryPolicy
+
+
+@pytest.fixture(autouse=True)
+def fresh_retry_state(monkeypatch):
+    monkeypatch.setattr(RetryPolicy, "_counters", dict.fromkeys(RetryPolicy._counters, 0))
+    monkeypatch.setattr(RetryPolicy, "_retries_by_reason", {})
+    monkeypatch.setattr(RetryBudget, "_tokens", 5.0)
+    monkeypatch.setattr(RetryBudget, "_min_per_second", 0.0)
+
+
+def test_retry_past_the_deadline_keeps_the_budget_token():
+    deadline = RequestDeadline.start(timeout_seconds=1.0)
+
+    with pytest.raises(DeadlineExceededError):
+        # the upstream asks for a longer wait than the request has left
+        RetryPolicy.next_delay(attempt=1, previous_delay=None, reason="503", retry_after=5.0, deadline=deadline)
+
+    assert RetryBudget.tokens() == 5.0
+    assert RetryPolicy._counters["retries_spent"] == 0
+    assert RetryPolicy._counters["retries_denied_deadline"] == 1
+
+
+def test_retry_within_the_deadline_spends_a_token():
+    deadline = RequestDeadline.start(timeout_seconds=60.0)
+
+    delay = RetryPolicy.next_delay(attempt=1, previous_delay=None, reason="503", retry_after=1.0, deadline=deadline)
+
+    assert delay == 1.0
+    assert RetryBudget.tokens() == 4.0
+    assert RetryPolicy._counters["retries_spent"] == 1